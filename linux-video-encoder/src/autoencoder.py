@@ -10,6 +10,8 @@ Dependencies:
 """
 from pathlib import Path
 import urllib.request
+import collections
+import copy
 import json
 import os
 import time
@@ -19,13 +21,27 @@ import subprocess
 import pathlib
 import re
 import shutil
+import signal
 import threading
+import types
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from scanner import Scanner, EXCLUDED_SCAN_PATHS
 from encoder import Encoder  # kept as a fallback if needed
 from status_tracker import StatusTracker
+from job_store import JobStore
+from job_logs import get_job_logs
+from log_pipeline import DEFAULT_LOG_LEVELS, apply_log_levels, normalize_log_levels, start_logging
+from probe_cache import get_probe_cache
+from openmetrics import observe_copy
+from proc_accounting import AccountedPopen, ProcAccountant
+from progress_stream import (
+    LOG_PROGRESS_STEP_PCT, PROGRESS_PREFIXES, FfmpegProgressReader, HandBrakeJsonReader, ProgressThrottle, iter_output,
+    json_progress, parse_text_progress,
+)
+from remux import REMUX_MODES, plan_remux, remux_subtitle_args
+from resolution import DEFAULT_MODULUS, normalize_crop, plan_resolution
 from smb_allowlist import enforce_smb_allowlist, load_smb_allowlist, save_smb_allowlist, remove_from_allowlist
 from web_server import start_web_server
 from makemkv_parser import parse_makemkv_info_output, _parse_duration_to_seconds
@@ -36,9 +52,15 @@ CONFIG_PATH = STATE_DIR / "config.json"
 FALLBACK_CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.json"
 LOG_DIR = Path(__file__).resolve().parents[1] / "logs"
 LOG_FILE = LOG_DIR / "app.log"
+JOB_LOG_DIR = LOG_DIR / "jobs"
 WEB_PORT = 5959
 SMB_MOUNT_ROOT = Path("/mnt/smb")
 USB_SEEN_PATH = STATE_DIR / "usb_seen.json"
+# main loop: cap for idle backoff (multiples of rescan_interval) and wakeup coalescing delay
+IDLE_BACKOFF_MAX = 4
+WAKE_DEBOUNCE_SEC = 0.05
+# config.json is stat()ed at most this often to notice edits made outside update()
+CONFIG_STAT_INTERVAL_SEC = 1.0
 # map staged USB path -> original source path
 USB_ORIGIN_MAP: Dict[str, str] = {}
 
@@ -50,10 +72,17 @@ DEFAULT_CONFIG = {
     "profile": "handbrake",
     "handbrake_presets": [],
     "max_threads": 4,
+    "encode_threads_per_job": 0,  # 0 = split host CPUs evenly across max_threads slots
     "rescan_interval": 30,
     "min_size_mb": 100,
     "low_bitrate_auto_proceed": False,
     "low_bitrate_auto_skip": False,
+    "chunked_encode": False,  # split long HandBrake sources into GOP-aligned chunks encoded in parallel
+    "chunk_seconds": 300,
+    "chunk_min_source_sec": 1800,
+    "chunk_workers": 0,  # 0 = derive from the job's thread budget
+    "resumable_encode": False,  # checkpoint long HandBrake encodes per segment so restarts resume
+    "remux_mode": "off",  # off | auto: stream-copy H.264/HEVC sources already within the profile's size and bitrate
     "video_extensions": [".mp4", ".mkv", ".avi", ".mov", ".flv", ".wmv", ".m4v"],
     "smb_staging_dir": "/mnt/smb_staging",
     "usb_staging_dir": "/mnt/usb_staging",
@@ -76,6 +105,7 @@ DEFAULT_CONFIG = {
         "audio_track_list": "",
         "audio_all": False,
         "subtitle_mode": "none",  # none | copy_all | burn_forced
+        "modulus": 2,  # output width/height are multiples of this (2 | 4 | 8 | 16)
         "extra_args": [],
         "extension": ".mkv"
     },
@@ -99,7 +129,8 @@ DEFAULT_CONFIG = {
         "audio_lang_list": [],
         "audio_track_list": "",
         "audio_all": False,
-        "subtitle_mode": "none"
+        "subtitle_mode": "none",
+        "modulus": 2
     },
     "handbrake_br": {
         "encoder": "x264",
@@ -121,7 +152,8 @@ DEFAULT_CONFIG = {
         "audio_lang_list": [],
         "audio_track_list": "",
         "audio_all": False,
-        "subtitle_mode": "none"
+        "subtitle_mode": "none",
+        "modulus": 2
     },
     "makemkv_minlength": 1200,
     "makemkv_titles": [],
@@ -133,13 +165,41 @@ DEFAULT_CONFIG = {
     "makemkv_exclude_commentary": False,
     "makemkv_prefer_surround": True,
     "makemkv_auto_rip": False,
+    "makemkv_encode_while_ripping": False,  # start encoding a single-title rip before MakeMKV finishes
+    "rip_follow_lag_mb": 64,  # how far the live encoder stays behind the MakeMKV writer
+    "scan_reconcile_sec": 600,  # full rescan interval for the inotify-backed scan index
+    "scan_root_timeout_sec": 20,  # per-root scan budget before a root is marked degraded
+    "job_log_retention_days": 30,  # gzipped per-job logs older than this are deleted (0 = keep)
+    "job_log_max_total_mb": 1024,  # oldest per-job logs are deleted past this total (0 = no limit)
+    "log_levels": dict(DEFAULT_LOG_LEVELS),  # per-subsystem app.log levels: app, scanner, web, metrics
 }
 
+def _freeze(value):
+    """Read-only view of a config value: dicts become mappingproxies, lists become tuples."""
+    if isinstance(value, dict):
+        return types.MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
 class ConfigManager:
+    """
+    Parsed config.json kept in memory. The file is only re-read when its mtime/size/inode change or
+    update() writes it; subscribers are called with the new read-only config after every reload.
+    read() hands out a private mutable copy, current() the shared immutable one.
+    """
+
     def __init__(self, path: Path):
         self._ensure_seed()
         self.path = path
         self.lock = threading.Lock()
+        self.version = 0
+        self._config = None
+        self._frozen = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._subscribers = []
 
     def _ensure_seed(self):
         """Ensure the persisted config file exists; seed from fallback config.json if missing."""
@@ -153,9 +213,56 @@ class ConfigManager:
         except Exception:
             logging.exception("Failed to seed config file at %s", CONFIG_PATH)
 
+    def _file_stamp(self):
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self, force: bool = False):
+        """Reload if the file changed (caller holds self.lock); returns the new frozen config or None."""
+        now = time.monotonic()
+        if not force and self._config is not None and now - self._checked_at < CONFIG_STAT_INTERVAL_SEC:
+            return None
+        self._checked_at = now
+        stamp = self._file_stamp()
+        if not force and self._config is not None and stamp == self._stamp:
+            return None
+        first = self._config is None
+        self._config = load_config(self.path)
+        self._frozen = _freeze(self._config)
+        self._stamp = stamp
+        self.version += 1
+        return None if first and not force else self._frozen
+
+    def _notify(self, frozen):
+        if frozen is None:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(frozen)
+            except Exception:
+                logging.exception("Config subscriber failed")
+
+    def subscribe(self, callback):
+        """callback(config) runs after each reload (file edited or update()), outside the lock."""
+        self._subscribers.append(callback)
+
+    def current(self):
+        """Shared read-only config (nested dicts are mappingproxies, lists are tuples)."""
+        with self.lock:
+            reloaded = self._refresh()
+            frozen = self._frozen
+        self._notify(reloaded)
+        return frozen
+
     def read(self) -> Dict[str, Any]:
         with self.lock:
-            return load_config(self.path)
+            reloaded = self._refresh()
+            cfg = copy.deepcopy(self._config)
+        self._notify(reloaded)
+        return cfg
 
     def update(self, data: Dict[str, Any]) -> Dict[str, Any]:
         with self.lock:
@@ -165,6 +272,7 @@ class ConfigManager:
                 "rip_dir",
                 "final_dir",
                 "max_threads",
+                "encode_threads_per_job",
                 "rescan_interval",
                 "min_size_mb",
                 "makemkv_minlength",
@@ -181,8 +289,21 @@ class ConfigManager:
                 "makemkv_exclude_commentary",
                 "makemkv_prefer_surround",
                 "makemkv_auto_rip",
+                "makemkv_encode_while_ripping",
+                "rip_follow_lag_mb",
+                "scan_reconcile_sec",
+                "scan_root_timeout_sec",
+                "job_log_retention_days",
+                "job_log_max_total_mb",
+                "log_levels",
                 "low_bitrate_auto_proceed",
                 "low_bitrate_auto_skip",
+                "chunked_encode",
+                "chunk_seconds",
+                "chunk_min_source_sec",
+                "chunk_workers",
+                "resumable_encode",
+                "remux_mode",
                 "search_path",
                 "profile",
             ]:
@@ -197,11 +318,17 @@ class ConfigManager:
                         if v is not None:
                             cfg[key][k] = v
             try:
-                with self.path.open("w", encoding="utf-8") as f:
+                # write-then-rename so a concurrent reload never parses a half-written file
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                with tmp.open("w", encoding="utf-8") as f:
                     json.dump(cfg, f, indent=2)
+                os.replace(tmp, self.path)
             except Exception:
                 logging.exception("Failed to write config to %s", self.path)
-            return load_config(self.path)
+            reloaded = self._refresh(force=True)
+            cfg = copy.deepcopy(self._config)
+        self._notify(reloaded)
+        return cfg
 
 def load_config(path: Path):
     try:
@@ -266,8 +393,22 @@ def load_config(path: Path):
     merged["makemkv_exclude_commentary"] = bool(merged.get("makemkv_exclude_commentary"))
     merged["makemkv_prefer_surround"] = bool(merged.get("makemkv_prefer_surround"))
     merged["makemkv_auto_rip"] = bool(merged.get("makemkv_auto_rip"))
+    merged["makemkv_encode_while_ripping"] = bool(merged.get("makemkv_encode_while_ripping"))
     merged["low_bitrate_auto_proceed"] = bool(merged.get("low_bitrate_auto_proceed"))
     merged["low_bitrate_auto_skip"] = bool(merged.get("low_bitrate_auto_skip"))
+    merged["chunked_encode"] = bool(merged.get("chunked_encode"))
+    merged["resumable_encode"] = bool(merged.get("resumable_encode"))
+    if merged.get("remux_mode") not in REMUX_MODES:
+        merged["remux_mode"] = DEFAULT_CONFIG["remux_mode"]
+    merged["log_levels"] = normalize_log_levels(merged.get("log_levels"))
+    for int_key in ["max_threads", "encode_threads_per_job", "chunk_seconds", "chunk_min_source_sec", "chunk_workers", "rip_follow_lag_mb", "scan_reconcile_sec", "scan_root_timeout_sec",
+                    "job_log_retention_days", "job_log_max_total_mb"]:
+        try:
+            merged[int_key] = max(0, int(merged.get(int_key) or 0))
+        except Exception:
+            merged[int_key] = DEFAULT_CONFIG[int_key]
+    if merged["max_threads"] < 1:
+        merged["max_threads"] = 1
     return merged
 
 def load_usb_seen() -> Dict[str, Dict[str, float]]:
@@ -324,6 +465,7 @@ def mark_usb_encoded(src: Path, src_stat=None) -> None:
 
 
 def setup_logging():
+    """Console + rotating app.log, written by a queue listener thread so log calls never wait on disk."""
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     handlers = [
         logging.StreamHandler(),
@@ -331,11 +473,11 @@ def setup_logging():
             LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=2, encoding="utf-8"
         ),
     ]
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s %(levelname)s: %(message)s",
-        handlers=handlers,
-    )
+    formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    start_logging(handlers)
+    apply_log_levels(None)
 
 def ensure_smb_root():
     try:
@@ -352,9 +494,11 @@ def rip_disc(
     titles=None,
     audio_langs=None,
     subtitle_langs=None,
+    progress_cb=None,
 ):
     """
     Rips a Blu-ray disc using MakeMKV CLI.
+    progress_cb, when given, receives every PRGV percentage (used by the encode-while-ripping follower).
     Returns (path, reused_existing) where path is the first output file if successful, or (None, False) on failure.
     """
     logger = logging.getLogger(__name__)
@@ -481,6 +625,13 @@ def rip_disc(
             status_tracker.complete(job_key, True, str(latest), "Reused existing rip")
         return str(latest), True
 
+    if disc_type:
+        # written before the rip starts so a live encode of the growing file picks the right profile
+        try:
+            marker = output_dir_path / ".disc_type"
+            marker.write_text(str(disc_type), encoding="utf-8")
+        except Exception:
+            logging.debug("Failed to write disc_type marker", exc_info=True)
     msg = f"📀 Running: {' '.join(cmd)}"
     print(msg)
     logging.info("Running MakeMKV: %s", " ".join(cmd))
@@ -490,25 +641,35 @@ def rip_disc(
         )
     result = None
     try:
-        result = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        result = AccountedPopen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        job_log = None
         if status_tracker:
             status_tracker.register_proc(job_key, result)
-        # Iterate lines as they arrive and log them
+            job_log = status_tracker.job_log(job_key, f"Running MakeMKV: {' '.join(cmd)}")
+        # MakeMKV's output goes to the job's own log (app.log if there is none); PRGV ticks only feed progress
         if result.stdout is not None:
             for line in result.stdout:
-                logger.info(line.rstrip())
+                if job_log is None:
+                    logger.info(line.rstrip())
+                elif not line.startswith("PRGV:"):
+                    job_log.write(line)
                 try:
-                    if "PRGV:" in line and status_tracker:
+                    if "PRGV:" in line and (status_tracker or progress_cb):
                         match = re.search(r"PRGV:(\d+)", line)
                         if match:
                             raw = int(match.group(1))
                             pct = min(100.0, max(0.0, raw / 655.35))
-                            status_tracker.update_progress(job_key, pct)
-                            status_tracker.set_message(job_key, f"Ripping {disc_source} ({pct:.1f}%)")
+                            if progress_cb:
+                                progress_cb(pct)
+                            if status_tracker:
+                                status_tracker.update_progress(job_key, pct)
+                                status_tracker.set_message(job_key, f"Ripping {disc_source} ({pct:.1f}%)")
                 except Exception:
                     logger.debug("Failed to parse MakeMKV progress line: %s", line, exc_info=True)
         rc = result.wait()
         logger.debug("exited with code %s", rc)
+        if job_log is not None:
+            job_log.write(f"makemkvcon exited with code {rc}")
         if status_tracker and status_tracker.was_canceled(job_key):
             return None, False
     except FileNotFoundError:
@@ -581,12 +742,6 @@ def rip_disc(
             logging.debug("Failed to apply rename_to for %s", job_key, exc_info=True)
     if status_tracker:
         status_tracker.clear_rename(job_key)
-    if disc_type:
-        try:
-            marker = output_dir_path / ".disc_type"
-            marker.write_text(str(disc_type), encoding="utf-8")
-        except Exception:
-            logging.debug("Failed to write disc_type marker", exc_info=True)
     first_file = str(first_file_path)
     print(f"🎬 Output file: {first_file}")
     if status_tracker:
@@ -793,7 +948,9 @@ def stage_usb_file(src: Path, staging_dir: Path, status_tracker: Optional[Status
     dest = pick_dest(dest)
     copied = False
     if not dest.exists():
+        copy_started = time.monotonic()
         shutil.copy2(src, dest)
+        observe_copy("usb", src_stat.st_size if src_stat else dest.stat().st_size, time.monotonic() - copy_started)
         copied = True
 
     # copy matching sidecar subtitle if present
@@ -842,7 +999,9 @@ def process_pending_smb(status_tracker: StatusTracker, staging_dir: Path, config
         if sidecar:
             allowlist.add(Path(sidecar).name)
         save_smb_allowlist(allowlist)
+        copy_started = time.monotonic()
         shutil.copy2(src, dest)
+        observe_copy("smb", dest.stat().st_size, time.monotonic() - copy_started)
         if sidecar:
             try:
                 shutil.copy2(Path(sidecar), dest_root / Path(sidecar).name)
@@ -909,20 +1068,24 @@ def compute_output_path(video_file: str, config: Dict[str, Any], output_dir: Pat
     return unique_name(output_dir, base, extension)
 
 
+def probe_media(path: Path) -> Optional[dict]:
+    """Full ffprobe result for a file, served from the shared probe cache."""
+    return get_probe_cache().get(Path(path))
+
+
+def _first_stream(data: Optional[dict], codec_type: str) -> dict:
+    for stream in (data or {}).get("streams") or []:
+        if stream.get("codec_type") == codec_type:
+            return stream
+    return {}
+
+
 def probe_source_info(path: Path) -> Optional[str]:
     try:
-        if not path.is_file():
-            return None
-        proc = subprocess.run(
-            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height,bit_rate,codec_name", "-show_entries", "format=bit_rate", "-of", "json", str(path)],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if proc.returncode != 0 or not proc.stdout:
+        data = probe_media(path)
+        if not data:
             return None
-        data = json.loads(proc.stdout)
-        stream = (data.get("streams") or [{}])[0]
+        stream = _first_stream(data, "video")
         fmt = data.get("format") or {}
         width = stream.get("width")
         height = stream.get("height")
@@ -948,18 +1111,10 @@ def probe_source_info(path: Path) -> Optional[str]:
 
 def probe_source_bitrate_kbps(path: Path) -> Optional[float]:
     try:
-        if not path.is_file():
-            return None
-        proc = subprocess.run(
-            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=bit_rate", "-show_entries", "format=bit_rate", "-of", "json", str(path)],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if proc.returncode != 0 or not proc.stdout:
+        data = probe_media(path)
+        if not data:
             return None
-        data = json.loads(proc.stdout)
-        stream = (data.get("streams") or [{}])[0]
+        stream = _first_stream(data, "video")
         fmt = data.get("format") or {}
         br = stream.get("bit_rate") or fmt.get("bit_rate")
         if br:
@@ -973,29 +1128,10 @@ def probe_source_bitrate_kbps(path: Path) -> Optional[float]:
 
 def probe_audio_stream(path: Path) -> Optional[dict]:
     try:
-        if not path.is_file():
+        data = probe_media(path)
+        if not data:
             return None
-        proc = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-select_streams",
-                "a:0",
-                "-show_entries",
-                "stream=codec_name,channels",
-                "-of",
-                "json",
-                str(path),
-            ],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if proc.returncode != 0 or not proc.stdout:
-            return None
-        data = json.loads(proc.stdout)
-        stream = (data.get("streams") or [{}])[0]
+        stream = _first_stream(data, "audio")
         codec = stream.get("codec_name")
         channels = stream.get("channels")
         try:
@@ -1006,6 +1142,45 @@ def probe_audio_stream(path: Path) -> Optional[dict]:
     except Exception:
         return None
 
+def probe_duration_seconds(path: Path) -> Optional[float]:
+    try:
+        data = probe_media(path)
+        if not data:
+            return None
+        dur = (data.get("format") or {}).get("duration")
+        return float(dur) if dur else None
+    except Exception:
+        return None
+
+# an encode may differ from its source by this much (seconds, or fraction of the source) before it counts as truncated
+OUTPUT_DURATION_SLACK_SEC = 10.0
+OUTPUT_DURATION_SLACK_RATIO = 0.02
+
+
+def encoded_output_ok(out_path: Path, reference: Optional[Path] = None) -> bool:
+    """
+    Whether out_path looks like a finished encode: it exists, is non-empty and, when a reference
+    (the file about to be deleted) is given and both durations probe, runs roughly as long.
+    """
+    try:
+        if not out_path.exists() or out_path.stat().st_size <= 0:
+            logging.warning("Encode reported success but output is missing/empty: %s", out_path)
+            return False
+    except Exception:
+        logging.debug("Output existence/size check failed for %s", out_path, exc_info=True)
+        return False
+    if reference is None:
+        return True
+    want = probe_duration_seconds(reference)
+    got = probe_duration_seconds(out_path)
+    if not want or got is None:
+        return True
+    if abs(want - got) > max(OUTPUT_DURATION_SLACK_SEC, want * OUTPUT_DURATION_SLACK_RATIO):
+        logging.warning("Encoded output %s runs %.0fs but its source %s runs %.0fs", out_path, got, reference, want)
+        return False
+    return True
+
+
 def scan_disc_info(disc_source: str) -> Optional[dict]:
     """
     Runs makemkvcon info to gather titles/tracks.
@@ -1257,18 +1432,107 @@ def estimate_target_bitrate_kbps(config_str: str, hb_opts: dict) -> Optional[flo
     except Exception:
         return None
 
-def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, status_tracker: Optional[StatusTracker] = None, job_id: Optional[str] = None) -> bool:
+HB_SCAN_TIMEOUT_SEC = 120
+
+
+def scan_handbrake_geometry(path: Path, timeout_sec: int = HB_SCAN_TIMEOUT_SEC) -> Optional[dict]:
+    """Frame size and autocrop ([top, bottom, left, right]) HandBrake's scan finds for title 1."""
+    title_sets = []
+
+    def on_block(name, block):
+        if name == "JSON Title Set":
+            title_sets.append(block)
+
+    try:
+        proc = subprocess.run(
+            ["HandBrakeCLI", "-i", str(path), "-t", "1", "--scan", "--json"],
+            capture_output=True, text=True, errors="replace", timeout=timeout_sec,
+        )
+    except Exception:
+        logging.debug("HandBrake scan failed for %s", path, exc_info=True)
+        return None
+    reader = HandBrakeJsonReader(on_block)
+    for line in proc.stdout.splitlines():
+        reader.feed(line)
+    titles = (title_sets[0].get("TitleList") if title_sets else None) or []
+    if not titles or not isinstance(titles[0], dict):
+        return None
+    geometry = titles[0].get("Geometry") or {}
+    return {"width": geometry.get("Width"), "height": geometry.get("Height"), "crop": titles[0].get("Crop")}
+
+
+def plan_output_resolution(video_file: str, hb_opts: dict) -> Optional[dict]:
+    """
+    Output size for a HandBrake encode from the probed source size and the crop HandBrake's scan
+    detects: never larger than the source or the profile's width/height, aspect ratio kept.
+    """
+    path = Path(video_file)
+    stream = _first_stream(probe_media(path) if path.is_file() else None, "video")
+    geometry = scan_handbrake_geometry(path) or {}
+    width = stream.get("width") or geometry.get("width")
+    height = stream.get("height") or geometry.get("height")
+    # the scan's crop is relative to its own frame size; only trust it when the two agree
+    crop = geometry.get("crop") if (geometry.get("width"), geometry.get("height")) == (width, height) else None
+    try:
+        modulus = int(hb_opts.get("modulus") or DEFAULT_MODULUS)
+    except (TypeError, ValueError):
+        modulus = DEFAULT_MODULUS
+    plan = plan_resolution(width, height, hb_opts.get("width"), hb_opts.get("height"), crop, modulus)
+    if plan:
+        plan["crop_source"] = "handbrake_scan" if crop is not None else None
+    return plan
+
+
+SOFTWARE_HB_ENCODERS = {"x264", "x264_10bit", "x265", "x265_10bit", "x265_12bit"}
+
+
+def _apply_thread_budget(cmd: list, encoder: str, threads: Optional[int], ffmpeg: bool) -> list:
+    """
+    Cap the encoder's worker threads so concurrent jobs don't oversubscribe the CPU.
+    HandBrake gets an x264 `threads=` / x265 `pools=` encopt (merged into any existing -x),
+    ffmpeg gets `-threads`. Hardware encoders are left alone.
+    """
+    try:
+        threads = int(threads or 0)
+    except Exception:
+        threads = 0
+    if threads <= 0:
+        return cmd
+    if ffmpeg:
+        if "-threads" in cmd:
+            return cmd
+        return cmd[:-1] + ["-threads", str(threads)] + cmd[-1:]
+    enc = str(encoder or "").lower()
+    if enc not in SOFTWARE_HB_ENCODERS:
+        return cmd
+    opt = f"pools={threads}" if enc.startswith("x265") else f"threads={threads}"
+    for flag in ("-x", "--encopts"):
+        if flag in cmd:
+            idx = cmd.index(flag)
+            if idx + 1 < len(cmd):
+                current = str(cmd[idx + 1])
+                if "threads=" not in current and "pools=" not in current:
+                    cmd[idx + 1] = f"{current}:{opt}" if current else opt
+                return cmd
+    return cmd + ["-x", opt]
+
+
+def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, status_tracker: Optional[StatusTracker] = None, job_id: Optional[str] = None, progress_cb=None, exit_cb=None) -> bool:
     """
     Run HandBrakeCLI or ffmpeg and stream its stdout/stderr to the logger in real time.
+    When progress_cb is given, percent updates go to it instead of the tracker (chunked mode);
+    exit_cb, if given, gets the encoder's return code.
     Returns True on success, False otherwise.
     """
     logger = logging.getLogger(__name__)
     job_key = job_id or str(input_path)
     encoder = opts.get("encoder", "x264")
     quality = opts.get("quality", "")
-    width = opts.get("width", 1920)
+    # the resolution plan (process_video) replaces the profile size so sources are never upscaled
+    resolution = opts.get("_resolution") or {}
+    width = resolution.get("width") or opts.get("width", 1920)
     profile = opts.get("profile", "")
-    height = opts.get("height", 1080)
+    height = resolution.get("height") or opts.get("height", 1080)
     video = opts.get("video", "")
     audio = opts.get("audio", "")
     audio_mode = opts.get("audio_mode", "encode")
@@ -1289,6 +1553,8 @@ def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, sta
     two_pass = bool(opts.get("two_pass"))
     hwdev = opts.get("hwdev", "")
     filterdev = opts.get("filterdev", "")
+    thread_budget = opts.get("_thread_budget")
+    video_only = bool(opts.get("_video_only"))
     #audio_bitrate_kbps = opts.get("audio_bitrate_kbps", 128)
     extra = opts.get("extra_args", []) or []
 
@@ -1316,6 +1582,7 @@ def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, sta
             cmd.append("-c:a")
             cmd.append(str(audio))
         cmd.append(str(output_path))
+        cmd = _apply_thread_budget(cmd, encoder, thread_budget, ffmpeg=True)
         logger.info("Running ffmpeg: %s", " ".join(cmd))
     else:
         if apply_audio_offset and audio_offset_ms not in (None, "", 0, "0"):
@@ -1365,6 +1632,10 @@ def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, sta
             "--height", str(height)
             #"-B", str(int(audio_bitrate_kbps))
         ]
+        # the crop the size was planned for, else the fixed crop a segmented encode gives every chunk
+        crop = resolution["crop"] if resolution.get("crop_source") else opts.get("_crop")
+        if crop:
+            cmd.extend(["--crop", ":".join(str(int(v)) for v in crop)])
         if video_bitrate_kbps:
             try:
                 cmd.extend(["-b", str(int(video_bitrate_kbps))])
@@ -1374,139 +1645,134 @@ def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, sta
                 cmd.append("--two-pass")
         else:
             cmd.extend(["-q", str(quality)])
-        # Auto Dolby logic: copy existing AC3/E-AC3, otherwise encode to E-AC3 (no upmix when channels <5)
-        source_audio = None
-        eff_audio_mode = audio_mode
-        eff_audio_encoder = audio_encoder
-        eff_audio_mixdown = audio_mixdown
-        if audio_mode == "auto_dolby":
-            source_audio = probe_audio_stream(Path(input_path))
-            codec = (source_audio or {}).get("codec")
-            channels = (source_audio or {}).get("channels")
-            if codec in {"ac3", "eac3"}:
-                eff_audio_mode = "copy"
-            else:
-                eff_audio_mode = "encode"
-                eff_audio_encoder = "eac3"
-                if channels is not None and channels >= 5 and not eff_audio_mixdown:
-                    eff_audio_mixdown = "5point1"
-
-        if audio_track_list:
-            cmd.extend(["--audio", str(audio_track_list)])
-        if audio_lang_list:
-            cmd.extend(["--audio-lang-list", ",".join(audio_lang_list)])
-        if eff_audio_mode == "copy":
-            cmd.extend(["-E", "copy"])
-            if audio_all:
-                cmd.append("--all-audio")
+        if video_only:
+            # chunk encodes carry video only; audio/subtitles are muxed once from the source
+            cmd.extend(["-a", "none"])
         else:
-            cmd.extend(["-E", str(eff_audio_encoder or "av_aac")])
-            if eff_audio_mixdown:
-                cmd.extend(["-6", str(eff_audio_mixdown)])
-            if audio_samplerate:
-                cmd.extend(["-R", str(audio_samplerate)])
-            if audio_drc is not None:
-                try:
-                    cmd.extend(["--drc", str(float(audio_drc))])
-                except Exception:
-                    pass
-            if audio_gain is not None:
-                try:
-                    cmd.extend(["--gain", str(float(audio_gain))])
-                except Exception:
-                    pass
-            if audio_bitrate_kbps:
-                try:
-                    cmd.extend(["-B", str(int(audio_bitrate_kbps))])
-                except Exception:
-                    cmd.extend(["-B", str(audio_bitrate_kbps)])
-            if audio_all:
-                cmd.append("--all-audio")
-        external_sub = find_external_subtitle(Path(input_path))
-        if external_sub:
-            cmd.extend(["--srt-file", str(external_sub), "--srt-default", "1"])
-            if status_tracker:
-                status_tracker.add_event(f"Included external subtitle: {external_sub}")
-        if subtitle_mode == "copy_all":
-            cmd.append("--all-subtitles")
-        elif subtitle_mode == "burn_forced":
-            cmd.extend(["--subtitle", "1", "--subtitle-burned"])
+            # Auto Dolby logic: copy existing AC3/E-AC3, otherwise encode to E-AC3 (no upmix when channels <5)
+            source_audio = None
+            eff_audio_mode = audio_mode
+            eff_audio_encoder = audio_encoder
+            eff_audio_mixdown = audio_mixdown
+            if audio_mode == "auto_dolby":
+                source_audio = probe_audio_stream(Path(input_path))
+                codec = (source_audio or {}).get("codec")
+                channels = (source_audio or {}).get("channels")
+                if codec in {"ac3", "eac3"}:
+                    eff_audio_mode = "copy"
+                else:
+                    eff_audio_mode = "encode"
+                    eff_audio_encoder = "eac3"
+                    if channels is not None and channels >= 5 and not eff_audio_mixdown:
+                        eff_audio_mixdown = "5point1"
+
+            if audio_track_list:
+                cmd.extend(["--audio", str(audio_track_list)])
+            if audio_lang_list:
+                cmd.extend(["--audio-lang-list", ",".join(audio_lang_list)])
+            if eff_audio_mode == "copy":
+                cmd.extend(["-E", "copy"])
+                if audio_all:
+                    cmd.append("--all-audio")
+            else:
+                cmd.extend(["-E", str(eff_audio_encoder or "av_aac")])
+                if eff_audio_mixdown:
+                    cmd.extend(["-6", str(eff_audio_mixdown)])
+                if audio_samplerate:
+                    cmd.extend(["-R", str(audio_samplerate)])
+                if audio_drc is not None:
+                    try:
+                        cmd.extend(["--drc", str(float(audio_drc))])
+                    except Exception:
+                        pass
+                if audio_gain is not None:
+                    try:
+                        cmd.extend(["--gain", str(float(audio_gain))])
+                    except Exception:
+                        pass
+                if audio_bitrate_kbps:
+                    try:
+                        cmd.extend(["-B", str(int(audio_bitrate_kbps))])
+                    except Exception:
+                        cmd.extend(["-B", str(audio_bitrate_kbps)])
+                if audio_all:
+                    cmd.append("--all-audio")
+            external_sub = find_external_subtitle(Path(input_path))
+            if external_sub:
+                cmd.extend(["--srt-file", str(external_sub), "--srt-default", "1"])
+                if status_tracker:
+                    status_tracker.add_event(f"Included external subtitle: {external_sub}")
+            if subtitle_mode == "copy_all":
+                cmd.append("--all-subtitles")
+            elif subtitle_mode == "burn_forced":
+                cmd.extend(["--subtitle", "1", "--subtitle-burned"])
         cmd.extend(map(str, extra))
+        cmd.append("--json")
+        cmd = _apply_thread_budget(cmd, encoder, thread_budget, ffmpeg=False)
         logger.info("Running HandBrakeCLI: %s", " ".join(cmd))
     try:
-        if status_tracker:
+        if status_tracker and not video_only:
             status_tracker.add_event(f"Encoding started: {input_path}")
-        # Stream combined stdout+stderr so progress and messages appear live
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        # stdout and stderr are read as raw chunks and split on \r/\n, so carriage-return progress arrives
+        # as it is printed; HandBrake's --json progress comes on stdout, its log on stderr
+        proc = AccountedPopen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        job_log = None
         if status_tracker:
             status_tracker.register_proc(job_key, proc)
-        # Iterate output chunks (handles HandBrake carriage-return updates)
-        if proc.stdout is not None:
-            import re
-            progress_re = re.compile(r'([0-9]{1,3}(?:[.,][0-9]{1,2})?)\s*%')
-            eta_re = re.compile(r'ETA\s+([0-9hms:]+)', re.IGNORECASE)
-
-            def parse_eta_seconds(token: str) -> Optional[int]:
-                try:
-                    token = token.strip()
-                    if not token:
-                        return None
-                    # Handle HH:MM:SS or MM:SS
-                    if ":" in token:
-                        parts = [int(p) for p in token.split(":") if p != ""]
-                        if len(parts) == 3:
-                            h, m, s = parts
-                        elif len(parts) == 2:
-                            h = 0
-                            m, s = parts
-                        else:
-                            return None
-                        return h * 3600 + m * 60 + s
-                    # Handle 1h2m3s / 15m30s / 45s etc.
-                    m = re.match(r'(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?', token, re.IGNORECASE)
-                    if m:
-                        h = int(m.group(1) or 0)
-                        mn = int(m.group(2) or 0)
-                        s = int(m.group(3) or 0)
-                        if h or mn or s:
-                            return h * 3600 + mn * 60 + s
-                    return None
-                except Exception:
-                    return None
-
-            buffer = ""
-            for raw in iter(proc.stdout.readline, ""):
-                if not raw:
-                    break
-                buffer += raw
-                parts = re.split(r'[\r\n]+', buffer)
-                buffer = parts.pop()
-                for line in parts:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    logger.info(line)
-                    for m in progress_re.finditer(line):
-                        try:
-                            pct_str = m.group(1).replace(",", ".")
-                            pct = float(pct_str)
-                            if status_tracker:
-                                status_tracker.update_progress(job_key, pct)
-                        except Exception:
-                            continue
-                    m2 = eta_re.search(line)
-                    if m2 and status_tracker:
-                        try:
-                            eta_val = parse_eta_seconds(m2.group(1))
-                            if eta_val is not None:
-                                status_tracker.update_eta(job_key, eta_val)
-                        except Exception:
-                            pass
-            tail = buffer.strip()
-            if tail:
-                logger.info(tail)
+            job_log = status_tracker.job_log(job_key, f"Running {cmd[0]}: {' '.join(map(str, cmd))}")
+        # encoder output goes to the job's own log; app.log keeps only the command and progress steps
+        emit = job_log.write if job_log is not None else logger.info
+        next_log_pct = [LOG_PROGRESS_STEP_PCT]
+
+        def push_progress(pct, fps, eta):
+            if progress_cb:
+                if pct is not None:
+                    progress_cb(pct)
+            elif status_tracker:
+                if pct is not None:
+                    status_tracker.update_progress(job_key, pct)
+                if fps is not None:
+                    status_tracker.update_fields(job_key, {"fps": fps})
+                if eta is not None:
+                    status_tracker.update_eta(job_key, eta)
+            if pct is not None and pct >= next_log_pct[0]:
+                logger.info("Encode progress %s: %.0f%%%s", job_key, pct, f" ({fps:.1f} fps)" if fps else "")
+                if job_log is not None:
+                    job_log.write(f"Progress {pct:.0f}%" + (f" ({fps:.1f} fps)" if fps else ""))
+                next_log_pct[0] = (int(pct) // LOG_PROGRESS_STEP_PCT + 1) * LOG_PROGRESS_STEP_PCT
+
+        throttle = ProgressThrottle(push_progress)
+
+        def on_json_block(name, block):
+            if name == "Progress":
+                progress = json_progress(block)
+                if progress:
+                    throttle.update(**progress)
+
+        json_reader = HandBrakeJsonReader(on_json_block)
+        for item in iter_output(proc.stdout, proc.stderr):
+            if item is None:
+                throttle.flush()
+                continue
+            stream_idx, line = item
+            if stream_idx == 0 and not ffmpeg and json_reader.feed(line):
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(PROGRESS_PREFIXES):
+                progress = parse_text_progress(line)
+                if progress:
+                    throttle.update(**progress)
+                continue
+            emit(line)
+        throttle.flush(force=True)
         rc = proc.wait()
         logger.debug("exited with code %s", rc)
+        if exit_cb:
+            exit_cb(rc)
+        if job_log is not None:
+            job_log.write(f"{cmd[0]} exited with code {rc}")
         return rc == 0
     except FileNotFoundError:
         logger.error("Encoder not found on PATH.")
@@ -1528,9 +1794,886 @@ def run_encoder(input_path: str, output_path: str, opts: dict, ffmpeg: bool, sta
             except Exception:
                 logger.debug("Failed to cleanup temp offset file %s", temp_offset_path, exc_info=True)
 
-def process_video(video_file: str, config: Dict[str, Any], output_dir: Path, rip_dir: Path, encoder: Encoder, status_tracker: Optional[StatusTracker] = None, single_job_mode: bool = False) -> bool:
+HB_TO_FFMPEG_AUDIO = {"av_aac": "aac", "av_aac_he": "aac", "opus": "libopus", "ac3": "ac3", "eac3": "eac3"}
+HB_MIXDOWN_CHANNELS = {"mono": 1, "stereo": 2, "dpl2": 2, "5point1": 6, "7point1": 8}
+
+
+def _chunk_workers(config: Dict[str, Any], opts: dict):
+    """Return (concurrent chunks, threads per chunk) for one job's thread budget."""
+    budget = int(opts.get("_thread_budget") or 0) or (os.cpu_count() or 1)
+    if not config.get("chunked_encode"):
+        # resumable-only mode: one segment at a time with the whole budget
+        return 1, budget
+    workers = int(config.get("chunk_workers") or 0)
+    if workers <= 0:
+        # x264/x265 scale well up to a handful of threads; spread the rest across chunks
+        workers = min(8, budget // 4)
+    workers = max(1, workers)
+    return workers, max(1, budget // workers)
+
+
+def should_chunk_encode(video_file: str, config: Dict[str, Any], opts: dict, use_ffmpeg: bool) -> bool:
+    """Segmented encode for long HandBrake jobs: parallel chunks and/or resumable checkpoints."""
+    chunked = bool(config.get("chunked_encode"))
+    resumable = bool(config.get("resumable_encode"))
+    if use_ffmpeg or not (chunked or resumable):
+        return False
+    src = Path(video_file)
+    if not src.is_file():
+        return False
+    # burned/external subtitles need the full timeline in one HandBrake run
+    if opts.get("subtitle_mode") == "burn_forced" or find_external_subtitle(src):
+        return False
+    workers, _threads = _chunk_workers(config, opts)
+    if workers < 2 and not resumable:
+        return False
+    duration = probe_duration_seconds(src)
+    min_sec = int(config.get("chunk_min_source_sec") or 0)
+    return bool(duration) and duration >= max(min_sec, 2 * int(config.get("chunk_seconds") or 300))
+
+
+def _chunk_audio_args(opts: dict, input_path: str, input_index: int = 1) -> list:
+    """ffmpeg -map/-c:a args that mirror the HandBrake audio settings for the single audio pass."""
+    audio_mode = opts.get("audio_mode", "encode")
+    audio_encoder = opts.get("audio_encoder") or "av_aac"
+    mixdown = opts.get("audio_mixdown") or ""
+    if audio_mode == "auto_dolby":
+        source_audio = probe_audio_stream(Path(input_path)) or {}
+        if source_audio.get("codec") in {"ac3", "eac3"}:
+            audio_mode = "copy"
+        else:
+            audio_mode = "encode"
+            audio_encoder = "eac3"
+            channels = source_audio.get("channels")
+            if channels is not None and channels >= 5 and not mixdown:
+                mixdown = "5point1"
+    tracks = [t.strip() for t in str(opts.get("audio_track_list") or "").split(",") if t.strip().isdigit()]
+    langs = opts.get("audio_lang_list") or []
+    if tracks:
+        maps = [f"{input_index}:a:{max(0, int(t) - 1)}?" for t in tracks]
+    elif langs:
+        maps = [f"{input_index}:a:m:language:{lang}?" for lang in langs]
+    elif opts.get("audio_all"):
+        maps = [f"{input_index}:a?"]
+    else:
+        maps = [f"{input_index}:a:0?"]
+    args = []
+    for m in maps:
+        args.extend(["-map", m])
+    if audio_mode == "copy" or audio_encoder == "copy":
+        return args + ["-c:a", "copy"]
+    args.extend(["-c:a", HB_TO_FFMPEG_AUDIO.get(audio_encoder, "aac")])
+    if audio_encoder == "av_aac_he":
+        args.extend(["-profile:a", "aac_he"])
+    if opts.get("audio_bitrate_kbps"):
+        try:
+            args.extend(["-b:a", f"{int(opts.get('audio_bitrate_kbps'))}k"])
+        except Exception:
+            pass
+    if HB_MIXDOWN_CHANNELS.get(mixdown):
+        args.extend(["-ac", str(HB_MIXDOWN_CHANNELS[mixdown])])
+    if opts.get("audio_samplerate"):
+        args.extend(["-ar", str(opts.get("audio_samplerate"))])
+    if opts.get("audio_gain") is not None:
+        try:
+            args.extend(["-af", f"volume={float(opts.get('audio_gain'))}dB"])
+        except Exception:
+            pass
+    return args
+
+
+def _run_tracked(cmd: list, status_tracker: Optional[StatusTracker], job_key: str) -> bool:
+    """Run a helper ffmpeg step registered under the job so Stop can terminate it."""
+    logger = logging.getLogger(__name__)
+    logger.info("Running: %s", " ".join(map(str, cmd)))
+    try:
+        proc = AccountedPopen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except FileNotFoundError:
+        logger.error("%s not found on PATH.", cmd[0])
+        return False
+    if status_tracker:
+        status_tracker.register_proc(job_key, proc)
+    out, _ = proc.communicate()
+    if proc.returncode != 0:
+        logger.error("%s failed rc=%s: %s", cmd[0], proc.returncode, (out or "").strip()[-2000:])
+    if status_tracker and status_tracker.was_canceled(job_key):
+        return False
+    return proc.returncode == 0
+
+
+CHUNK_MANIFEST_VERSION = 1
+# a checkpoint is resumed at most this many times (restarts, killed chunk encoders) before a plain encode
+CHUNK_MAX_RESUMES = 3
+# work dirs of canceled or abandoned segmented encodes are deleted once untouched this long
+CHUNK_WORK_MAX_AGE_SEC = 3 * 86400
+CHUNK_PRUNE_INTERVAL_SEC = 3600
+# a chunk encoder that died from one of these was stopped from outside (shutdown, OOM killer): resumable
+INTERRUPT_SIGNALS = {signal.SIGTERM, signal.SIGKILL, signal.SIGINT, signal.SIGHUP}
+
+
+def _chunk_work_dir(out_path: Path) -> Path:
+    return out_path.parent / f".{out_path.stem}.chunks"
+
+
+def _chunk_manifest_id(input_path: str, opts: dict, seg_sec: int) -> dict:
+    """Identity of a segmented encode; a manifest only resumes when all of it still matches."""
+    st = Path(input_path).stat()
+    # the resolution plan is stored in the manifest instead: a re-plan (or a timed-out scan) must not discard a checkpoint
+    settings = {k: v for k, v in opts.items() if k not in ("_thread_budget", "_apply_audio_offset", "_resolution")}
+    return {
+        "version": CHUNK_MANIFEST_VERSION,
+        "source": str(input_path),
+        "size": st.st_size,
+        "mtime": int(st.st_mtime),
+        "segment_seconds": seg_sec,
+        "settings": json.dumps(settings, sort_keys=True, default=str),
+    }
+
+
+def _chunk_seconds(config: Dict[str, Any]) -> int:
+    return max(30, int(config.get("chunk_seconds") or 300))
+
+
+def resumable_chunk_manifest(input_path: str, out_path: Path, opts: dict, config: Dict[str, Any]) -> Optional[dict]:
+    """The checkpoint run_chunked_encoder would resume for this source, output and settings, if any."""
+    try:
+        identity = _chunk_manifest_id(input_path, opts, _chunk_seconds(config))
+    except OSError:
+        return None
+    return _load_chunk_manifest(_chunk_work_dir(out_path) / "manifest.json", identity)
+
+
+def _load_chunk_manifest(path: Path, identity: dict) -> Optional[dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logging.warning("Ignoring unreadable chunk manifest %s", path)
+        return None
+    if not isinstance(data, dict) or any(data.get(k) != v for k, v in identity.items()):
+        return None
+    return data
+
+
+def _save_chunk_manifest(path: Path, data: dict):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _chunk_interrupted(out_path: Path) -> bool:
+    """True when a segmented encode's checkpoint says it was interrupted rather than failed."""
+    try:
+        data = json.loads((_chunk_work_dir(out_path) / "manifest.json").read_text(encoding="utf-8"))
+    except Exception:
+        return False
+    return isinstance(data, dict) and bool(data.get("interrupted"))
+
+
+def prune_chunk_work_dirs(output_dir: Path, keep=(), max_age_sec: int = CHUNK_WORK_MAX_AGE_SEC):
+    """Delete .<name>.chunks work dirs in output_dir untouched for max_age_sec, except those of outputs in keep."""
+    keep_dirs = {_chunk_work_dir(Path(p)) for p in keep}
+    cutoff = time.time() - max_age_sec
+    try:
+        entries = list(Path(output_dir).glob(".*.chunks"))
+    except OSError:
+        return
+    for work_dir in entries:
+        if work_dir in keep_dirs or not work_dir.is_dir():
+            continue
+        try:
+            mtime = max([work_dir.stat().st_mtime] + [p.stat().st_mtime for p in work_dir.iterdir()])
+        except OSError:
+            continue
+        if mtime < cutoff:
+            logging.info("Removing stale segmented-encode work dir %s", work_dir)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _chunk_crop(input_path: str, opts: dict) -> list:
+    """
+    One crop for every chunk of a segmented encode, so HandBrake's per-chunk autocrop cannot give
+    chunks different frame sizes: the resolution plan's, else one scan of the whole source, else none.
+    """
+    resolution = opts.get("_resolution") or {}
+    if resolution.get("crop"):
+        return list(resolution["crop"])
+    geometry = scan_handbrake_geometry(Path(input_path)) or {}
+    try:
+        return normalize_crop(geometry.get("crop"), int(geometry.get("width") or 0), int(geometry.get("height") or 0))
+    except (TypeError, ValueError):
+        return [0, 0, 0, 0]
+
+
+def _chunk_sizes(paths) -> set:
+    """Distinct (width, height) of the encoded chunks' video streams; (None, None) for any that do not probe."""
+    sizes = set()
+    for path in paths:
+        stream = _first_stream(probe_media(path), "video")
+        sizes.add((stream.get("width"), stream.get("height")))
+    return sizes
+
+
+def run_chunked_encoder(input_path: str, output_path: str, opts: dict, config: Dict[str, Any], status_tracker: Optional[StatusTracker] = None, job_id: Optional[str] = None) -> bool:
+    """
+    Segmented HandBrake encode for long titles:
+    stream-copy the video into keyframe-aligned chunks, encode the chunks (concurrently when
+    chunked_encode is on, video only), then concat them losslessly and mux audio/subtitles once.
+    A manifest next to the output records finished segments, so a restarted job with the same
+    source and settings only encodes what is missing. The work dir is kept until the final mux.
+    Progress is reported to the tracker as one duration-weighted aggregate for the job.
+    """
+    logger = logging.getLogger(__name__)
+    job_key = job_id or str(input_path)
+    out = Path(output_path)
+    work_dir = _chunk_work_dir(out)
+    manifest_path = work_dir / "manifest.json"
+    workers, chunk_threads = _chunk_workers(config, opts)
+    seg_sec = _chunk_seconds(config)
+
+    def canceled() -> bool:
+        return bool(status_tracker and status_tracker.was_canceled(job_key))
+
+    try:
+        identity = _chunk_manifest_id(input_path, opts, seg_sec)
+        manifest = _load_chunk_manifest(manifest_path, identity)
+        if manifest is not None:
+            manifest["attempts"] = int(manifest.get("attempts") or 0) + 1
+            if manifest["attempts"] > CHUNK_MAX_RESUMES:
+                logger.warning("Segmented encode of %s was resumed %d times; giving up on the checkpoint", input_path, CHUNK_MAX_RESUMES)
+                shutil.rmtree(work_dir, ignore_errors=True)
+                return False
+            manifest.pop("interrupted", None)
+            _save_chunk_manifest(manifest_path, manifest)
+        if manifest is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            work_dir.mkdir(parents=True, exist_ok=True)
+            manifest = dict(identity, segments=[])
+        # the plan and crop are fixed when the encode starts; a resume reuses them instead of re-scanning
+        if "resolution" not in manifest:
+            manifest["resolution"] = opts.get("_resolution")
+        opts = dict(opts, _resolution=manifest["resolution"])
+        if manifest.get("crop") is None:
+            manifest["crop"] = _chunk_crop(input_path, opts)
+        _save_chunk_manifest(manifest_path, manifest)
+        done = set(manifest.get("done") or [])
+        segments = manifest.get("segments") or []
+        pending_src = [work_dir / f"src_{i:04d}.mkv" for i in range(len(segments)) if i not in done]
+        resumed = bool(segments) and bool(done)
+        if status_tracker:
+            if resumed:
+                status_tracker.add_event(f"Resuming segmented encode: {input_path} ({len(done)}/{len(segments)} segments already done)")
+            else:
+                status_tracker.add_event(f"Segmented encode started: {input_path} ({workers} parallel chunks x {chunk_threads} threads)")
+        if not segments or not all(p.exists() for p in pending_src):
+            if status_tracker:
+                status_tracker.set_message(job_key, "Splitting source into chunks")
+            # the segment muxer only cuts on keyframes when stream-copying, so chunks are GOP aligned
+            # and a re-split of the same source reproduces the same boundaries
+            split_cmd = [
+                "ffmpeg", "-hide_banner", "-v", "error", "-y",
+                "-i", str(input_path),
+                "-map", "0:v:0", "-c", "copy",
+                "-f", "segment", "-segment_time", str(seg_sec), "-reset_timestamps", "1",
+                "-segment_format", "matroska",
+                str(work_dir / "src_%04d.mkv"),
+            ]
+            if not _run_tracked(split_cmd, status_tracker, job_key):
+                return False
+            chunks = sorted(work_dir.glob("src_*.mkv"))
+            if not chunks:
+                logger.error("Chunk split produced no segments for %s", input_path)
+                return False
+            if segments and len(chunks) != len(segments):
+                logger.warning("Re-split of %s produced %d segments (manifest had %d); starting over", input_path, len(chunks), len(segments))
+                done = set()
+                for stale in work_dir.glob("enc_*.mkv"):
+                    stale.unlink(missing_ok=True)
+            segments = [{"duration": probe_duration_seconds(c) or float(seg_sec)} for c in chunks]
+            for idx in done:
+                (work_dir / f"src_{idx:04d}.mkv").unlink(missing_ok=True)
+            manifest.update(segments=segments, done=sorted(done))
+            _save_chunk_manifest(manifest_path, manifest)
+        weights = [float(seg.get("duration") or seg_sec) for seg in segments]
+        total = sum(weights) or 1.0
+        progress = [100.0 if i in done else 0.0 for i in range(len(segments))]
+        progress_lock = threading.Lock()
+        failed = threading.Event()
+
+        def report(idx: int, pct: float):
+            with progress_lock:
+                progress[idx] = max(progress[idx], pct)
+                agg = sum(w * p for w, p in zip(weights, progress)) / total
+            if status_tracker:
+                status_tracker.update_progress(job_key, agg)
+
+        def checkpoint(idx: int):
+            with progress_lock:
+                done.add(idx)
+                manifest["done"] = sorted(done)
+                _save_chunk_manifest(manifest_path, manifest)
+
+        chunk_opts = dict(opts)
+        chunk_opts["_video_only"] = True
+        chunk_opts["_crop"] = manifest["crop"]
+        chunk_opts["_thread_budget"] = chunk_threads
+        chunk_opts.pop("_apply_audio_offset", None)
+        killed = threading.Event()
+
+        def on_exit(rc):
+            if rc is not None and rc < 0 and -rc in INTERRUPT_SIGNALS:
+                killed.set()
+
+        def encode_chunk(idx: int) -> bool:
+            if failed.is_set() or canceled():
+                return False
+            chunk = work_dir / f"src_{idx:04d}.mkv"
+            dest = work_dir / f"enc_{idx:04d}.mkv"
+            ok = run_encoder(
+                str(chunk), str(dest), chunk_opts, False,
+                status_tracker=status_tracker, job_id=job_key,
+                progress_cb=lambda pct, idx=idx: report(idx, pct), exit_cb=on_exit,
+            )
+            if not ok or not dest.exists():
+                failed.set()
+                return False
+            checkpoint(idx)
+            report(idx, 100.0)
+            try:
+                chunk.unlink()
+            except Exception:
+                pass
+            return True
+
+        todo = [i for i in range(len(segments)) if i not in done]
+        if status_tracker and done:
+            status_tracker.update_progress(job_key, sum(w for i, w in enumerate(weights) if i in done) * 100.0 / total)
+        if status_tracker:
+            status_tracker.set_message(job_key, f"Encoding {len(todo)} of {len(segments)} chunks")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk") as pool:
+            results = list(pool.map(encode_chunk, todo))
+        if canceled() or failed.is_set() or not all(results):
+            if killed.is_set() and not canceled():
+                with progress_lock:
+                    manifest["interrupted"] = True
+                    _save_chunk_manifest(manifest_path, manifest)
+            logger.info("Segmented encode of %s stopped with %d/%d segments done; progress kept in %s", input_path, len(done), len(segments), manifest_path)
+            return False
+
+        if status_tracker:
+            status_tracker.set_message(job_key, "Joining chunks and muxing audio")
+        encoded = [work_dir / f"enc_{i:04d}.mkv" for i in range(len(segments))]
+        sizes = _chunk_sizes(encoded)
+        if len(sizes) != 1 or (None, None) in sizes:
+            logger.error("Encoded chunks of %s differ in frame size (%s); not joining them", input_path,
+                         ", ".join(f"{w}x{h}" for w, h in sorted(sizes, key=str)))
+            return False
+        list_path = work_dir / "concat.txt"
+        list_path.write_text("".join(f"file '{p.name}'\n" for p in encoded), encoding="utf-8")
+        mux_cmd = ["ffmpeg", "-hide_banner", "-v", "error", "-y", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+        audio_offset_ms = opts.get("audio_offset_ms")
+        if opts.get("_apply_audio_offset") and audio_offset_ms not in (None, "", 0, "0"):
+            try:
+                mux_cmd.extend(["-itsoffset", str(float(audio_offset_ms) / 1000.0)])
+            except Exception:
+                pass
+        mux_cmd.extend(["-i", str(input_path), "-map", "0:v:0"])
+        mux_cmd.extend(_chunk_audio_args(opts, input_path))
+        if opts.get("subtitle_mode") == "copy_all" and out.suffix.lower() == ".mkv":
+            mux_cmd.extend(["-map", "1:s?", "-c:s", "copy"])
+        # mux inside the work dir and move into place, so a crash never leaves a partial output
+        # that a restarted job would mistake for a finished encode
+        muxed = work_dir / f"muxed{out.suffix}"
+        mux_cmd.extend(["-c:v", "copy", str(muxed)])
+        if not _run_tracked(mux_cmd, status_tracker, job_key):
+            muxed.unlink(missing_ok=True)
+            return False
+        os.replace(muxed, out)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return True
+    except Exception:
+        logger.exception("Chunked encode failed for %s", input_path)
+        return False
+
+
+def remux_plan_for(video_file: str, config: Dict[str, Any], config_str: str, hb_opts: dict) -> Tuple[Optional[dict], str]:
+    """Remux plan for a source under a profile when remux_mode is auto, else (None, reason)."""
+    if config.get("remux_mode") != "auto":
+        return None, "remux_mode is off"
+    if str(config_str).startswith("ffmpeg"):
+        return None, "ffmpeg profile"
+    src = Path(video_file)
+    if not src.is_file():
+        return None, "source is not a file"
+    external_sub = find_external_subtitle(src)
+    return plan_remux(
+        probe_media(src),
+        hb_opts,
+        estimate_target_bitrate_kbps(config_str, hb_opts),
+        hb_opts.get("extension", ".mkv"),
+        str(external_sub) if external_sub else None,
+    )
+
+
+def run_remux(input_path: str, output_path: str, opts: dict, plan: dict, status_tracker: Optional[StatusTracker] = None, job_id: Optional[str] = None) -> bool:
+    """
+    Stream-copy the source video into the profile's container with ffmpeg; audio is copied or
+    transcoded and subtitles mapped as the plan says. The mux goes to a hidden file next to the
+    output and is renamed into place, so a crash never leaves a partial file that looks finished.
+    """
+    logger = logging.getLogger(__name__)
+    job_key = job_id or str(input_path)
+    out = Path(output_path)
+    tmp = out.with_name(f".{out.stem}.remux{out.suffix}")
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-y", "-i", str(input_path)]
+    if plan.get("external_sub"):
+        cmd.extend(["-i", str(plan["external_sub"])])
+    cmd.extend(["-map", "0:v:0", "-c:v", "copy"])
+    if plan.get("video_codec") == "hevc" and out.suffix.lower() in (".mp4", ".m4v"):
+        # Apple players only open HEVC in mp4 with the hvc1 sample entry
+        cmd.extend(["-tag:v", "hvc1"])
+    if plan.get("audio") == "copy":
+        cmd.extend(_chunk_audio_args(dict(opts, audio_mode="copy"), input_path, input_index=0))
+    elif plan.get("audio") == "transcode":
+        cmd.extend(_chunk_audio_args(opts, input_path, input_index=0))
+    cmd.extend(remux_subtitle_args(plan))
+    cmd.extend(["-map_metadata", "0", "-map_chapters", "0", "-progress", "pipe:1", "-nostats", str(tmp)])
+    logger.info("Running remux: %s", " ".join(cmd))
+    try:
+        proc = AccountedPopen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    except FileNotFoundError:
+        logger.error("ffmpeg not found on PATH.")
+        return False
+    job_log = None
+    if status_tracker:
+        status_tracker.register_proc(job_key, proc)
+        job_log = status_tracker.job_log(job_key, f"Running ffmpeg: {' '.join(cmd)}")
+    emit = job_log.write if job_log is not None else logger.info
+
+    def push_progress(pct, fps, eta):
+        if not status_tracker:
+            return
+        if pct is not None:
+            status_tracker.update_progress(job_key, pct)
+        if fps is not None:
+            status_tracker.update_fields(job_key, {"fps": fps})
+        if eta is not None:
+            status_tracker.update_eta(job_key, eta)
+
+    throttle = ProgressThrottle(push_progress)
+    reader = FfmpegProgressReader(plan.get("duration_sec"), throttle.update)
+    rc = None
+    try:
+        for item in iter_output(proc.stdout, proc.stderr):
+            if item is None:
+                throttle.flush()
+                continue
+            stream_idx, line = item
+            if stream_idx == 0 and reader.feed(line):
+                continue
+            line = line.strip()
+            if line:
+                emit(line)
+        throttle.flush(force=True)
+        rc = proc.wait()
+    except Exception:
+        logger.exception("Remux run failed for %s", input_path)
+        try:
+            proc.kill()
+        except Exception:
+            pass
+    if job_log is not None:
+        job_log.write(f"ffmpeg exited with code {rc}")
+    if rc != 0 or (status_tracker and status_tracker.was_canceled(job_key)) or not tmp.exists() or tmp.stat().st_size <= 0:
+        tmp.unlink(missing_ok=True)
+        return False
+    os.replace(tmp, out)
+    return True
+
+
+# HandBrake video encoder -> (ffmpeg encoder, pixel format keeping its bit depth) for the live
+# encode-while-ripping path; a profile whose encoder is missing here is never encoded live
+HB_TO_FFMPEG_VIDEO = {
+    "x264": ("libx264", None),
+    "x264_10bit": ("libx264", "yuv420p10le"),
+    "x265": ("libx265", None),
+    "x265_10bit": ("libx265", "yuv420p10le"),
+    "x265_12bit": ("libx265", "yuv420p12le"),
+    "svt_av1": ("libsvtav1", None),
+    "svt_av1_10bit": ("libsvtav1", "yuv420p10le"),
+    "qsv_h264": ("h264_qsv", None),
+    "qsv_h265": ("hevc_qsv", None),
+    "qsv_h265_10bit": ("hevc_qsv", "p010le"),
+    "qsv_av1": ("av1_qsv", None),
+    "qsv_av1_10bit": ("av1_qsv", "p010le"),
+    "nvenc_h264": ("h264_nvenc", None),
+    "nvenc_h265": ("hevc_nvenc", None),
+    "nvenc_h265_10bit": ("hevc_nvenc", "p010le"),
+    "nvenc_av1": ("av1_nvenc", None),
+    "nvenc_av1_10bit": ("av1_nvenc", "p010le"),
+    "vce_h264": ("h264_amf", None),
+    "vce_h265": ("hevc_amf", None),
+    "vce_h265_10bit": ("hevc_amf", "p010le"),
+    "vce_av1": ("av1_amf", None),
+}
+
+
+class RipFollower:
+    """
+    Shared state between a running MakeMKV rip and the encoder following its output file.
+    rip_disc feeds PRGV percentages in; each tick snapshots the file size so the reader only
+    consumes bytes that were already on disk one progress tick earlier.
+    """
+
+    def __init__(self, rip_dir: Path, title_id: int, lag_bytes: int):
+        self.rip_dir = rip_dir
+        self.title_id = title_id
+        self.lag_bytes = max(0, int(lag_bytes))
+        self.started_at = time.time()
+        self._cond = threading.Condition()
+        self._pct = 0.0
+        self._path: Optional[Path] = None
+        self._safe_size = 0
+        self._tick_size = 0
+        self._done = False
+        self._ok = False
+        self._final_path: Optional[Path] = None
+
+    def _discover(self) -> Optional[Path]:
+        pattern = re.compile(rf".*_t0*{self.title_id}\.mkv$", re.IGNORECASE)
+        try:
+            for p in self.rip_dir.glob("*.mkv"):
+                if p.name.startswith("._") or not pattern.match(p.name):
+                    continue
+                if p.stat().st_mtime >= self.started_at - 1:
+                    return p
+        except Exception:
+            logging.debug("Failed to look for growing rip file in %s", self.rip_dir, exc_info=True)
+        return None
+
+    def on_progress(self, pct: float):
+        with self._cond:
+            if self._path is None:
+                self._path = self._discover()
+            if self._path is not None:
+                try:
+                    size = self._path.stat().st_size
+                except OSError:
+                    size = self._tick_size
+                # bytes present at the previous tick are settled; the newest tick may still be in flight
+                self._safe_size = max(self._safe_size, self._tick_size)
+                self._tick_size = size
+            self._pct = max(self._pct, float(pct))
+            self._cond.notify_all()
+
+    def finish(self, ok: bool, final_path: Optional[str]):
+        with self._cond:
+            self._done = True
+            self._ok = bool(ok)
+            self._final_path = Path(final_path) if final_path else None
+            self._cond.notify_all()
+
+    def wait_for_file(self, timeout: float = 1.0) -> Optional[Path]:
+        with self._cond:
+            if self._path is None and not self._done:
+                self._cond.wait(timeout)
+            if self._path is None and not self._done:
+                self._path = self._discover()
+            return self._path
+
+    def wait_tick(self, timeout: float = 1.0):
+        with self._cond:
+            if not self._done:
+                self._cond.wait(timeout)
+
+    def readable_limit(self, current_size: int) -> int:
+        """Bytes the follower may read: everything once the rip ended, else stay behind the writer."""
+        with self._cond:
+            if self._done:
+                return current_size
+            return max(0, min(self._safe_size, current_size - self.lag_bytes))
+
+    def estimated_total(self, current_size: int) -> Optional[int]:
+        with self._cond:
+            if self._done:
+                return current_size
+            if self._pct >= 1.0:
+                return int(current_size * 100.0 / self._pct)
+            return None
+
+    @property
+    def pct(self) -> float:
+        with self._cond:
+            return self._pct
+
+    @property
+    def done(self) -> bool:
+        with self._cond:
+            return self._done
+
+    @property
+    def ok(self) -> bool:
+        with self._cond:
+            return self._ok
+
+    @property
+    def final_path(self) -> Optional[Path]:
+        with self._cond:
+            return self._final_path
+
+
+def live_encode_blocker(opts: dict) -> Optional[str]:
+    """Why a profile cannot be encoded from a growing file with ffmpeg, or None when it can."""
+    encoder = str(opts.get("encoder") or "x264")
+    if encoder not in HB_TO_FFMPEG_VIDEO:
+        return f"encoder {encoder} has no ffmpeg equivalent"
+    if opts.get("video_bitrate_kbps") and opts.get("two_pass"):
+        return "two-pass encode"
+    if opts.get("subtitle_mode") == "burn_forced":
+        return "burned subtitles"
+    if opts.get("extra_args"):
+        return "extra HandBrake arguments"
+    if opts.get("_apply_audio_offset") and opts.get("audio_offset_ms") not in (None, "", 0, "0"):
+        return "audio offset"
+    return None
+
+
+def _growing_video_args(opts: dict) -> list:
+    """ffmpeg video args matching the HandBrake profile and resolution plan (HandBrakeCLI cannot read a growing file)."""
+    codec, pix_fmt = HB_TO_FFMPEG_VIDEO[str(opts.get("encoder") or "x264")]
+    args = ["-map", "0:v:0", "-c:v", codec]
+    bitrate = opts.get("video_bitrate_kbps")
+    quality = opts.get("quality")
+    if bitrate:
+        try:
+            args.extend(["-b:v", f"{int(bitrate)}k"])
+        except Exception:
+            pass
+    elif quality not in (None, ""):
+        if codec.startswith("lib"):
+            args.extend(["-crf", str(quality)])
+        elif codec.endswith("_nvenc"):
+            args.extend(["-rc", "vbr", "-cq", str(quality)])
+        elif codec.endswith("_amf"):
+            args.extend(["-rc", "cqp", "-qp_i", str(quality), "-qp_p", str(quality)])
+        else:
+            args.extend(["-global_quality", str(quality)])
+    if pix_fmt:
+        args.extend(["-pix_fmt", pix_fmt])
+    resolution = opts.get("_resolution") or {}
+    try:
+        if resolution.get("width") and resolution.get("height"):
+            # the same crop and output size HandBrake would use for this profile
+            top, bottom, left, right = (int(v) for v in resolution.get("crop") or (0, 0, 0, 0))
+            filters = [f"crop=iw-{left + right}:ih-{top + bottom}:{left}:{top}"] if top or bottom or left or right else []
+            filters.append(f"scale={int(resolution['width'])}:{int(resolution['height'])}")
+            args.extend(["-vf", ",".join(filters)])
+        else:
+            width = opts.get("width", 1920)
+            height = opts.get("height", 1080)
+            args.extend([
+                "-vf",
+                f"scale='min({int(width)},iw)':'min({int(height)},ih)':force_original_aspect_ratio=decrease:force_divisible_by=2",
+            ])
+    except Exception:
+        pass
+    return args
+
+
+def run_growing_encoder(follower: RipFollower, source: Path, output_path: str, opts: dict, status_tracker: Optional[StatusTracker] = None, job_id: Optional[str] = None) -> bool:
+    """
+    Encode an MKV that MakeMKV is still writing: a feeder thread streams the file into
+    ffmpeg's stdin while staying behind the writer, and closes the pipe once the rip ends.
+    Returns False if the rip fails, the job is stopped, or ffmpeg exits non-zero.
+    """
+    logger = logging.getLogger(__name__)
+    job_key = job_id or str(source)
+    out = Path(output_path)
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error", "-y", "-f", "matroska", "-i", "pipe:0"]
+    cmd.extend(_growing_video_args(opts))
+    cmd.extend(_chunk_audio_args(opts, str(source), input_index=0))
+    if opts.get("subtitle_mode") == "copy_all" and out.suffix.lower() == ".mkv":
+        cmd.extend(["-map", "0:s?", "-c:s", "copy"])
+    cmd.append(str(out))
+    cmd = _apply_thread_budget(cmd, str(opts.get("encoder") or "x264"), opts.get("_thread_budget"), ffmpeg=True)
+    logger.info("Running live ffmpeg on growing rip %s: %s", source, " ".join(cmd))
+    try:
+        proc = AccountedPopen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    except FileNotFoundError:
+        logger.error("ffmpeg not found on PATH.")
+        return False
+    job_log = None
+    if status_tracker:
+        status_tracker.register_proc(job_key, proc)
+        job_log = status_tracker.job_log(job_key, f"Running ffmpeg: {' '.join(cmd)}")
+    emit = job_log.write if job_log is not None else logger.info
+    feed_error = []
+
+    def feed():
+        pos = 0
+        last_report = 0.0
+        try:
+            with source.open("rb") as fh:
+                while proc.poll() is None:
+                    # fstat follows the open inode, so MakeMKV finishing and the rename step do not matter
+                    size = os.fstat(fh.fileno()).st_size
+                    limit = follower.readable_limit(size)
+                    if pos < limit:
+                        data = fh.read(min(1024 * 1024, limit - pos))
+                        if not data:
+                            follower.wait_tick(0.5)
+                            continue
+                        proc.stdin.write(data)
+                        pos += len(data)
+                    elif follower.done:
+                        break
+                    else:
+                        follower.wait_tick(1.0)
+                    now = time.time()
+                    if status_tracker and now - last_report >= 1.0:
+                        last_report = now
+                        total = follower.estimated_total(size)
+                        if total:
+                            status_tracker.update_progress(job_key, min(99.0, pos * 100.0 / total))
+                        status_tracker.set_message(job_key, f"Encoding while ripping (rip {follower.pct:.1f}%)")
+            if follower.done and not follower.ok:
+                feed_error.append("rip failed")
+                proc.terminate()
+        except (BrokenPipeError, ValueError):
+            pass
+        except Exception as exc:
+            logger.exception("Growing-file feeder failed for %s", source)
+            feed_error.append(str(exc))
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        finally:
+            try:
+                proc.stdin.close()
+            except Exception:
+                pass
+
+    feeder = threading.Thread(target=feed, name="rip-follow", daemon=True)
+    feeder.start()
+    rc = None
+    try:
+        for item in iter_output(proc.stdout, proc.stderr):
+            if item is None:
+                continue
+            line = item[1].strip()
+            if line:
+                emit(line)
+        rc = proc.wait()
+    except Exception:
+        logger.exception("Live ffmpeg output reader failed for %s", source)
+        try:
+            proc.kill()
+        except Exception:
+            pass
+    feeder.join(timeout=5)
+    if job_log is not None:
+        job_log.write(f"ffmpeg exited with code {rc}")
+    if status_tracker and status_tracker.was_canceled(job_key):
+        return False
+    if feed_error or rc != 0:
+        logger.error("Live encode of %s failed rc=%s %s", source, rc, "; ".join(feed_error))
+        try:
+            out.unlink(missing_ok=True)
+        except Exception:
+            pass
+        return False
+    return True
+
+
+def profile_options(config: Dict[str, Any], config_str: str, single_job_mode: bool = False, thread_budget: Optional[int] = None) -> dict:
+    """Encode options for a profile section, with the per-job flags process_video and the live encode share."""
+    hb_opts = dict(config.get(config_str, {}) or {})
+    if single_job_mode:
+        hb_opts["_apply_audio_offset"] = True
+    if thread_budget:
+        hb_opts["_thread_budget"] = thread_budget
+    return hb_opts
+
+
+def apply_resolution_plan(video_file: str, out_path: Path, hb_opts: dict, config: Dict[str, Any],
+                          status_tracker: Optional[StatusTracker], job_key: str) -> Optional[dict]:
+    """
+    Plan the output size for a HandBrake profile into hb_opts["_resolution"] and record it on the job.
+    A segmented encode being resumed keeps the plan its finished chunks used (and skips the scan).
+    """
+    resumable = resumable_chunk_manifest(video_file, out_path, hb_opts, config)
+    if resumable is not None and "resolution" in resumable:
+        resolution_plan = resumable["resolution"]
+    else:
+        resolution_plan = plan_output_resolution(video_file, hb_opts)
+    if resolution_plan:
+        hb_opts["_resolution"] = resolution_plan
+        logging.info("Output size for %s: %sx%s (source %sx%s, crop %s, max %sx%s, mod %s)", video_file,
+                     resolution_plan["width"], resolution_plan["height"], *resolution_plan["source"],
+                     "/".join(map(str, resolution_plan["crop"])), *resolution_plan["max"], resolution_plan["modulus"])
+        if status_tracker:
+            status_tracker.update_fields(job_key, {"resolution": resolution_plan})
+    return resolution_plan
+
+
+def finish_encoded_job(job_key: str, out_path: Path, config: Dict[str, Any], status_tracker: Optional[StatusTracker],
+                       rip_file: Optional[Path] = None, source_file: Optional[Path] = None, message: str = "Encode complete"):
+    """
+    Post-encode steps shared by process_video and encode-while-ripping, run once the output passed
+    encoded_output_ok: move it to final_dir, delete the MakeMKV rip (unless makemkv_keep_ripped)
+    or the consumed source file with its sidecars and USB bookkeeping, and complete the job.
+    """
+    if status_tracker and status_tracker.disc_present() is False:
+        status_tracker.clear_disc_info()
+    dest_str = str(out_path)
+    # move final file to final_dir if specified
+    final_dir = config.get("final_dir", "")
+    if final_dir != "":
+        try:
+            final_path = Path(final_dir).expanduser() / out_path.name
+            if safe_move(out_path, final_path):
+                # create a blank file at the original location to indicate completion
+                out_path.touch()
+                logging.info("Moved encoded file to final directory: %s", final_path)
+        except Exception:
+            logging.debug("Failed to move encoded file to final directory: %s", final_dir, exc_info=True)
+    if rip_file is not None and not config.get("makemkv_keep_ripped"):
+        try:
+            # delete ripped file to save space
+            rip_file.unlink()
+            logging.info("Deleted ripped Blu-ray file: %s", rip_file)
+        except Exception:
+            logging.debug("Failed to delete ripped file: %s", rip_file, exc_info=True)
+    elif rip_file is not None:
+        logging.info("Keeping ripped Blu-ray file per config: %s", rip_file)
+    # Remove source file after a successful encode to avoid re-encoding
+    if source_file is not None:
+        try:
+            if source_file.is_file():
+                source_file.unlink()
+                logging.info("Deleted source file after successful encode: %s", source_file)
+        except Exception:
+            logging.debug("Failed to delete source file %s", source_file, exc_info=True)
+        cleanup_sidecars_and_allowlist(source_file)
+        # mark original USB source as encoded to avoid re-queuing
+        try:
+            orig_src = USB_ORIGIN_MAP.pop(str(source_file), None)
+            if orig_src:
+                try:
+                    mark_usb_encoded(Path(orig_src))
+                except Exception:
+                    logging.debug("Failed to mark USB source encoded: %s", orig_src, exc_info=True)
+        except Exception:
+            logging.debug("Failed USB origin bookkeeping for %s", source_file, exc_info=True)
+        cleanup_usb_staging(source_file, config)
+    if status_tracker:
+        status_tracker.complete(job_key, True, dest_str, message)
+
+
+def process_video(video_file: str, config: Dict[str, Any], output_dir: Path, rip_dir: Path, encoder: Encoder, status_tracker: Optional[StatusTracker] = None, single_job_mode: bool = False, thread_budget: Optional[int] = None) -> bool:
     config_str = config.get("profile", "ffmpeg") 
-    final_dir = config.get("final_dir", "")   
     # check if dvd, bluray, or video file    
     is_dvd = False
     is_bluray = False
@@ -1592,7 +2735,12 @@ def process_video(video_file: str, config: Dict[str, Any], output_dir: Path, rip
         status_tracker.add_event(f"Queued for encode: {src}")
         status_tracker.start(str(src), dest_str, info=source_info, state="queued")
     if status_tracker:
-        status_tracker.update_fields(str(src), {"encoder": hb_opts.get("encoder"), "profile": config_str})
+        status_tracker.update_fields(str(src), {
+            "encoder": hb_opts.get("encoder"),
+            "profile": config_str,
+            # lets history compare CPU-seconds per source minute across profiles
+            "source_duration_sec": probe_duration_seconds(Path(video_file)),
+        })
 
     # skip if output already exists
     if out_path.exists():
@@ -1665,22 +2813,63 @@ def process_video(video_file: str, config: Dict[str, Any], output_dir: Path, rip
             status_tracker.complete(str(src), False, dest_str, "No video file to encode")
         return False
     # prefer HandBrakeCLI; if it fails, fall back to encoder.encode_video if available
-    if single_job_mode:
-        hb_opts["_apply_audio_offset"] = True
+    hb_opts = profile_options(config, config_str, single_job_mode, thread_budget)
     use_ffmpeg = str(config_str).startswith("ffmpeg")
     logging.info("Selected profile=%s encoder=%s ext=%s out=%s use_ffmpeg=%s audio_mode=%s audio_kbps=%s",
                  config_str, hb_opts.get("encoder"), extension, out_path, use_ffmpeg,
                  hb_opts.get("audio_mode"), hb_opts.get("audio_bitrate_kbps"))
     if status_tracker:
         status_tracker.set_state(str(src), "running")
-    success = run_encoder(video_file, str(out_path), hb_opts, use_ffmpeg, status_tracker=status_tracker, job_id=str(src))
+    success = False
+    remux_plan, remux_reason = remux_plan_for(video_file, config, config_str, hb_opts)
+    if remux_plan is None and config.get("remux_mode") == "auto":
+        logging.info("Not remuxing %s: %s", video_file, remux_reason)
+    if remux_plan is not None:
+        logging.info("Remuxing %s -> %s (%s %sx%s, %s kbps <= %s kbps, audio %s)", video_file, out_path,
+                     remux_plan["video_codec"], remux_plan["width"], remux_plan["height"],
+                     remux_plan["source_kbps"], remux_plan["target_kbps"], remux_plan["audio"])
+        if status_tracker:
+            status_tracker.update_fields(str(src), {"remux": remux_plan})
+            status_tracker.set_message(str(src), "Remuxing (stream copy)")
+            status_tracker.add_event(f"Remuxing without re-encode: {src}")
+        success = run_remux(video_file, str(out_path), hb_opts, remux_plan, status_tracker=status_tracker, job_id=str(src))
+        if not success and not (status_tracker and status_tracker.was_canceled(str(src))):
+            logging.warning("Remux failed for %s; encoding instead", video_file)
+            remux_plan = None
+            if status_tracker:
+                status_tracker.add_event(f"Remux failed; encoding instead: {src}", level="error")
+                status_tracker.update_fields(str(src), {"remux": None})
+                status_tracker.set_message(str(src), "Remux failed; encoding")
+                status_tracker.update_progress(str(src), 0.0)
+    if remux_plan is None:
+        if not use_ffmpeg:
+            apply_resolution_plan(video_file, out_path, hb_opts, config, status_tracker, str(src))
+        if should_chunk_encode(video_file, config, hb_opts, use_ffmpeg):
+            success = run_chunked_encoder(video_file, str(out_path), hb_opts, config, status_tracker=status_tracker, job_id=str(src))
+            canceled = bool(status_tracker and status_tracker.was_canceled(str(src)))
+            if not success and config.get("resumable_encode") and (canceled or _chunk_interrupted(out_path)):
+                # stopped from outside (cancel, killed encoder): keep the checkpoint so a retry, the next
+                # pass or a restart resumes from the last finished segment
+                logging.warning("Segmented encode interrupted for %s; checkpoint kept for resume", video_file)
+                if status_tracker and not canceled:
+                    status_tracker.complete(str(src), False, dest_str, "Segmented encode interrupted; will resume from checkpoint")
+                return False
+            if not success and canceled:
+                shutil.rmtree(_chunk_work_dir(out_path), ignore_errors=True)
+            if not success and not canceled:
+                # a real failure (chunk encode, split or mux) would fail the same way again: drop the checkpoint
+                shutil.rmtree(_chunk_work_dir(out_path), ignore_errors=True)
+                logging.warning("Chunked encode failed for %s; retrying as a single HandBrake run", video_file)
+                if status_tracker:
+                    status_tracker.add_event(f"Chunked encode failed; retrying without chunks: {src}", level="error")
+                    status_tracker.update_progress(str(src), 0.0)
+                success = run_encoder(video_file, str(out_path), hb_opts, use_ffmpeg, status_tracker=status_tracker, job_id=str(src))
+        else:
+            success = run_encoder(video_file, str(out_path), hb_opts, use_ffmpeg, status_tracker=status_tracker, job_id=str(src))
+    # the input is deleted after a successful encode (Blu-ray rips unless kept, plain sources always)
+    doomed = None if is_dvd or (is_bluray and keep_ripped) else Path(video_file)
     if success:
-        try:
-            if not out_path.exists() or out_path.stat().st_size <= 0:
-                logging.warning("Encode reported success but output is missing/empty: %s", out_path)
-                success = False
-        except Exception:
-            logging.debug("Output existence/size check failed for %s", out_path, exc_info=True)
+        success = encoded_output_ok(out_path, doomed)
     if status_tracker and status_tracker.was_canceled(str(src)):
         logging.info("Job was canceled by user: %s", src)
         return False
@@ -1705,60 +2894,323 @@ def process_video(video_file: str, config: Dict[str, Any], output_dir: Path, rip
                 status_tracker.complete(str(src), False, dest_str, "Fallback encoder failed")
             return False
     else:
-        logging.info("Encoded %s -> %s (HandBrakeCLI)", video_file, out_path)
+        logging.info("Encoded %s -> %s (%s)", video_file, out_path, "remux" if remux_plan else "HandBrakeCLI")
         if status_tracker and not status_tracker.was_canceled(str(src)):
-            status_tracker.add_event(f"Encoding complete: {src}")
-        if status_tracker and status_tracker.disc_present() is False:
-            status_tracker.clear_disc_info()
-        # move final file to final_dir if specified
-        if final_dir != "":
-            try:
-                final_path = Path(final_dir).expanduser() / out_path.name
-                if safe_move(out_path, final_path):
-                    # create a blank file at the original location to indicate completion
-                    out_path.touch()
-                    logging.info("Moved encoded file to final directory: %s", final_path)
-            except Exception:
-                logging.debug("Failed to move encoded file to final directory: %s", final_dir, exc_info=True)
-        if is_bluray and not keep_ripped:
-            try:
-                # delete ripped file to save space
-                rip_fp = Path(video_file)
-                rip_fp.unlink()
-                logging.info("Deleted ripped Blu-ray file: %s", rip_fp)
-            except Exception:
-                logging.debug("Failed to delete ripped Blu-ray file: %s", video_file, exc_info=True)
-        elif is_bluray and keep_ripped:
-            logging.info("Keeping ripped Blu-ray file per config: %s", video_file)
-        # Remove source file after a successful encode to avoid re-encoding
-        if not is_dvd and not is_bluray:
-            try:
-                if src.is_file():
-                    src.unlink()
-                    logging.info("Deleted source file after successful encode: %s", src)
-            except Exception:
-                logging.debug("Failed to delete source file %s", src, exc_info=True)
-            cleanup_sidecars_and_allowlist(src)
-            # mark original USB source as encoded to avoid re-queuing
+            status_tracker.add_event(f"{'Remux' if remux_plan else 'Encoding'} complete: {src}")
+        finish_encoded_job(str(src), out_path, config, status_tracker,
+                           rip_file=Path(video_file) if is_bluray else None,
+                           source_file=None if is_dvd or is_bluray else src,
+                           message="Remux complete" if remux_plan else "Encode complete")
+    return True
+
+class EncodeWorkerPool:
+    """
+    Fixed set of encode slots fed in submission (FIFO) order.
+    Each slot gets an equal share of the host CPUs as its encoder thread budget.
+    Jobs wait in the pool's own queue until a slot is free, so a resize never drops queued jobs
+    and jobs still running on a replaced executor keep counting against the new slot limit.
+    """
+
+    def __init__(self, slots: int = 1, threads_per_job: int = 0):
+        self._lock = threading.Lock()
+        # key -> future of a running job, or None while it waits for a slot
+        self._inflight = {}
+        self._waiting = collections.deque()
+        self._running = 0
+        self._executor = None
+        self._slots = 0
+        self._threads_per_job = 1
+        self.resize(slots, threads_per_job)
+
+    def resize(self, slots: int, threads_per_job: int = 0):
+        slots = max(1, int(slots or 1))
+        cores = os.cpu_count() or 1
+        budget = int(threads_per_job or 0) or max(1, cores // slots)
+        old = None
+        with self._lock:
+            self._threads_per_job = budget
+            if self._executor is not None and slots == self._slots:
+                return
+            old = self._executor
+            self._executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix="encode")
+            self._slots = slots
+            started = self._dispatch()
+        self._watch(started)
+        if old is not None:
+            logging.info("Encode pool resized to %d slot(s), %d thread(s) per job", slots, budget)
+            # nothing is queued on the old executor; its running jobs finish there and free slots as they end
+            old.shutdown(wait=False)
+
+    def _dispatch(self) -> list:
+        """Start waiting jobs while fewer than slots run (caller holds self._lock); returns (key, future) pairs to watch."""
+        started = []
+        while self._waiting and self._executor is not None and self._running < self._slots:
+            key, fn, args, kwargs = self._waiting.popleft()
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+            self._running += 1
+            started.append((key, future))
+        return started
+
+    def _watch(self, started: list):
+        # outside the lock: a future that already finished runs its callback right here
+        for key, future in started:
+            future.add_done_callback(lambda fut, key=key: self._done(key, fut))
+
+    def _done(self, key: str, fut):
+        with self._lock:
+            self._running -= 1
+            if self._inflight.get(key) is fut:
+                self._inflight.pop(key, None)
+            started = self._dispatch()
+        self._watch(started)
+
+    @property
+    def slots(self) -> int:
+        with self._lock:
+            return self._slots
+
+    @property
+    def threads_per_job(self) -> int:
+        with self._lock:
+            return self._threads_per_job
+
+    def is_inflight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._inflight
+
+    def inflight_count(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def submit(self, key: str, fn, *args, **kwargs) -> bool:
+        with self._lock:
+            if key in self._inflight or self._executor is None:
+                return False
+            self._inflight[key] = None
+            self._waiting.append((key, fn, args, kwargs))
+            started = self._dispatch()
+        self._watch(started)
+        return True
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            for key, _fn, _args, _kwargs in self._waiting:
+                self._inflight.pop(key, None)
+            self._waiting.clear()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _run_encode_job(video_file: str, config: Dict[str, Any], output_dir: Path, rip_dir: Path, encoder: Encoder, status_tracker: Optional[StatusTracker], single_job_mode: bool, thread_budget: int):
+    """Worker entry point for one encode slot."""
+    if status_tracker:
+        if not status_tracker.has_active(str(video_file)) and status_tracker.was_canceled(str(video_file)):
+            return False
+        status_tracker.set_state(str(video_file), "starting")
+    try:
+        out = process_video(video_file, config, output_dir, rip_dir, encoder, status_tracker, single_job_mode=single_job_mode, thread_budget=thread_budget)
+        print(f"✅ {video_file} → {out}")
+        return out
+    except Exception as e:
+        logging.exception("Encode worker failed for %s", video_file)
+        print(f"❌ {video_file}: {e}")
+        return False
+    finally:
+        # SMB copies wait for an idle encoder; let the main loop start them right away
+        if status_tracker and status_tracker.has_smb_pending():
+            status_tracker.wake()
+
+
+def _disc_profile_key(video_file: str, config: Dict[str, Any]) -> str:
+    """Profile section for a ripped file, from the .disc_type marker MakeMKV rips leave behind."""
+    try:
+        marker = Path(video_file).parent / ".disc_type"
+        if marker.is_file():
+            disc_type_marker = marker.read_text(encoding="utf-8", errors="ignore").strip().lower()
+            if "bluray" in disc_type_marker:
+                return "handbrake_br"
+            if "dvd" in disc_type_marker:
+                return "handbrake_dvd"
+    except Exception:
+        pass
+    return config.get("profile", "ffmpeg")
+
+
+def _run_live_encode_job(follower: RipFollower, config: Dict[str, Any], output_dir: Path, rip_dir: Path, encoder: Encoder, status_tracker: StatusTracker, thread_budget: int):
+    """
+    Encode slot entry point for encode-while-ripping. If the slot only frees up after the
+    rip finished, or the live encode fails, the finished rip goes through process_video instead.
+    """
+    source = None
+    while source is None and not follower.done:
+        source = follower.wait_for_file(1.0)
+    if source is None or follower.done:
+        while not follower.done:
+            follower.wait_tick(5.0)
+        if follower.ok and follower.final_path:
+            return _run_encode_job(str(follower.final_path), config, output_dir, rip_dir, encoder, status_tracker, False, thread_budget)
+        return False
+    key = str(source)
+    config_str = _disc_profile_key(key, config)
+    # the same options the finished rip would get from process_video (rip hand-offs never apply the audio offset)
+    opts = profile_options(config, config_str, False, thread_budget)
+    blocker = "ffmpeg profile" if str(config_str).startswith("ffmpeg") else live_encode_blocker(opts)
+    if blocker:
+        logging.info("Not encoding %s while ripping (%s); encoding the finished rip instead", source, blocker)
+        status_tracker.add_event(f"Encode while ripping skipped ({blocker}); waiting for the rip: {source}")
+        while not follower.done:
+            follower.wait_tick(5.0)
+        if follower.ok and follower.final_path:
+            return _run_encode_job(str(follower.final_path), config, output_dir, rip_dir, encoder, status_tracker, False, thread_budget)
+        return False
+    out_path = compute_output_path(key, config, output_dir)
+    dest_str = str(out_path)
+    if not status_tracker.has_active(key):
+        status_tracker.start(key, dest_str, info=None, state="running", kind="live_rip")
+    status_tracker.update_fields(key, {"encoder": opts.get("encoder"), "profile": config_str})
+    apply_resolution_plan(key, out_path, opts, config, status_tracker, key)
+    status_tracker.add_event(f"Encoding while ripping: {source}")
+    ok = run_growing_encoder(follower, source, dest_str, opts, status_tracker=status_tracker, job_id=key)
+    if status_tracker.was_canceled(key):
+        logging.info("Live encode was canceled by user: %s", source)
+        return False
+    while not follower.done:
+        follower.wait_tick(5.0)
+    final_src = Path(follower.final_path or source)
+    if ok and not encoded_output_ok(out_path, final_src):
+        # ffmpeg exited 0 but the output is short or missing: encode the finished rip instead
+        ok = False
+    if not ok:
+        if not (follower.ok and follower.final_path):
+            status_tracker.complete(key, False, dest_str, "Rip failed during live encode")
+            return False
+        logging.warning("Live encode failed for %s; encoding the finished rip instead", source)
+        status_tracker.add_event(f"Live encode failed; encoding finished rip: {final_src}", level="error")
+        if str(final_src) != key:
+            status_tracker.complete(key, False, dest_str, "Live encode failed; re-queued finished rip")
+        else:
+            status_tracker.update_progress(key, 0.0)
+        return _run_encode_job(str(final_src), config, output_dir, rip_dir, encoder, status_tracker, False, thread_budget)
+    logging.info("Encoded %s -> %s while ripping", final_src, out_path)
+    status_tracker.add_event(f"Encoding complete: {final_src}")
+    finish_encoded_job(key, out_path, config, status_tracker, rip_file=final_src, message="Encode complete (while ripping)")
+    return True
+
+
+def _rip_lane_job(mode: str, config: Dict[str, Any], rip_dir: Path, status_tracker: StatusTracker, on_ripped, on_live=None) -> Optional[str]:
+    """
+    Rip lane worker: resolve the disc, pick the next title (auto mode) and run MakeMKV.
+    The ripped file is passed to on_ripped so it goes straight into the encode pool; for
+    auto-rip the next title is requested right away so it rips while this one encodes.
+    With makemkv_encode_while_ripping, single-title rips are handed to on_live before
+    MakeMKV starts so the encode follows the growing file instead.
+    """
+    label = "Auto" if mode == "auto" else "Manual"
+    follower = None
+    try:
+        disc_source = _resolve_disc_source()
+        disc_num = get_disc_number()
+        if disc_source is None:
+            status_tracker.add_event(f"{label} MakeMKV rip requested but no disc detected.", level="error")
+            return None
+        mk_minlen = int(config.get("makemkv_minlength", 1800))
+        mk_titles = config.get("makemkv_titles", [])
+        mk_audio_langs = config.get("makemkv_audio_langs", []) or config.get("makemkv_preferred_audio_langs", [])
+        mk_sub_langs = config.get("makemkv_subtitle_langs", []) or config.get("makemkv_preferred_subtitle_langs", [])
+        if mode == "auto":
+            disc_info = status_tracker.disc_info() or {}
+            if not _disc_scan_complete(disc_info.get("info") if isinstance(disc_info, dict) else disc_info):
+                scanned, _success, _timed_out = _guarded_disc_scan(status_tracker, disc_source, 90, force=True)
+                if scanned:
+                    disc_info = {"disc_index": disc_num, "source": disc_source, "info": scanned}
+            disc_key = _get_disc_key(status_tracker, disc_info, disc_num, disc_source)
+            if status_tracker.disc_auto_complete(disc_key):
+                return None
+            queue = status_tracker.disc_auto_queue()
+            if status_tracker.disc_auto_key() != disc_key or not queue:
+                auto_titles = _select_top_titles(disc_info, 2, mk_minlen)
+                status_tracker.set_disc_auto_queue(disc_key, auto_titles)
+                if auto_titles:
+                    status_tracker.add_event(f"Auto-rip selected titles: {', '.join(auto_titles)}")
+                else:
+                    status_tracker.add_event("Auto-rip found no titles meeting minimum length.", level="error")
+            next_title = status_tracker.pop_disc_auto_title()
+            if not next_title:
+                return None
+            mk_titles = [next_title]
+        if on_live and config.get("makemkv_encode_while_ripping") and len(mk_titles) == 1 and str(mk_titles[0]).strip().isdigit():
+            lag_bytes = int(config.get("rip_follow_lag_mb", 64) or 0) * 1024 * 1024
+            follower = RipFollower(rip_dir, int(str(mk_titles[0]).strip()), lag_bytes)
+            if not on_live(follower):
+                follower = None
+        rip_path, reused = rip_disc(
+            disc_source,
+            disc_num,
+            rip_dir,
+            min_length=mk_minlen,
+            status_tracker=status_tracker,
+            titles=mk_titles,
+            audio_langs=mk_audio_langs,
+            subtitle_langs=mk_sub_langs,
+            progress_cb=follower.on_progress if follower else None,
+        )
+        if follower:
+            follower.finish(bool(rip_path), rip_path)
+        if not rip_path:
+            status_tracker.add_event(f"{label} MakeMKV rip failed to produce output.", level="error")
+            status_tracker.set_disc_scan_cooldown(120)
+            return None
+        status_tracker.add_event(f"{label} MakeMKV rip {'reused existing' if reused else 'produced'}: {rip_path}")
+        if follower is None:
             try:
-                orig_src = USB_ORIGIN_MAP.pop(str(src), None)
-                if orig_src:
-                    try:
-                        mark_usb_encoded(Path(orig_src))
-                    except Exception:
-                        logging.debug("Failed to mark USB source encoded: %s", orig_src, exc_info=True)
+                on_ripped(str(rip_path))
             except Exception:
-                logging.debug("Failed USB origin bookkeeping for %s", src, exc_info=True)
-            cleanup_usb_staging(src, config)
-        if status_tracker:
-            status_tracker.complete(str(src), True, dest_str, "Encode complete")
-    return True
+                logging.exception("Failed to hand off ripped file to encode queue: %s", rip_path)
+                status_tracker.add_manual_file(str(rip_path))
+        if mode == "auto":
+            remaining = status_tracker.disc_auto_queue()
+            if remaining:
+                status_tracker.request_disc_rip("auto")
+                status_tracker.add_event(f"Auto-rip queued next title: {remaining[0]}")
+            else:
+                disc_key = _get_disc_key(status_tracker, status_tracker.disc_info() or {}, disc_num, disc_source)
+                status_tracker.set_disc_auto_complete(disc_key)
+                status_tracker.add_event("Auto-rip queue complete.")
+                status_tracker.set_disc_pending(False)
+                status_tracker.pause_disc_scan()
+                status_tracker.set_disc_scan_cooldown(120)
+        else:
+            status_tracker.set_disc_pending(False)
+            status_tracker.pause_disc_scan()
+            status_tracker.set_disc_scan_cooldown(120)
+        return str(rip_path)
+    except Exception:
+        if follower:
+            follower.finish(False, None)
+        logging.exception("Rip lane job crashed (%s)", mode)
+        status_tracker.add_event(f"{label} MakeMKV rip crashed; see logs.", level="error")
+        return None
 
 def main():
     setup_logging()
     ensure_smb_root()
-    status_tracker = StatusTracker(LOG_FILE)
+    try:
+        job_store = JobStore(STATE_DIR / "jobs.db")
+    except Exception:
+        logging.exception("Job store unavailable; queue state will not survive restarts")
+        job_store = None
+    job_logs = get_job_logs(JOB_LOG_DIR)
+    status_tracker = StatusTracker(LOG_FILE, store=job_store, job_logs=job_logs)
+    ProcAccountant(status_tracker).start()
     cfg_manager = ConfigManager(CONFIG_PATH)
+    # settings saved from the UI (or config.json edited by hand) take effect on the next pass, now
+    cfg_manager.subscribe(lambda _cfg: status_tracker.wake())
+    # log levels changed on the settings page apply immediately
+    apply_log_levels(cfg_manager.current().get("log_levels"))
+    cfg_manager.subscribe(lambda cfg: apply_log_levels(cfg.get("log_levels")))
     start_web_server(status_tracker, config_manager=cfg_manager, port=WEB_PORT)
 
     config = cfg_manager.read()
@@ -1770,22 +3222,63 @@ def main():
     rip_dir = Path(config.get("rip_dir"))
     rip_dir.mkdir(parents=True, exist_ok=True)
     if search_path:
-        scanner = Scanner(search_path=search_path)
+        scanner = Scanner(search_path=search_path, state_store=job_store, on_change=status_tracker.wake)
     else:
-        scanner = Scanner()
+        scanner = Scanner(state_store=job_store, on_change=status_tracker.wake)
     try:
         encoder = Encoder(config=config)
     except TypeError:
         encoder = Encoder()
 
+    encode_pool = EncodeWorkerPool(config.get("max_threads", 1), config.get("encode_threads_per_job", 0))
+    # optical rip lane: a single MakeMKV worker that runs alongside the encode pool
+    rip_lane = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rip")
+    rip_future = None
+
+    def handoff_rip(rip_path: str):
+        cfg = cfg_manager.read()
+        out_dir = Path(cfg.get("output_dir"))
+        if not status_tracker.has_active(rip_path):
+            dest_hint = compute_output_path(rip_path, cfg, out_dir)
+            status_tracker.start(rip_path, str(dest_hint), info=None, state="queued")
+        encode_pool.submit(
+            rip_path,
+            _run_encode_job,
+            rip_path,
+            cfg,
+            out_dir,
+            Path(cfg.get("rip_dir")),
+            encoder,
+            status_tracker,
+            False,
+            encode_pool.threads_per_job,
+        )
+
+    def handoff_live(follower: RipFollower) -> bool:
+        cfg = cfg_manager.read()
+        return encode_pool.submit(
+            f"live:{follower.rip_dir}:{follower.title_id}",
+            _run_live_encode_job,
+            follower,
+            cfg,
+            Path(cfg.get("output_dir")),
+            Path(cfg.get("rip_dir")),
+            encoder,
+            status_tracker,
+            encode_pool.threads_per_job,
+        )
+
     last_search_path = search_path
     rescan_interval = float(config.get("rescan_interval", 30))
     last_usb_state = None  # track mount/readability status to avoid noisy repeats
     usb_state_changed_to_ready = False
     disc_absent_since = None
+    idle_passes = 0
+    last_chunk_prune = 0.0
 
-    logging.info("Starting continuous scanner. search_path=%s output=%s interval=%.1fs",
-                 search_path if search_path else "<auto-detect>", output_dir, rescan_interval)
+    logging.info("Starting continuous scanner. search_path=%s output=%s interval=%.1fs encode_slots=%d threads_per_job=%d",
+                 search_path if search_path else "<auto-detect>", output_dir, rescan_interval,
+                 encode_pool.slots, encode_pool.threads_per_job)
 
     try:
         while True:
@@ -1793,8 +3286,8 @@ def main():
             config = cfg_manager.read()
             auto_rip = bool(config.get("makemkv_auto_rip"))
             rescan_interval = float(config.get("rescan_interval", 30))
-            # Force single-file processing (FIFO) regardless of configured max_threads
-            max_threads = 1
+            max_threads = max(1, int(config.get("max_threads", 1) or 1))
+            encode_pool.resize(max_threads, config.get("encode_threads_per_job", 0))
             search_path = config.get("search_path")
             if search_path == '/':
                 search_path = None
@@ -1803,10 +3296,11 @@ def main():
             rip_dir = Path(config.get("rip_dir"))
             rip_dir.mkdir(parents=True, exist_ok=True)
             if search_path != last_search_path:
+                scanner.close()
                 if search_path:
-                    scanner = Scanner(search_path=search_path)
+                    scanner = Scanner(search_path=search_path, state_store=job_store, on_change=status_tracker.wake)
                 else:
-                    scanner = Scanner()
+                    scanner = Scanner(state_store=job_store, on_change=status_tracker.wake)
                 last_search_path = search_path
 
             # decide which directories will be scanned this pass
@@ -1830,22 +3324,16 @@ def main():
             scan_roots = [r for r in scan_roots if r != "/mnt/output" and r not in EXCLUDED_SCAN_PATHS]
 
             logging.info("Scanning directories: %s", ", ".join(scan_roots) if scan_roots else "<none>")
-            # debug: show mount status and a sample of contents for each scan root
             import os
             # USB health check: log once per state change if mount is missing or unreadable
             usb_ready = True
+            usb_state = "ready"
             try:
-                usb_path = Path("/mnt/usb")
-                usb_state = "ready"
-                if not os.path.ismount(usb_path):
-                    usb_state = "not-mounted"
+                # probed on the scanner's pool with a deadline: a hung stick must not block the pass
+                usb_state = scanner.probe_mount("/mnt/usb")
+                if usb_state == "not-mounted":
                     usb_ready = False
-                else:
-                    try:
-                        os.listdir(usb_path)
-                    except OSError as e:
-                        usb_state = f"error:{getattr(e, 'errno', 'unknown')}"
-                        # keep usb_ready True so we still scan to detect recovery
+                # on an I/O error or timeout usb_ready stays True so we still scan to detect recovery
                 if usb_state != last_usb_state:
                     last_usb_state = usb_state
                     if usb_state == "ready":
@@ -1859,6 +3347,10 @@ def main():
                         if status_tracker:
                             status_tracker.add_event("USB mount missing at /mnt/usb. Re-plug or remount.", level="error")
                             status_tracker.set_usb_status("missing", "USB mount missing at /mnt/usb")
+                    elif usb_state == "timeout":
+                        if status_tracker:
+                            status_tracker.add_event("USB mount at /mnt/usb is not responding. Re-plug the stick.", level="error")
+                            status_tracker.set_usb_status("error", "/mnt/usb not responding")
                     else:
                         if status_tracker:
                             status_tracker.add_event(f"USB mount I/O error at /mnt/usb ({usb_state}). Re-plug or fsck the stick.", level="error")
@@ -1871,20 +3363,14 @@ def main():
                 pass
             if usb_state == "not-mounted" and "/mnt/usb" in scan_roots:
                 scan_roots = [r for r in scan_roots if r != "/mnt/usb"]
-            for root in scan_roots:
-                try:
-                    is_m = os.path.ismount(root)
-                    entries = []
-                    if os.path.exists(root):
-                        try:
-                            entries = os.listdir(root)[:10]
-                        except Exception:
-                            entries = ["<unreadable>"]
-                    logging.debug("Scan root: %s ismount=%s exists=%s sample=%s", root, is_m, os.path.exists(root), entries)
-                except Exception:
-                    logging.debug("Scan root: %s inspect failed", root)
-
+            scanner.reconcile_interval = float(config.get("scan_reconcile_sec", 600) or 0)
+            scanner.root_budget = float(config.get("scan_root_timeout_sec", 20) or 20)
+            job_logs.configure(config.get("job_log_retention_days"), config.get("job_log_max_total_mb"))
+            if time.time() - last_chunk_prune >= CHUNK_PRUNE_INTERVAL_SEC:
+                last_chunk_prune = time.time()
+                prune_chunk_work_dirs(Path(config.get("output_dir")), keep=status_tracker.active_destinations())
             video_files = scanner.find_video_files(scan_roots)
+            status_tracker.set_scan_roots(scanner.root_stats())
             # stage USB files into a dedicated staging dir so originals remain untouched
             usb_staging_dir = Path(config.get("usb_staging_dir", "/mnt/usb_staging"))
             staged_video_files = []
@@ -1908,87 +3394,27 @@ def main():
                     staged_video_files.append(f)
             video_files = staged_video_files
             video_files.extend(manual_files)
+            # files already handed to an encode slot keep showing up in scans until they finish
+            video_files = [f for f in video_files if not encode_pool.is_inflight(str(f))]
             for f in video_files:
                 if status_tracker:
                     status_tracker.add_event(f"Detected new file: {f}")
             if not video_files:
                 logging.debug("No candidate video files found on this pass.")
-            # Handle manual rip requests even when no bluray files are present in the scan
-            mode = status_tracker.consume_disc_rip_request() if status_tracker else None
+            # Handle manual/auto rip requests on the dedicated rip lane (one MakeMKV job at a time,
+            # concurrent with the encode pool). Requests stay pending while the lane is busy.
+            rip_busy = rip_future is not None and not rip_future.done()
+            mode = status_tracker.consume_disc_rip_request() if status_tracker and not rip_busy else None
             if status_tracker and mode == "auto" and not auto_rip:
                 status_tracker.add_event("Auto-rip request ignored; auto-rip is disabled.")
                 status_tracker.clear_disc_auto_queue()
                 mode = None
+            if status_tracker and mode and status_tracker.disc_rip_blocked():
+                status_tracker.add_event("Rip request ignored; Stop All Ripping is enabled.", level="error")
+                mode = None
             if status_tracker and mode:
-                if status_tracker.disc_rip_blocked():
-                    status_tracker.add_event("Rip request ignored; Stop All Ripping is enabled.", level="error")
-                    mode = None
-                if not mode:
-                    continue
-                disc_source = _resolve_disc_source()
-                disc_num = get_disc_number()
-                if disc_source is None:
-                    label = "Auto" if mode == "auto" else "Manual"
-                    status_tracker.add_event(f"{label} MakeMKV rip requested but no disc detected.", level="error")
-                else:
-                    mk_minlen = int(config.get("makemkv_minlength", 1800))
-                    mk_titles = config.get("makemkv_titles", [])
-                    mk_audio_langs = config.get("makemkv_audio_langs", []) or config.get("makemkv_preferred_audio_langs", [])
-                    mk_sub_langs = config.get("makemkv_subtitle_langs", []) or config.get("makemkv_preferred_subtitle_langs", [])
-                    if mode == "auto":
-                        disc_info = status_tracker.disc_info() or {}
-                        if not _disc_scan_complete(disc_info.get("info") if isinstance(disc_info, dict) else disc_info):
-                            scanned, _success, _timed_out = _guarded_disc_scan(status_tracker, disc_source, 90, force=True)
-                            if scanned:
-                                disc_info = {"disc_index": disc_num, "source": disc_source, "info": scanned}
-                        disc_key = _get_disc_key(status_tracker, disc_info, disc_num, disc_source)
-                        if status_tracker.disc_auto_complete(disc_key):
-                            continue
-                        queue = status_tracker.disc_auto_queue()
-                        if status_tracker.disc_auto_key() != disc_key or not queue:
-                            auto_titles = _select_top_titles(disc_info, 2, mk_minlen)
-                            status_tracker.set_disc_auto_queue(disc_key, auto_titles)
-                            if auto_titles:
-                                status_tracker.add_event(f"Auto-rip selected titles: {', '.join(auto_titles)}")
-                            else:
-                                status_tracker.add_event("Auto-rip found no titles meeting minimum length.", level="error")
-                        next_title = status_tracker.pop_disc_auto_title()
-                        if not next_title:
-                            continue
-                        mk_titles = [next_title]
-                    rip_path, reused = rip_disc(
-                        disc_source,
-                        disc_num,
-                        rip_dir,
-                        min_length=mk_minlen,
-                        status_tracker=status_tracker,
-                        titles=mk_titles,
-                        audio_langs=mk_audio_langs,
-                        subtitle_langs=mk_sub_langs,
-                    )
-                    if rip_path:
-                        video_files.append(str(rip_path))
-                        label = "Auto" if mode == "auto" else "Manual"
-                        status_tracker.add_event(f"{label} MakeMKV rip {'reused existing' if reused else 'produced'}: {rip_path}")
-                        if mode == "auto":
-                            remaining = status_tracker.disc_auto_queue()
-                            if remaining:
-                                status_tracker.request_disc_rip("auto")
-                                status_tracker.add_event(f"Auto-rip queued next title: {remaining[0]}")
-                            else:
-                                disc_key = _get_disc_key(status_tracker, status_tracker.disc_info() or {}, disc_num, disc_source)
-                                status_tracker.set_disc_auto_complete(disc_key)
-                                status_tracker.add_event("Auto-rip queue complete.")
-                                status_tracker.set_disc_pending(False)
-                                status_tracker.pause_disc_scan()
-                                status_tracker.set_disc_scan_cooldown(120)
-                        else:
-                            status_tracker.set_disc_pending(False)
-                            status_tracker.pause_disc_scan()
-                            status_tracker.set_disc_scan_cooldown(120)
-                    else:
-                        status_tracker.add_event("Manual MakeMKV rip failed to produce output.", level="error")
-                        status_tracker.set_disc_scan_cooldown(120)
+                rip_future = rip_lane.submit(_rip_lane_job, mode, config, rip_dir, status_tracker, handoff_rip, handoff_live)
+                rip_busy = True
             # Pre-register queued items so they appear in Active
             for f in video_files:
                 try:
@@ -2066,10 +3492,14 @@ def main():
                         status_tracker.set_disc_present(present)
                 except Exception:
                     logging.debug("Disc presence detection failed", exc_info=True)
-            busy = bool(status_tracker and status_tracker.has_active_nonqueued())
-            if status_tracker and auto_rip and status_tracker.disc_scan_paused() and not status_tracker.disc_rip_blocked():
+            # only an in-flight rip holds back disc scans; file encodes run on their own pool
+            rip_busy = rip_future is not None and not rip_future.done()
+            busy = bool(status_tracker and (rip_busy or status_tracker.has_active_rip()))
+            if status_tracker and auto_rip and not busy and status_tracker.disc_scan_paused() and not status_tracker.disc_rip_blocked():
                 disc_num = get_disc_number()
-                disc_key = _get_disc_key(status_tracker, status_tracker.disc_info() or {}, disc_num, disc_source)
+                di = status_tracker.disc_info() or {}
+                disc_source = di.get("source") if isinstance(di, dict) else None
+                disc_key = _get_disc_key(status_tracker, di, disc_num, disc_source)
                 if not status_tracker.disc_auto_complete(disc_key):
                     status_tracker.resume_disc_scan()
             # Disc detection / info
@@ -2151,13 +3581,11 @@ def main():
                                     status_tracker.set_disc_info({"disc_index": disc_num, "source": disc_source, "info": scanned})
                                     info_payload = scanned
                                     titles = (info_payload or {}).get("titles") or []
-                    if not titles:
-                        continue
                     has_disc_task = any(
-                        (a.get("source", "") or "").startswith("disc:") or (a.get("state") in ("ripping", "starting"))
+                        (a.get("source", "") or "").startswith("disc:") or a.get("state") == "ripping"
                         for a in active_snapshot.get("active", [])
                     )
-                    if not has_disc_task and not status_tracker.disc_rip_requested():
+                    if titles and not has_disc_task and not status_tracker.disc_rip_requested():
                         disc_source = _resolve_disc_source()
                         disc_num = get_disc_number()
                         disc_key = _get_disc_key(status_tracker, status_tracker.disc_info() or {}, disc_num, disc_source)
@@ -2166,9 +3594,11 @@ def main():
                             status_tracker.add_event(f"Auto-rip requested for {disc_source}")
             except Exception:
                 logging.debug("Auto-rip trigger failed", exc_info=True)
-            single_job_mode = len(video_files) == 1 and queued_active == 1
-            # Process sequentially (FIFO)
+            single_job_mode = len(video_files) == 1 and queued_active == 1 and encode_pool.inflight_count() == 0
+            # Hand off to the encode pool in FIFO order; max_threads slots run concurrently
             for video_file in video_files:
+                if encode_pool.is_inflight(str(video_file)):
+                    continue
                 # Determine profile for this file
                 local_profile = config.get("profile", "handbrake")
                 is_dvd = any(s in video_file.lower() for s in ["video_ts"])
@@ -2193,7 +3623,9 @@ def main():
                 # Bitrate sanity check
                 source_br = probe_source_bitrate_kbps(Path(video_file))
                 target_br = estimate_target_bitrate_kbps(local_profile, hb_opts_local)
-                if source_br and target_br and source_br < target_br and status_tracker and not status_tracker.is_confirm_ok(str(video_file)):
+                # a source the remux fast path will copy needs no confirmation: it is not re-encoded at all
+                if (source_br and target_br and source_br < target_br and status_tracker and not status_tracker.is_confirm_ok(str(video_file))
+                        and remux_plan_for(video_file, config, local_profile, hb_opts_local)[0] is None):
                     auto_proceed = bool(config.get("low_bitrate_auto_proceed"))
                     auto_skip = bool(config.get("low_bitrate_auto_skip"))
                     if auto_skip:
@@ -2210,18 +3642,36 @@ def main():
                         status_tracker.set_message(str(video_file), "Low bitrate; confirm to proceed.")
                         status_tracker.add_confirm_required(str(video_file))
                         continue
-                try:
-                    if status_tracker:
-                        status_tracker.set_state(str(video_file), "starting")
-                    out = process_video(video_file, config, output_dir, rip_dir, encoder, status_tracker, single_job_mode=single_job_mode)
-                    print(f"✅ {video_file} → {out}")
-                except Exception as e:
-                    print(f"❌ {video_file}: {e}")
-
-            sleep_for = rescan_interval
-            if usb_state_changed_to_ready:
+                encode_pool.submit(
+                    str(video_file),
+                    _run_encode_job,
+                    video_file,
+                    config,
+                    output_dir,
+                    rip_dir,
+                    encoder,
+                    status_tracker,
+                    single_job_mode,
+                    encode_pool.threads_per_job,
+                )
+
+            # Block until the tracker signals new work (API queue/retry/rip request, confirmations,
+            # finished jobs, USB ready) or the rescan interval passes; idle passes back off up to
+            # IDLE_BACKOFF_MAX x the interval.
+            rip_busy = rip_future is not None and not rip_future.done()
+            idle = not video_files and encode_pool.inflight_count() == 0 and not rip_busy and not status_tracker.has_smb_pending()
+            idle_passes = idle_passes + 1 if idle else 0
+            sleep_for = rescan_interval * min(IDLE_BACKOFF_MAX, 2 ** max(0, idle_passes - 1))
+            # come back when a changing file could next pass the stability check
+            scan_due = scanner.next_due()
+            if scan_due is not None:
+                sleep_for = min(sleep_for, max(1.0, scan_due))
+            if usb_state_changed_to_ready or (status_tracker.disc_rip_requested() and not rip_busy):
                 sleep_for = 0.1
-            time.sleep(sleep_for)
+            # a burst of signals is coalesced into one pass
+            woke = status_tracker.wait_for_wake(sleep_for, settle=WAKE_DEBOUNCE_SEC)
+            if woke:
+                idle_passes = 0
             # after a successful scan/pass, unmount devices the scanner mounted
             try:
                 unmounted = scanner.unmount_mountpoints()
@@ -2229,14 +3679,13 @@ def main():
                     logging.info("Automatically unmounted: %s", ", ".join(unmounted))
             except Exception:
                 logging.debug("Automatic unmount step failed", exc_info=True)
-            # If a manual disc rip was requested, wake quickly instead of waiting full interval
-            if status_tracker and status_tracker.disc_rip_requested():
-                sleep_for = min(sleep_for, 0.5)
     except KeyboardInterrupt:
         logging.info("Interrupted, shutting down.")
     except Exception:
         logging.exception("Unexpected error in main loop.")
     finally:
+        encode_pool.shutdown(wait=False)
+        rip_lane.shutdown(wait=False, cancel_futures=True)
         logging.info("Exited.")
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+import logging
+import os
+import select
+import socket
+import subprocess
+import threading
+import time
+from typing import Optional
+
+NETLINK_KOBJECT_UEVENT = 15
+# kernel uevent multicast group (the udev daemon re-broadcasts on group 2 in its own format)
+UEVENT_KERNEL_GROUP = 1
+SYS_BLOCK = "/sys/class/block"
+MOUNTS_PATH = "/proc/self/mounts"
+# a device whose mount failed is left alone until the kernel reports a change for it, or this long
+FAILED_MOUNT_RETRY_SEC = 1800
+
+
+def _open_uevent_socket():
+    """Non-blocking kernel uevent socket, or None (no netlink in this network namespace, no permission)."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_NONBLOCK, NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, UEVENT_KERNEL_GROUP))
+        return sock
+    except (AttributeError, OSError):
+        logging.getLogger(__name__).debug("Kernel uevent socket unavailable; polling %s instead", SYS_BLOCK, exc_info=True)
+        return None
+
+
+def _parse_uevent(data: bytes) -> dict:
+    """'add@/devices/...\0ACTION=add\0SUBSYSTEM=block\0DEVNAME=sdb1\0...' -> {'ACTION': 'add', ...}"""
+    fields = {}
+    for part in data.split(b"\0")[1:]:
+        key, sep, value = part.partition(b"=")
+        if sep:
+            fields[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+    return fields
+
+
+class DeviceTopology:
+    """
+    Cached view of block devices (from sysfs) and mounts (from /proc/self/mounts). The cache is
+    only rebuilt when the kernel reports a block uevent or the mount table signals POLLPRI, so a
+    scan pass with nothing plugged in costs a couple of poll() calls instead of lsblk/blkid spawns.
+    Per-device fstype and mount outcomes are remembered until that device changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._uevents = _open_uevent_socket()
+        self._mounts_fh = None
+        self._mounts_poll = None
+        try:
+            self._mounts_fh = open(MOUNTS_PATH, "r", encoding="utf-8")
+            self._mounts_poll = select.poll()
+            self._mounts_poll.register(self._mounts_fh, select.POLLPRI | select.POLLERR)
+        except OSError:
+            logging.getLogger(__name__).debug("Cannot poll %s; re-reading it every pass", MOUNTS_PATH, exc_info=True)
+            self._mounts_fh = None
+        self._mounts = None
+        self._devices = None
+        self._sys_listing = None
+        self._fstypes = {}
+        # name -> {"ok": bool, "at": ts, "method": [...]} for the last mount attempt
+        self._mount_results = {}
+
+    # Change detection
+    def _drain_uevents(self) -> bool:
+        changed = False
+        while True:
+            try:
+                data = self._uevents.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                logging.getLogger(__name__).debug("Kernel uevent socket failed; polling %s instead", SYS_BLOCK, exc_info=True)
+                self._uevents.close()
+                self._uevents = None
+                return True
+            fields = _parse_uevent(data)
+            if fields.get("SUBSYSTEM") != "block":
+                continue
+            changed = True
+            name = fields.get("DEVNAME", "").rsplit("/", 1)[-1]
+            if name:
+                # new media, new partition table or removal: forget what we knew about it
+                self._fstypes.pop(name, None)
+                self._mount_results.pop(name, None)
+                logging.getLogger(__name__).debug("Block uevent %s for %s", fields.get("ACTION"), name)
+        return changed
+
+    def _mounts_changed(self) -> bool:
+        if self._mounts_poll is None:
+            return True
+        try:
+            return bool(self._mounts_poll.poll(0))
+        except OSError:
+            return True
+
+    def _refresh(self):
+        if self._uevents is not None:
+            if self._drain_uevents() or self._devices is None:
+                self._devices = self._read_devices()
+        else:
+            # no uevents: a sysfs listing is still far cheaper than spawning lsblk
+            listing = self._list_sys_block()
+            if listing != self._sys_listing:
+                for name in set(self._sys_listing or ()) ^ set(listing):
+                    self._fstypes.pop(name, None)
+                    self._mount_results.pop(name, None)
+                self._sys_listing = listing
+                self._devices = self._read_devices()
+        if self._mounts is None or self._mounts_changed():
+            self._mounts = self._read_mounts()
+
+    # Readers
+    @staticmethod
+    def _list_sys_block():
+        try:
+            return sorted(os.listdir(SYS_BLOCK))
+        except OSError:
+            return []
+
+    def _read_devices(self):
+        devices = []
+        for name in self._list_sys_block():
+            devices.append({
+                "name": name,
+                "type": "part" if os.path.exists(os.path.join(SYS_BLOCK, name, "partition")) else "disk",
+            })
+        return devices
+
+    def _read_mounts(self):
+        mounts = []
+        try:
+            if self._mounts_fh is not None:
+                self._mounts_fh.seek(0)
+                lines = self._mounts_fh.read().splitlines()
+            else:
+                with open(MOUNTS_PATH, "r", encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+        except OSError:
+            return mounts
+        for line in lines:
+            parts = line.split()
+            if len(parts) >= 3:
+                mounts.append((parts[0], parts[1], parts[2]))
+        return mounts
+
+    # Public view
+    def mounts(self):
+        """(device, mountpoint, fstype) tuples from the mount table."""
+        with self._lock:
+            self._refresh()
+            return list(self._mounts)
+
+    def partitions(self):
+        """[{"name", "type", "mountpoint"}] for every block device, like lsblk -o NAME,TYPE,MOUNTPOINT."""
+        with self._lock:
+            self._refresh()
+            mounted = {}
+            for dev, mnt, _fs in self._mounts:
+                if dev.startswith("/dev/"):
+                    mounted.setdefault(os.path.realpath(dev).rsplit("/", 1)[-1], mnt)
+            return [dict(d, mountpoint=mounted.get(d["name"], "")) for d in self._devices]
+
+    def source_for(self, mountpoint: str) -> Optional[str]:
+        for dev, mnt, _fs in reversed(self.mounts()):
+            if mnt == mountpoint:
+                return dev
+        return None
+
+    def fstype(self, name: str) -> str:
+        """Filesystem type of a device, probed with blkid/lsblk once per device change."""
+        with self._lock:
+            if name in self._fstypes:
+                return self._fstypes[name]
+        devpath = f"/dev/{name}"
+        fstype = ""
+        for cmd in (["blkid", "-o", "value", "-s", "TYPE", devpath], ["lsblk", "-no", "FSTYPE", devpath]):
+            try:
+                res = subprocess.run(cmd, capture_output=True, text=True, check=False)
+                fstype = res.stdout.strip()
+            except Exception:
+                fstype = ""
+            if fstype:
+                break
+        with self._lock:
+            self._fstypes[name] = fstype
+        return fstype
+
+    def should_try_mount(self, name: str) -> bool:
+        with self._lock:
+            result = self._mount_results.get(name)
+        if not result or result.get("ok"):
+            return True
+        return time.time() - result.get("at", 0) >= FAILED_MOUNT_RETRY_SEC
+
+    def mount_method(self, name: str):
+        """The mount command that last worked for this device (None if unknown)."""
+        with self._lock:
+            result = self._mount_results.get(name) or {}
+        return result.get("method") if result.get("ok") else None
+
+    def record_mount(self, name: str, ok: bool, method=None):
+        with self._lock:
+            self._mount_results[name] = {"ok": ok, "at": time.time(), "method": method}
+
+    def close(self):
+        with self._lock:
+            if self._uevents is not None:
+                self._uevents.close()
+                self._uevents = None
+            if self._mounts_fh is not None:
+                self._mounts_fh.close()
+                self._mounts_fh = None
+                self._mounts_poll = None
+
+
+_TOPOLOGY = None
+_TOPOLOGY_LOCK = threading.Lock()
+
+
+def get_device_topology() -> DeviceTopology:
+    global _TOPOLOGY
+    with _TOPOLOGY_LOCK:
+        if _TOPOLOGY is None:
+            _TOPOLOGY = DeviceTopology()
+        return _TOPOLOGY
@@ -0,0 +1,106 @@
+"""
+Minimal inotify(7) binding via ctypes (Linux only); callers fall back to polling when
+init_inotify() returns None or a watch cannot be added.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_OPEN = 0x00000020
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_UNMOUNT = 0x00002000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            _libc.inotify_init1.argtypes = [ctypes.c_int]
+            _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except Exception:
+            _libc = False
+    return _libc or None
+
+
+class Inotify:
+    """Non-blocking inotify fd; read_events() drains whatever is queued without waiting."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """Returns a watch descriptor; raises OSError (e.g. ENOSPC when out of watches)."""
+        libc = _load_libc()
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        libc = _load_libc()
+        if libc is not None:
+            libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, max_bytes: int = 1 << 20):
+        """Yield (wd, mask, cookie, name) for every queued event."""
+        while True:
+            try:
+                buf = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                if exc.errno in (errno.EAGAIN, errno.EINTR):
+                    return
+                raise
+            if not buf:
+                return
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset:offset + length].split(b"\0", 1)[0]
+                offset += length
+                yield wd, mask, cookie, os.fsdecode(name)
+            max_bytes -= len(buf)
+            if max_bytes <= 0:
+                return
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except Exception:
+            pass
+
+
+def init_inotify():
+    """Return an Inotify instance, or None when inotify is unavailable."""
+    libc = _load_libc()
+    if libc is None or not hasattr(libc, "inotify_init1"):
+        return None
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    return Inotify(fd)
@@ -0,0 +1,222 @@
+import collections
+import gzip
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# one job's output is capped at this size: the head is kept in the file, the last JOB_LOG_TAIL_LINES
+# lines after the cap are appended when the job finishes
+JOB_LOG_MAX_BYTES = 20 * 1024 * 1024
+JOB_LOG_TAIL_LINES = 2000
+# finished logs are gzipped; the oldest are deleted past the age or total size limit
+JOB_LOG_RETENTION_DAYS = 30
+JOB_LOG_MAX_TOTAL_MB = 1024
+LOG_ID_RE = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+
+
+def new_log_id() -> str:
+    """Sortable, filename-safe job log id: <yyyymmdd-hhmmss>-<8 hex>."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def valid_log_id(log_id: str) -> bool:
+    return bool(LOG_ID_RE.match(str(log_id or "")))
+
+
+class JobLog:
+    """Append-only, size-capped output file for one job; shared by every process the job runs."""
+
+    def __init__(self, path: Path, header: str = "", max_bytes: int = JOB_LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._f = open(path, "a", encoding="utf-8", errors="replace")
+        self._size = self._f.tell()
+        self._tail = None
+        self._dropped = 0
+        if header:
+            self.write(header)
+
+    def write(self, line: str):
+        line = line.rstrip("\r\n")
+        with self._lock:
+            if self._f is None:
+                return
+            if self._tail is not None:
+                self._tail.append(line)
+                self._dropped += 1
+                return
+            data = f"{time.strftime('%H:%M:%S')} {line}\n"
+            if self._size + len(data) > self.max_bytes:
+                self._tail = collections.deque([line], maxlen=JOB_LOG_TAIL_LINES)
+                self._dropped = 1
+                return
+            self._f.write(data)
+            self._size += len(data)
+
+    def flush(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+
+    def close(self):
+        with self._lock:
+            if self._f is None:
+                return
+            if self._tail is not None:
+                skipped = self._dropped - len(self._tail)
+                self._f.write(f"[... {skipped} line(s) omitted after the {self.max_bytes // (1024 * 1024)} MB cap ...]\n")
+                self._f.writelines(f"{line}\n" for line in self._tail)
+            self._f.close()
+            self._f = None
+
+
+class JobLogs:
+    """
+    Per-job subprocess output under <log dir>/jobs: <id>.log while the job runs, <id>.log.gz once it
+    finished. Compression and pruning run on one background worker so completing a job never waits.
+    """
+
+    def __init__(self, root: Path, retention_days: int = JOB_LOG_RETENTION_DAYS, max_total_mb: int = JOB_LOG_MAX_TOTAL_MB):
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self.max_total_mb = max_total_mb
+        self._lock = threading.Lock()
+        self._open: Dict[str, JobLog] = {}
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-logs")
+        self._pool.submit(self._recover)
+
+    def configure(self, retention_days: Optional[int] = None, max_total_mb: Optional[int] = None):
+        if retention_days is not None:
+            self.retention_days = max(0, int(retention_days))
+        if max_total_mb is not None:
+            self.max_total_mb = max(0, int(max_total_mb))
+
+    def open(self, log_id: str, header: str = "") -> JobLog:
+        with self._lock:
+            log = self._open.get(log_id)
+            if log is None:
+                self.root.mkdir(parents=True, exist_ok=True)
+                log = self._open[log_id] = JobLog(self.root / f"{log_id}.log", header)
+            return log
+
+    def get(self, log_id: str) -> Optional[JobLog]:
+        with self._lock:
+            return self._open.get(log_id)
+
+    def close(self, log_id: str):
+        """Finish a job's log; it is compressed and the directory pruned in the background."""
+        with self._lock:
+            log = self._open.pop(log_id, None)
+        if log is None:
+            return
+        log.close()
+        self._pool.submit(self._compress_and_prune, log.path)
+
+    def locate(self, log_id: str) -> Tuple[Optional[Path], bool]:
+        """(path, gzipped) of a job's log, or (None, False) if it was never written or has been pruned."""
+        if not valid_log_id(log_id):
+            return None, False
+        log = self.get(log_id)
+        if log is not None:
+            log.flush()
+        plain = self.root / f"{log_id}.log"
+        packed = self.root / f"{log_id}.log.gz"
+        # the plain file wins while it exists: compression writes the .gz first, then unlinks it
+        if plain.exists():
+            return plain, False
+        if packed.exists():
+            return packed, True
+        return None, False
+
+    def _recover(self):
+        """Compress logs left open by a previous run (crash/restart)."""
+        try:
+            for path in sorted(self.root.glob("*.log")):
+                self._compress(path)
+        except OSError:
+            pass
+        self._prune()
+
+    def _compress_and_prune(self, path: Path):
+        self._compress(path)
+        self._prune()
+
+    def _compress(self, path: Path):
+        with self._lock:
+            if path.name[:-len(".log")] in self._open:
+                return
+        dest = path.with_name(path.name + ".gz")
+        tmp = path.with_name(path.name + ".gz.part")
+        try:
+            with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as out:
+                shutil.copyfileobj(src, out, 1024 * 1024)
+            os.replace(tmp, dest)
+            path.unlink()
+        except OSError:
+            logging.getLogger(__name__).debug("Failed to compress job log %s", path, exc_info=True)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def _prune(self):
+        try:
+            entries = []
+            for path in self.root.glob("*.log.gz"):
+                st = path.stat()
+                entries.append((st.st_mtime, st.st_size, path))
+        except OSError:
+            return
+        entries.sort()
+        cutoff = time.time() - self.retention_days * 86400 if self.retention_days else None
+        budget = self.max_total_mb * 1024 * 1024 if self.max_total_mb else None
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if (cutoff is None or mtime >= cutoff) and (budget is None or total <= budget):
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+def gzip_size(path: Path) -> int:
+    """Uncompressed size from the gzip trailer (exact below 4 GiB, which the size cap guarantees)."""
+    with open(path, "rb") as f:
+        f.seek(-4, os.SEEK_END)
+        return int.from_bytes(f.read(4), "little")
+
+
+def iter_range(path: Path, gzipped: bool, start: int, length: int, chunk: int = 64 * 1024):
+    """Yield bytes [start, start+length) of the uncompressed log in chunks."""
+    opener = gzip.open if gzipped else open
+    with opener(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(chunk, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+_JOB_LOGS: Optional[JobLogs] = None
+_JOB_LOGS_LOCK = threading.Lock()
+
+
+def get_job_logs(root: Optional[Path] = None) -> Optional[JobLogs]:
+    """The process-wide JobLogs; the first call with a root creates it, later calls just return it."""
+    global _JOB_LOGS
+    with _JOB_LOGS_LOCK:
+        if _JOB_LOGS is None and root is not None:
+            _JOB_LOGS = JobLogs(root)
+        return _JOB_LOGS
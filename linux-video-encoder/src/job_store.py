@@ -0,0 +1,221 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+JOB_STORE_PATH = Path("/var/lib/autoencoder/state/jobs.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    source TEXT PRIMARY KEY,
+    destination TEXT,
+    state TEXT,
+    kind TEXT,
+    started_at REAL,
+    updated_at REAL,
+    info TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT,
+    destination TEXT,
+    state TEXT,
+    started_at REAL,
+    finished_at REAL,
+    message TEXT,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS history_finished ON history(finished_at);
+CREATE INDEX IF NOT EXISTS history_source ON history(source);
+CREATE INDEX IF NOT EXISTS history_state ON history(state);
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS scan_files (
+    path TEXT PRIMARY KEY,
+    root TEXT,
+    entry TEXT
+);
+CREATE INDEX IF NOT EXISTS scan_files_root ON scan_files(root);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed store for StatusTracker queue state so a restart or redeploy keeps
+    queued/interrupted jobs, pending SMB copies, confirmations, the auto-rip position and
+    the full job history. Writes are small single-row transactions in WAL mode.
+    """
+
+    def __init__(self, path: Path = JOB_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            try:
+                self._conn.execute(sql, params)
+            except Exception:
+                logging.debug("Job store write failed: %s", sql, exc_info=True)
+
+    def _execute_many(self, sql: str, rows: list):
+        """One transaction for a batch of rows."""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                logging.debug("Job store batch write failed: %s", sql, exc_info=True)
+                try:
+                    self._conn.execute("ROLLBACK")
+                except Exception:
+                    pass
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchall()
+            except Exception:
+                logging.debug("Job store read failed: %s", sql, exc_info=True)
+                return []
+
+    # Active jobs
+    def save_job(self, item: dict):
+        info = item.get("info")
+        self._execute(
+            "INSERT OR REPLACE INTO jobs (source, destination, state, kind, started_at, updated_at, info, message) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                item.get("source"),
+                item.get("destination"),
+                item.get("state"),
+                item.get("kind"),
+                item.get("started_at"),
+                time.time(),
+                info if info is None or isinstance(info, str) else json.dumps(info),
+                item.get("message"),
+            ),
+        )
+
+    def update_job(self, src: str, **fields):
+        cols = [k for k in ("destination", "state", "message") if k in fields]
+        if not cols:
+            return
+        assignments = ", ".join(f"{c} = ?" for c in cols)
+        params = [fields[c] for c in cols] + [time.time(), src]
+        self._execute(f"UPDATE jobs SET {assignments}, updated_at = ? WHERE source = ?", params)
+
+    def delete_job(self, src: str):
+        self._execute("DELETE FROM jobs WHERE source = ?", (src,))
+
+    def load_jobs(self) -> list:
+        rows = self._query("SELECT source, destination, state, kind, started_at, info, message FROM jobs ORDER BY started_at")
+        return [
+            {"source": r[0], "destination": r[1], "state": r[2], "kind": r[3], "started_at": r[4], "info": r[5], "message": r[6]}
+            for r in rows
+        ]
+
+    # History
+    def add_history(self, record: dict):
+        self._execute(
+            "INSERT INTO history (source, destination, state, started_at, finished_at, message, record) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.get("source"),
+                record.get("destination"),
+                record.get("state"),
+                record.get("started_at"),
+                record.get("finished_at"),
+                record.get("message"),
+                json.dumps(record, default=str),
+            ),
+        )
+
+    def history(self, limit: int = 100, offset: int = 0, state: Optional[str] = None, source: Optional[str] = None) -> list:
+        """Newest-first page of finished jobs."""
+        where = []
+        params = []
+        if state:
+            where.append("state = ?")
+            params.append(state)
+        if source:
+            where.append("source = ?")
+            params.append(source)
+        sql = "SELECT record FROM history"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        params.extend([max(0, int(limit)), max(0, int(offset))])
+        out = []
+        for (raw,) in self._query(sql, params):
+            try:
+                out.append(json.loads(raw))
+            except Exception:
+                continue
+        return out
+
+    def history_count(self, state: Optional[str] = None) -> int:
+        if state:
+            rows = self._query("SELECT COUNT(*) FROM history WHERE state = ?", (state,))
+        else:
+            rows = self._query("SELECT COUNT(*) FROM history")
+        return int(rows[0][0]) if rows else 0
+
+    def clear_history(self, state: Optional[str] = None):
+        if state is None:
+            self._execute("DELETE FROM history")
+        else:
+            self._execute("DELETE FROM history WHERE state = ?", (state,))
+
+    # Small queue/flag values (manual files, SMB pending, confirmations, auto-rip queue)
+    def set_value(self, key: str, value):
+        self._execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_value(self, key: str, default=None):
+        rows = self._query("SELECT value FROM kv WHERE key = ?", (key,))
+        if not rows:
+            return default
+        try:
+            return json.loads(rows[0][0])
+        except Exception:
+            return default
+
+    def delete_value(self, key: str):
+        self._execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    # Scanner index (one row per settled video file, written only when its state changes)
+    def scan_files(self) -> dict:
+        """root -> {path: entry} for every persisted scanner index entry."""
+        out: dict = {}
+        for path, root, raw in self._query("SELECT path, root, entry FROM scan_files"):
+            try:
+                out.setdefault(root, {})[path] = json.loads(raw)
+            except Exception:
+                continue
+        return out
+
+    def save_scan_files(self, rows: list):
+        """rows: (root, path, entry) to upsert, or (root, path, None) to delete."""
+        upserts = [(path, root, json.dumps(entry)) for root, path, entry in rows if entry is not None]
+        deletes = [(path,) for _root, path, entry in rows if entry is None]
+        if upserts:
+            self._execute_many("INSERT OR REPLACE INTO scan_files (path, root, entry) VALUES (?, ?, ?)", upserts)
+        if deletes:
+            self._execute_many("DELETE FROM scan_files WHERE path = ?", deletes)
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
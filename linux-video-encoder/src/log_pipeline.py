@@ -0,0 +1,76 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+from openmetrics import LOG_RECORDS_DROPPED
+
+# records waiting for the listener thread; beyond this the newest are dropped instead of blocking
+LOG_QUEUE_SIZE = 10000
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+# settings-page subsystem -> loggers it covers ("" is the root logger: main loop, encodes, rips)
+LOG_SUBSYSTEMS = {
+    "app": ("",),
+    "scanner": ("scanner", "inotify_watch", "block_topology"),
+    "web": ("web_server", "werkzeug"),
+    "metrics": ("metrics_sampler", "proc_accounting", "job_logs"),
+}
+DEFAULT_LOG_LEVELS = {"app": "DEBUG", "scanner": "INFO", "web": "INFO", "metrics": "INFO"}
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops (and counts) records when the queue is full rather than raising; the next
+    record that fits is preceded by a warning saying how many were lost.
+    """
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            if self.dropped:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"{self.dropped} log record(s) dropped: log queue full",
+                }))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+def start_logging(handlers, queue_size: int = LOG_QUEUE_SIZE) -> logging.handlers.QueueListener:
+    """
+    Route every logger through a queue: callers only format and enqueue, and one listener thread
+    does the stream/file writes. The listener is stopped (and the queue drained) at exit.
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def normalize_log_levels(value) -> dict:
+    """Config value -> {subsystem: level name} with every subsystem present and unknown names dropped."""
+    levels = dict(DEFAULT_LOG_LEVELS)
+    if hasattr(value, "items"):
+        for name, level in value.items():
+            level = str(level or "").upper()
+            if name in LOG_SUBSYSTEMS and level in LOG_LEVELS:
+                levels[name] = level
+    return levels
+
+
+def apply_log_levels(value: Optional[dict]):
+    for name, level in normalize_log_levels(value).items():
+        for logger_name in LOG_SUBSYSTEMS[name]:
+            logging.getLogger(logger_name).setLevel(level)
@@ -0,0 +1,124 @@
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# reverse reads go back in blocks of this size and give up after LOG_TAIL_MAX_BYTES
+LOG_BLOCK_SIZE = 64 * 1024
+LOG_TAIL_MAX_BYTES = 2 * 1024 * 1024
+# a cursor further behind than this is answered with a fresh tail (reset) instead of the backlog
+LOG_CURSOR_MAX_BYTES = 512 * 1024
+
+ANSI_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+# noisy HTTP access lines that never reach the UI
+SKIP_MARKERS = ("GET /api/", "GET / ", "GET /favicon.ico")
+
+
+def clean_lines(raw_lines) -> List[str]:
+    out = []
+    for raw in raw_lines:
+        line = raw.decode("utf-8", "ignore") if isinstance(raw, bytes) else raw
+        line = line.rstrip("\r")
+        if any(marker in line for marker in SKIP_MARKERS):
+            continue
+        out.append(ANSI_RE.sub("", line))
+    return out
+
+
+def format_cursor(inode: int, offset: int) -> str:
+    return f"{inode}:{offset}"
+
+
+def parse_cursor(cursor: str) -> Tuple[int, int]:
+    """'<inode>:<offset>' -> (inode, offset); ValueError for anything else."""
+    inode, sep, offset = str(cursor).partition(":")
+    if not sep:
+        raise ValueError("cursor must be <inode>:<offset>")
+    inode, offset = int(inode), int(offset)
+    if inode < 0 or offset < 0:
+        raise ValueError("cursor must be <inode>:<offset>")
+    return inode, offset
+
+
+def tail_lines(path: Path, count: int = 400, max_bytes: int = LOG_TAIL_MAX_BYTES) -> Tuple[List[str], str]:
+    """
+    Last `count` displayable lines of a log, read backwards block by block, plus a cursor at the end
+    of the last complete line (a line still being written is left for the next read_since).
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return [], format_cursor(0, 0)
+    with f:
+        st = os.fstat(f.fileno())
+        pos = st.st_size
+        cursor = None
+        carry = b""
+        collected: List[str] = []
+        while pos > 0 and (count <= 0 or len(collected) < count) and st.st_size - pos < max_bytes:
+            step = min(LOG_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + carry
+            if cursor is None:
+                nl = data.rfind(b"\n")
+                if nl < 0:
+                    carry = data
+                    continue
+                cursor = pos + nl + 1
+                data = data[:nl]
+            parts = data.split(b"\n")
+            carry = parts[0]
+            collected = clean_lines(parts[1:]) + collected
+        if pos == 0 and cursor is not None:
+            # the carry starts at the beginning of the file, so it is a whole line
+            collected = clean_lines([carry]) + collected
+        if count > 0:
+            collected = collected[-count:]
+        return collected, format_cursor(st.st_ino, cursor or 0)
+
+
+def _read_complete(path: Path, inode: int, offset: int, limit: int) -> Optional[Tuple[bytes, int]]:
+    """Bytes from offset up to the last newline of the file with this inode, or None if it is gone/too far behind."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        st = os.fstat(f.fileno())
+        if st.st_ino != inode or offset > st.st_size or st.st_size - offset > limit:
+            return None
+        f.seek(offset)
+        data = f.read(st.st_size - offset)
+    nl = data.rfind(b"\n")
+    if nl < 0:
+        return b"", offset
+    return data[:nl + 1], offset + nl + 1
+
+
+def read_since(path: Path, cursor: str, count: int = 400) -> dict:
+    """
+    Lines appended since `cursor` (from tail_lines or an earlier read_since). After a rotation the rest
+    of the rotated file (<name>.1) is read first; if the cursor's file is gone, was truncated, or is more
+    than LOG_CURSOR_MAX_BYTES behind, a fresh tail is returned with reset=True.
+    """
+    inode, offset = parse_cursor(cursor)
+    path = Path(path)
+    try:
+        current = os.stat(path).st_ino
+    except FileNotFoundError:
+        return {"lines": [], "cursor": format_cursor(0, 0), "reset": inode != 0}
+    chunks = []
+    if inode != current:
+        rotated = _read_complete(path.with_name(path.name + ".1"), inode, offset, LOG_CURSOR_MAX_BYTES)
+        if rotated is not None:
+            chunks.append(rotated[0])
+            inode, offset = current, 0
+    if inode == current:
+        fresh = _read_complete(path, inode, offset, LOG_CURSOR_MAX_BYTES)
+        if fresh is not None:
+            chunks.append(fresh[0])
+            lines = clean_lines(b"".join(chunks).split(b"\n")[:-1])
+            return {"lines": lines[-count:] if count > 0 else lines, "cursor": format_cursor(inode, fresh[1]), "reset": False}
+    lines, new_cursor = tail_lines(path, count)
+    return {"lines": lines, "cursor": new_cursor, "reset": True}
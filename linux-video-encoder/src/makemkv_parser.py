@@ -1,6 +1,13 @@
+import hashlib
 import re
 from typing import Any, Dict, List, Optional
 
+# Bulky per-scan text kept out of the status payload (served by /api/disc/details instead)
+DISC_DETAIL_KEYS = ("raw", "formatted")
+TITLE_DETAIL_KEYS = ("tinfo", "sinfo")
+TITLE_COMPACT_KEYS = ("id", "playlist", "duration", "duration_seconds", "chapters", "cells")
+NO_DISC_MARKERS = ("failed to open disc", "can't find any usable optical drives")
+
 
 def _parse_duration_to_seconds(val: str) -> Optional[float]:
     """Parse duration strings like 1:23:45 or PT1H23M45S into seconds."""
@@ -53,6 +60,46 @@ def _dedup(seq: List[str]) -> List[str]:
     return out
 
 
+def _streams_of(streams: Dict[int, Dict[str, Any]], kind: str) -> List[Dict[str, Any]]:
+    return [s for s in streams.values() if str(s.get("type", "")).lower().startswith(kind)]
+
+
+def _video_summary(title: Dict[str, Any]) -> Optional[str]:
+    """'codec resolution framerate' of the first video stream, else the TINFO video text."""
+    video_streams = _streams_of(title.get("streams") or {}, "video")
+    if video_streams:
+        v = video_streams[0]
+        bits = [v[k] for k in ("codec", "resolution", "framerate") if v.get(k)]
+        return " ".join(bits) if bits else None
+    return title.get("video") or None
+
+
+def _audio_summary(audio_streams: List[Dict[str, Any]]) -> List[str]:
+    """Audio streams grouped as 'lang codec channels xN', most common first."""
+    agg = {}
+    for a in audio_streams:
+        lang = a.get("lang_code") or a.get("lang_name") or "und"
+        codec = a.get("codec") or ""
+        ch = a.get("channels") or ""
+        key = (lang, codec, ch)
+        agg[key] = agg.get(key, 0) + 1
+    audio_bits = []
+    for (lang, codec, ch), count in sorted(agg.items(), key=lambda kv: kv[1], reverse=True):
+        desc = lang
+        if codec:
+            desc += f" {codec}"
+        if ch:
+            desc += f" {ch}"
+        if count > 1:
+            desc += f" x{count}"
+        audio_bits.append(desc)
+    return audio_bits
+
+
+def _subtitle_langs(subtitle_streams: List[Dict[str, Any]]) -> List[str]:
+    return _dedup([s.get("lang_code") or s.get("lang_name") or "und" for s in subtitle_streams])
+
+
 def format_disc_overview(parsed: Dict[str, Any]) -> str:
     """Build a human-friendly overview string from parsed MakeMKV info."""
     if not parsed:
@@ -100,44 +147,14 @@ def format_disc_overview(parsed: Dict[str, Any]) -> str:
         if t.get("chapters") is not None:
             parts.append(f"{t['chapters']} chapters")
         # Video summary
-        video_str = None
         streams = t.get("streams") or {}
-        video_streams = [s for s in streams.values() if str(s.get("type", "")).lower().startswith("video")]
-        if video_streams:
-            v = video_streams[0]
-            bits = []
-            if v.get("codec"):
-                bits.append(v["codec"])
-            if v.get("resolution"):
-                bits.append(v["resolution"])
-            if v.get("framerate"):
-                bits.append(v["framerate"])
-            if bits:
-                video_str = "video: " + " ".join(bits)
-        if not video_streams and t.get("video"):
-            video_str = "video: " + t["video"]
+        video_str = _video_summary(t)
         if video_str:
-            parts.append(video_str)
+            parts.append("video: " + video_str)
         # Audio summary
-        audio_streams = [s for s in streams.values() if str(s.get("type", "")).lower().startswith("audio")]
+        audio_streams = _streams_of(streams, "audio")
         if audio_streams:
-            agg = {}
-            for a in audio_streams:
-                lang = a.get("lang_code") or a.get("lang_name") or "und"
-                codec = a.get("codec") or ""
-                ch = a.get("channels") or ""
-                key = (lang, codec, ch)
-                agg[key] = agg.get(key, 0) + 1
-            audio_bits = []
-            for (lang, codec, ch), count in sorted(agg.items(), key=lambda kv: kv[1], reverse=True):
-                desc = lang
-                if codec:
-                    desc += f" {codec}"
-                if ch:
-                    desc += f" {ch}"
-                if count > 1:
-                    desc += f" x{count}"
-                audio_bits.append(desc)
+            audio_bits = _audio_summary(audio_streams)
             if audio_bits:
                 audio_short = ", ".join(audio_bits[:4])
                 if len(audio_bits) > 4:
@@ -148,12 +165,9 @@ def format_disc_overview(parsed: Dict[str, Any]) -> str:
             suffix = "…" if len(audio_list) > 2 else ""
             parts.append("audio: " + "; ".join(audio_list[:2]) + suffix)
         # Subtitle summary
-        subtitle_streams = [s for s in streams.values() if str(s.get("type", "")).lower().startswith("subtitle")]
+        subtitle_streams = _streams_of(streams, "subtitle")
         if subtitle_streams:
-            langs = []
-            for s in subtitle_streams:
-                langs.append(s.get("lang_code") or s.get("lang_name") or "und")
-            langs = _dedup(langs)
+            langs = _subtitle_langs(subtitle_streams)
             sub_short = ", ".join(langs[:6])
             if len(langs) > 6:
                 sub_short += " …"
@@ -389,3 +403,75 @@ def parse_makemkv_info_output(raw: str) -> Dict[str, Any]:
     if formatted:
         parsed["formatted"] = formatted
     return parsed
+
+
+def compact_title(title: Dict[str, Any]) -> Dict[str, Any]:
+    """Ids, duration, playlist and a stream summary for one parsed title, without the TINFO/SINFO lines."""
+    out = {k: title[k] for k in TITLE_COMPACT_KEYS if title.get(k) is not None}
+    streams = title.get("streams") or {}
+    video = _video_summary(title)
+    if video:
+        out["video"] = video
+    audio = _audio_summary(_streams_of(streams, "audio")) or title.get("audio_tracks") or []
+    if audio:
+        out["audio"] = audio
+    subtitles = _subtitle_langs(_streams_of(streams, "subtitle")) or title.get("subtitle_langs") or []
+    if subtitles:
+        out["subtitles"] = subtitles
+    return out
+
+
+def disc_detail_id(info: Any) -> Optional[str]:
+    """Content hash of a disc scan's raw output; changes whenever the detail text would."""
+    payload = (info.get("info") if isinstance(info, dict) else info) or {}
+    raw = (payload.get("raw") if isinstance(payload, dict) else "") or (info.get("raw") if isinstance(info, dict) else "") or ""
+    if not raw:
+        return None
+    return hashlib.sha1(raw.encode("utf-8", "replace")).hexdigest()[:12]
+
+
+def compact_disc_info(info: Any) -> Any:
+    """
+    Status-sized copy of a tracker disc_info entry ({"disc_index", "source", "info": parsed, ...}).
+    Raw output, the formatted overview and per-title TINFO/SINFO lines are dropped; "detail_id"
+    names the full version for /api/disc/details.
+    """
+    if not isinstance(info, dict):
+        return info
+    out = {k: v for k, v in info.items() if k not in DISC_DETAIL_KEYS}
+    payload = info.get("info")
+    raw = info.get("raw") or ""
+    if isinstance(payload, dict):
+        raw = payload.get("raw") or raw
+        compact = {k: v for k, v in payload.items() if k not in DISC_DETAIL_KEYS and k != "titles"}
+        if "titles" in payload:
+            compact["titles"] = [compact_title(t) for t in payload.get("titles") or []]
+        out["info"] = compact
+    if raw:
+        out["detail_id"] = disc_detail_id(info)
+        out["raw_size"] = len(raw)
+        raw_low = raw.lower()
+        if any(marker in raw_low for marker in NO_DISC_MARKERS):
+            out["no_disc"] = True
+    return out
+
+
+def disc_details(info: Any) -> Dict[str, Any]:
+    """The parts compact_disc_info leaves out: raw output, formatted overview and TINFO/SINFO lines per title."""
+    payload = (info.get("info") if isinstance(info, dict) else info) or {}
+    if not isinstance(payload, dict):
+        payload = {}
+    top = info if isinstance(info, dict) else {}
+    details = {
+        "detail_id": disc_detail_id(info),
+        "raw": payload.get("raw") or top.get("raw") or "",
+        "formatted": payload.get("formatted") or top.get("formatted") or "",
+        "titles": [
+            dict({"id": t.get("id")}, **{k: t.get(k) or [] for k in TITLE_DETAIL_KEYS})
+            for t in payload.get("titles") or []
+        ],
+    }
+    for key in ("summary", "error"):
+        if payload.get(key):
+            details[key] = payload[key]
+    return details
@@ -0,0 +1,315 @@
+import logging
+import math
+import os
+import subprocess
+import threading
+import time
+from array import array
+from typing import Dict, Optional
+
+# one sample per second kept for an hour, then one averaged point per minute for a day
+METRICS_INTERVAL_SEC = 1.0
+FINE_POINTS = 3600
+COARSE_STEP_SEC = 60
+COARSE_POINTS = 1440
+# nvidia-smi is a process spawn and statvfs can block on a slow mount: sample those less often
+GPU_INTERVAL_SEC = 5.0
+FS_INTERVAL_SEC = 10.0
+SECTOR_BYTES = 512
+MB = 1024 * 1024
+# series kept in the history rings (everything else is only in the latest sample)
+HISTORY_FIELDS = ("cpu_pct", "mem_used_mb", "disk_read_mbs", "disk_write_mbs", "net_rx_mbs", "net_tx_mbs", "gpu_util")
+
+
+def read_cpu_times():
+    """(busy, total) jiffies from the aggregate cpu line of /proc/stat."""
+    try:
+        with open("/proc/stat", "r", encoding="utf-8") as f:
+            fields = [int(v) for v in f.readline().split()[1:9]]
+    except Exception:
+        return None
+    idle = fields[3] + fields[4]
+    total = sum(fields)
+    return total - idle, total
+
+
+def read_meminfo():
+    mem = {"total_mb": None, "used_mb": None}
+    try:
+        info = {}
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split(":")
+                if len(parts) < 2:
+                    continue
+                info[parts[0].strip()] = int(parts[1].strip().split()[0])
+        total_kb = info.get("MemTotal", 0)
+        avail_kb = info.get("MemAvailable", 0)
+        mem["total_mb"] = round(total_kb / 1024, 1)
+        mem["used_mb"] = round((total_kb - avail_kb) / 1024, 1)
+    except Exception:
+        pass
+    return mem
+
+
+def read_netdev() -> Dict[str, tuple]:
+    """iface -> (rx_bytes, tx_bytes), loopback excluded."""
+    out = {}
+    try:
+        with open("/proc/net/dev", "r", encoding="utf-8") as f:
+            for line in f:
+                if ":" not in line:
+                    continue
+                iface, rest = line.split(":", 1)
+                iface = iface.strip()
+                parts = rest.split()
+                if iface == "lo" or len(parts) < 9:
+                    continue
+                out[iface] = (int(parts[0]), int(parts[8]))
+    except Exception:
+        pass
+    return out
+
+
+def _whole_disks():
+    try:
+        return {d for d in os.listdir("/sys/block") if not d.startswith(("loop", "ram"))}
+    except OSError:
+        return None
+
+
+def read_diskstats(disks=None) -> Dict[str, tuple]:
+    """device -> (bytes_read, bytes_written) for whole disks (partitions would double count)."""
+    out = {}
+    try:
+        with open("/proc/diskstats", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 14:
+                    continue
+                name = parts[2]
+                if disks is not None and name not in disks:
+                    continue
+                # sectors read at index 5, written at index 9
+                out[name] = (int(parts[5]) * SECTOR_BYTES, int(parts[9]) * SECTOR_BYTES)
+    except Exception:
+        pass
+    return out
+
+
+def read_gpu():
+    try:
+        res = subprocess.run(
+            ["nvidia-smi", "--query-gpu=utilization.gpu,memory.used,memory.total", "--format=csv,noheader,nounits"],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=10,
+        )
+        if res.returncode != 0 or not res.stdout.strip():
+            return None
+        parts = [p.strip() for p in res.stdout.strip().splitlines()[0].split(",")]
+        if len(parts) >= 3:
+            return {"util": int(parts[0]), "mem_used_mb": int(parts[1]), "mem_total_mb": int(parts[2])}
+    except Exception:
+        pass
+    return None
+
+
+def read_fs(path="/mnt/output"):
+    try:
+        st = os.statvfs(path)
+        return {
+            "path": path,
+            "free_gb": round(st.f_frsize * st.f_bavail / (1024 ** 3), 1),
+            "total_gb": round(st.f_frsize * st.f_blocks / (1024 ** 3), 1),
+        }
+    except Exception:
+        return None
+
+
+def _rate(now_val, prev_val, dt):
+    return max(0.0, (now_val - prev_val) / MB / dt) if dt > 0 else 0.0
+
+
+def _num(v):
+    return None if v is None or math.isnan(v) else round(v, 2)
+
+
+class MetricRing:
+    """Fixed-size ring of timestamps and float32 series (NaN marks a missing value)."""
+
+    def __init__(self, size: int, fields=HISTORY_FIELDS):
+        self.size = size
+        self.fields = fields
+        self.ts = array("d", [0.0] * size)
+        self.series = {f: array("f", [math.nan] * size) for f in fields}
+        self.head = 0
+        self.count = 0
+
+    def append(self, ts: float, values: Dict[str, Optional[float]]):
+        i = self.head
+        self.ts[i] = ts
+        for f in self.fields:
+            v = values.get(f)
+            self.series[f][i] = math.nan if v is None else v
+        self.head = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def since(self, cutoff: float) -> dict:
+        start = (self.head - self.count) % self.size
+        idx = [(start + n) % self.size for n in range(self.count)]
+        idx = [i for i in idx if self.ts[i] >= cutoff]
+        out = {"ts": [round(self.ts[i], 3) for i in idx]}
+        for f in self.fields:
+            col = self.series[f]
+            out[f] = [_num(col[i]) for i in idx]
+        return out
+
+
+class MetricsSampler:
+    """
+    Samples CPU, memory, disk and network counters every METRICS_INTERVAL_SEC on a daemon thread and
+    turns them into rates. Requests read the latest sample and the history rings; nothing is spawned
+    or read from /proc on the request path.
+    """
+
+    def __init__(self, fs_path: str = "/mnt/output", interval: float = METRICS_INTERVAL_SEC):
+        self.fs_path = fs_path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._fine = MetricRing(FINE_POINTS)
+        self._coarse = MetricRing(COARSE_POINTS)
+        self._bucket = None
+        self._bucket_sums = {}
+        self._latest = {}
+        self._prev = None
+        self._gpu = None
+        self._gpu_at = float("-inf")
+        self._fs = None
+        self._fs_at = float("-inf")
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            # prime the counters so the first request already has a sample
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        next_at = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.05, next_at - time.monotonic())):
+            next_at += self.interval
+            try:
+                self.sample()
+            except Exception:
+                logging.getLogger(__name__).debug("Metrics sample failed", exc_info=True)
+            # fell behind (suspend, long nvidia-smi): resync instead of sampling in a burst
+            next_at = max(next_at, time.monotonic())
+
+    def sample(self):
+        now = time.time()
+        mono = time.monotonic()
+        cpu = read_cpu_times()
+        net = read_netdev()
+        disks = read_diskstats(_whole_disks())
+        mem = read_meminfo()
+        if mono - self._gpu_at >= GPU_INTERVAL_SEC:
+            self._gpu, self._gpu_at = read_gpu(), mono
+        if mono - self._fs_at >= FS_INTERVAL_SEC:
+            self._fs, self._fs_at = read_fs(self.fs_path), mono
+        prev, self._prev = self._prev, (mono, cpu, net, disks)
+        load1, load5, load15 = os.getloadavg()
+        rx = sum(v[0] for v in net.values())
+        tx = sum(v[1] for v in net.values())
+        rd = sum(v[0] for v in disks.values())
+        wr = sum(v[1] for v in disks.values())
+        latest = {
+            "cpu_load": [round(load1, 2), round(load5, 2), round(load15, 2)],
+            "cpu_pct": None,
+            "mem": mem,
+            "net": {"rx_mb": round(rx / MB, 1), "tx_mb": round(tx / MB, 1), "rx_mbs": None, "tx_mbs": None},
+            "block": {"read_mb": round(rd / MB, 1), "write_mb": round(wr / MB, 1), "read_mbs": None, "write_mbs": None, "devices": {}},
+            "gpu": self._gpu,
+            "fs": self._fs,
+            "interval": self.interval,
+            "ts": now,
+        }
+        if prev is not None:
+            dt = mono - prev[0]
+            if cpu and prev[1] and cpu[1] > prev[1][1]:
+                latest["cpu_pct"] = round(100.0 * (cpu[0] - prev[1][0]) / (cpu[1] - prev[1][1]), 1)
+            prx = sum(v[0] for k, v in prev[2].items() if k in net)
+            ptx = sum(v[1] for k, v in prev[2].items() if k in net)
+            crx = sum(v[0] for k, v in net.items() if k in prev[2])
+            ctx = sum(v[1] for k, v in net.items() if k in prev[2])
+            latest["net"]["rx_mbs"] = round(_rate(crx, prx, dt), 2)
+            latest["net"]["tx_mbs"] = round(_rate(ctx, ptx, dt), 2)
+            devices = {}
+            for name, (r, w) in disks.items():
+                if name in prev[3]:
+                    pr, pw = prev[3][name]
+                    devices[name] = {"read_mbs": round(_rate(r, pr, dt), 2), "write_mbs": round(_rate(w, pw, dt), 2)}
+            latest["block"]["devices"] = devices
+            latest["block"]["read_mbs"] = round(sum(d["read_mbs"] for d in devices.values()), 2)
+            latest["block"]["write_mbs"] = round(sum(d["write_mbs"] for d in devices.values()), 2)
+        point = {
+            "cpu_pct": latest["cpu_pct"],
+            "mem_used_mb": mem.get("used_mb"),
+            "disk_read_mbs": latest["block"]["read_mbs"],
+            "disk_write_mbs": latest["block"]["write_mbs"],
+            "net_rx_mbs": latest["net"]["rx_mbs"],
+            "net_tx_mbs": latest["net"]["tx_mbs"],
+            "gpu_util": (self._gpu or {}).get("util"),
+        }
+        with self._lock:
+            self._latest = latest
+            self._fine.append(now, point)
+            self._downsample(now, point)
+        return latest
+
+    def _downsample(self, now: float, point: dict):
+        """Average fine points into one coarse point per COARSE_STEP_SEC (caller holds self._lock)."""
+        bucket = int(now // COARSE_STEP_SEC)
+        if self._bucket is not None and bucket != self._bucket and self._bucket_sums:
+            avg = {f: (s / n if n else None) for f, (s, n) in self._bucket_sums.items()}
+            self._coarse.append(self._bucket * COARSE_STEP_SEC, avg)
+            self._bucket_sums = {}
+        self._bucket = bucket
+        for f in HISTORY_FIELDS:
+            s, n = self._bucket_sums.get(f, (0.0, 0))
+            v = point.get(f)
+            self._bucket_sums[f] = (s + v, n + 1) if v is not None else (s, n)
+
+    def latest(self) -> dict:
+        with self._lock:
+            return dict(self._latest)
+
+    def history(self, seconds: float = 3600) -> dict:
+        """Points from the last `seconds`: 1 s resolution up to an hour, 1 min averages beyond."""
+        cutoff = time.time() - seconds
+        with self._lock:
+            if seconds <= FINE_POINTS * self.interval:
+                data, step = self._fine.since(cutoff), self.interval
+            else:
+                data, step = self._coarse.since(cutoff), COARSE_STEP_SEC
+        data["step_sec"] = step
+        return data
+
+
+_SAMPLER = None
+_SAMPLER_LOCK = threading.Lock()
+
+
+def get_metrics_sampler() -> MetricsSampler:
+    global _SAMPLER
+    with _SAMPLER_LOCK:
+        if _SAMPLER is None:
+            _SAMPLER = MetricsSampler().start()
+        return _SAMPLER
@@ -0,0 +1,209 @@
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# request latencies are mostly milliseconds; disc scans and scanner passes run to minutes
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SCAN_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+MBPS_BUCKETS = (5.0, 10.0, 25.0, 50.0, 100.0, 200.0, 400.0, 800.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _num(value) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Family:
+    kind = "unknown"
+
+    def __init__(self, name: str, doc: str, labels=(), unit: str = ""):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labels)
+        self.unit = unit
+        self._lock = threading.Lock()
+        self._children: Dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        out = [f"# TYPE {self.name} {self.kind}"]
+        if self.unit:
+            out.append(f"# UNIT {self.name} {self.unit}")
+        out.append(f"# HELP {self.name} {_escape(self.doc)}")
+        return out
+
+
+class Counter(_Family):
+    """Monotonic counter; exposed with the _total suffix (name it without)."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._children.items())
+        return self.header() + [f"{self.name}_total{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._children[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._children.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Family):
+    """Cumulative-bucket histogram; observe() is a bisect plus a few adds under the family lock."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels=(), unit: str = "", buckets=HTTP_BUCKETS):
+        super().__init__(name, doc, labels, unit)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                # per-bucket counts (not cumulative) + the +Inf bucket, then sum
+                child = self._children[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            idx = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    idx = i
+                    break
+            child[0][idx] += 1
+            child[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._children.items())
+        out = self.header()
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                running += n
+                le = (("le", _num(bound)),)
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+        return out
+
+
+class GaugeCallback(_Family):
+    """Gauge family computed at scrape time: fn() returns [(label values tuple, value), ...]."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, fn: Callable, labels=(), unit: str = ""):
+        super().__init__(name, doc, labels, unit)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            items = sorted(self.fn() or [])
+        except Exception:
+            items = []
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+
+    def register(self, family: _Family) -> _Family:
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None and existing.kind != family.kind:
+                raise ValueError(f"metric {family.name} already registered as {existing.kind}")
+            # callbacks may be re-registered (e.g. a second create_app in tests); last one wins
+            if existing is None or isinstance(family, GaugeCallback):
+                self._families[family.name] = family
+                return family
+            return existing
+
+    def counter(self, name: str, doc: str, labels=(), unit: str = "") -> Counter:
+        return self.register(Counter(name, doc, labels, unit))
+
+    def gauge(self, name: str, doc: str, labels=(), unit: str = "") -> Gauge:
+        return self.register(Gauge(name, doc, labels, unit))
+
+    def histogram(self, name: str, doc: str, labels=(), unit: str = "", buckets=HTTP_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, doc, labels, unit, buckets))
+
+    def callback(self, name: str, doc: str, fn: Callable, labels=(), unit: str = "") -> GaugeCallback:
+        return self.register(GaugeCallback(name, doc, fn, labels, unit))
+
+    def render(self) -> str:
+        with self._lock:
+            families = [self._families[n] for n in sorted(self._families)]
+        lines: List[str] = []
+        for family in families:
+            lines.extend(family.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Metrics fed from the encode pipeline; everything is kept in memory and only formatted on scrape.
+JOBS = REGISTRY.counter("autoencoder_jobs", "Finished jobs by outcome and profile", ("outcome", "profile"))
+DISC_SCAN_SECONDS = REGISTRY.histogram(
+    "autoencoder_makemkv_scan_seconds", "MakeMKV disc info scan latency", ("result",), "seconds", SCAN_BUCKETS
+)
+SCANNER_PASS_SECONDS = REGISTRY.histogram(
+    "autoencoder_scanner_pass_seconds", "Duration of one scan over all search roots", (), "seconds", SCAN_BUCKETS
+)
+STAGING_BYTES = REGISTRY.counter("autoencoder_staging_copied_bytes", "Bytes copied into staging", ("kind",), "bytes")
+STAGING_SECONDS = REGISTRY.counter("autoencoder_staging_copy_seconds", "Time spent copying into staging", ("kind",), "seconds")
+STAGING_MBPS = REGISTRY.histogram(
+    "autoencoder_staging_copy_mbps", "Throughput of individual staging copies in MB/s", ("kind",), "", MBPS_BUCKETS
+)
+LOG_RECORDS_DROPPED = REGISTRY.counter("autoencoder_log_records_dropped", "Log records dropped because the log queue was full")
+HTTP_SECONDS = REGISTRY.histogram(
+    "autoencoder_http_request_seconds", "HTTP request latency by route", ("route", "method", "code"), "seconds"
+)
+
+
+def observe_copy(kind: str, size_bytes: Optional[int], seconds: float):
+    """Record one staging copy (size in bytes, wall time in seconds)."""
+    if not size_bytes or seconds <= 0:
+        return
+    STAGING_BYTES.inc(size_bytes, kind=kind)
+    STAGING_SECONDS.inc(seconds, kind=kind)
+    STAGING_MBPS.observe(size_bytes / (1024 * 1024) / seconds, kind=kind)
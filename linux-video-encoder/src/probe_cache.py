@@ -0,0 +1,169 @@
+import json
+import logging
+import sqlite3
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+PROBE_CACHE_PATH = Path("/var/lib/autoencoder/state/probe_cache.db")
+PROBE_CACHE_MAX_ENTRIES = 5000
+PROBE_TIMEOUT_SEC = 120
+
+
+def _file_key(path: Path):
+    """Cache key: a file only keeps its probe while path, size, mtime and inode are unchanged."""
+    st = path.stat()
+    return (str(path), st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def run_ffprobe(path: Path) -> Optional[dict]:
+    """One full probe (format + every stream) that all the probe_* helpers are derived from."""
+    try:
+        proc = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", str(path)],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=PROBE_TIMEOUT_SEC,
+        )
+    except Exception:
+        logging.debug("ffprobe failed for %s", path, exc_info=True)
+        return None
+    if proc.returncode != 0 or not proc.stdout:
+        return None
+    try:
+        data = json.loads(proc.stdout)
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class ProbeCache:
+    """
+    ffprobe results keyed by (path, size, mtime, inode), kept in memory and in SQLite so
+    they survive restarts. Concurrent lookups for the same file share one in-flight probe;
+    failed probes are only remembered in memory (the file may still be copying).
+    """
+
+    def __init__(self, path: Optional[Path] = PROBE_CACHE_PATH, max_entries: int = PROBE_CACHE_MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._mem = {}
+        self._inflight = {}
+        self._max_entries = max_entries
+        self._conn = None
+        if path is not None:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS probes ("
+                    "path TEXT, size INTEGER, mtime_ns INTEGER, inode INTEGER, probed_at REAL, data TEXT, "
+                    "PRIMARY KEY (path, size, mtime_ns, inode))"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS probes_probed_at ON probes(probed_at)")
+                self._prune()
+            except Exception:
+                logging.warning("Probe cache at %s unavailable; caching in memory only", path, exc_info=True)
+                self._conn = None
+
+    def _prune(self):
+        with self._db_lock:
+            self._conn.execute(
+                "DELETE FROM probes WHERE rowid NOT IN (SELECT rowid FROM probes ORDER BY probed_at DESC LIMIT ?)",
+                (self._max_entries,),
+            )
+
+    def _db_get(self, key) -> Optional[dict]:
+        if self._conn is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT data FROM probes WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?", key
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception:
+            logging.debug("Probe cache read failed for %s", key[0], exc_info=True)
+            return None
+
+    def _db_put(self, key, data: dict):
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock:
+                # one row per path: older size/mtime/inode variants are stale by definition
+                self._conn.execute("DELETE FROM probes WHERE path = ?", (key[0],))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO probes (path, size, mtime_ns, inode, probed_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (time.time(), json.dumps(data)),
+                )
+        except Exception:
+            logging.debug("Probe cache write failed for %s", key[0], exc_info=True)
+
+    def get(self, path: Path, runner=run_ffprobe) -> Optional[dict]:
+        path = Path(path)
+        try:
+            if not path.is_file():
+                return None
+            key = _file_key(path)
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._mem:
+                return self._mem[key]
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[key] = event
+        if not owner:
+            event.wait(PROBE_TIMEOUT_SEC)
+            with self._lock:
+                return self._mem.get(key)
+        data = None
+        try:
+            data = self._db_get(key)
+            if data is None:
+                data = runner(path)
+                if data is not None:
+                    self._db_put(key, data)
+        finally:
+            with self._lock:
+                # drop entries for older versions of this path before remembering the new one
+                for old in [k for k in self._mem if k[0] == key[0] and k != key]:
+                    self._mem.pop(old, None)
+                self._mem[key] = data
+                while len(self._mem) > self._max_entries:
+                    self._mem.pop(next(iter(self._mem)))
+                self._inflight.pop(key, None)
+            event.set()
+        return data
+
+    def invalidate(self, path: Path):
+        path_str = str(path)
+        with self._lock:
+            for old in [k for k in self._mem if k[0] == path_str]:
+                self._mem.pop(old, None)
+        if self._conn is not None:
+            try:
+                with self._db_lock:
+                    self._conn.execute("DELETE FROM probes WHERE path = ?", (path_str,))
+            except Exception:
+                logging.debug("Probe cache invalidate failed for %s", path_str, exc_info=True)
+
+
+_PROBE_CACHE = None
+_PROBE_CACHE_LOCK = threading.Lock()
+
+
+def get_probe_cache() -> ProbeCache:
+    global _PROBE_CACHE
+    with _PROBE_CACHE_LOCK:
+        if _PROBE_CACHE is None:
+            _PROBE_CACHE = ProbeCache(PROBE_CACHE_PATH)
+        return _PROBE_CACHE
@@ -0,0 +1,242 @@
+import logging
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+
+# how often active jobs' process trees are sampled from /proc
+PROC_SAMPLE_SEC = 2.0
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+MB = 1024 * 1024
+
+
+class AccountedPopen(subprocess.Popen):
+    """
+    Popen whose public poll()/wait() reap the child with os.wait4, so wait()/poll()/communicate()
+    leave the child's rusage (which covers its own waited-for descendants) in .rusage.
+    """
+
+    rusage = None
+
+    def __init__(self, *args, **kwargs):
+        self._reap_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _reap(self, block: bool) -> bool:
+        """wait4 the child once; True when returncode is set. A non-blocking call never waits for the lock."""
+        if self.returncode is not None:
+            return True
+        if not self._reap_lock.acquire(blocking=block):
+            return False
+        try:
+            if self.returncode is not None:
+                return True
+            try:
+                pid, status, ru = os.wait4(self.pid, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                # same fallback as Popen: the child was reaped elsewhere and its status is lost
+                self.returncode = 0
+                return True
+            if pid != self.pid:
+                return False
+            self.rusage = ru
+            self.returncode = os.waitstatus_to_exitcode(status)
+            return True
+        finally:
+            self._reap_lock.release()
+
+    def poll(self):
+        self._reap(block=False)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if timeout is None:
+            self._reap(block=True)
+            return self.returncode
+        deadline = time.monotonic() + timeout
+        delay = 0.0005
+        while not self._reap(block=False):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+        return self.returncode
+
+
+def rusage_totals(procs) -> Optional[dict]:
+    """Summed wait4 rusage of reaped processes (None if none of them carried one)."""
+    usages = [p.rusage for p in procs if getattr(p, "rusage", None) is not None]
+    if not usages:
+        return None
+    return {
+        "user_sec": round(sum(ru.ru_utime for ru in usages), 2),
+        "sys_sec": round(sum(ru.ru_stime for ru in usages), 2),
+        # ru_maxrss is in KiB on Linux
+        "max_rss_mb": round(max(ru.ru_maxrss for ru in usages) / 1024, 1),
+        "read_mb": round(sum(ru.ru_inblock for ru in usages) * 512 / MB, 1),
+        "write_mb": round(sum(ru.ru_oublock for ru in usages) * 512 / MB, 1),
+        "procs": len(usages),
+    }
+
+
+def merge_rusage(a: Optional[dict], b: Optional[dict]) -> Optional[dict]:
+    if not a or not b:
+        return a or b
+    return {
+        "user_sec": round(a["user_sec"] + b["user_sec"], 2),
+        "sys_sec": round(a["sys_sec"] + b["sys_sec"], 2),
+        "max_rss_mb": max(a["max_rss_mb"], b["max_rss_mb"]),
+        "read_mb": round(a["read_mb"] + b["read_mb"], 1),
+        "write_mb": round(a["write_mb"] + b["write_mb"], 1),
+        "procs": a["procs"] + b["procs"],
+    }
+
+
+def read_proc_stat(pid: int) -> Optional[dict]:
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    # comm is parenthesised and may itself contain spaces or ')'
+    fields = data[data.rfind(")") + 2:].split()
+    if len(fields) < 22:
+        return None
+    return {
+        "ppid": int(fields[1]),
+        "ticks": int(fields[11]) + int(fields[12]),
+        "threads": int(fields[17]),
+        "start": int(fields[19]),
+        "rss": int(fields[21]) * PAGE_SIZE,
+    }
+
+
+def read_proc_io(pid: int):
+    """(read_bytes, write_bytes) actually sent to storage; (0, 0) when /proc/<pid>/io is unreadable."""
+    rd = wr = 0
+    try:
+        with open(f"/proc/{pid}/io", "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, val = line.partition(":")
+                if key == "read_bytes":
+                    rd = int(val)
+                elif key == "write_bytes":
+                    wr = int(val)
+    except (OSError, ValueError):
+        pass
+    return rd, wr
+
+
+def _children_map() -> Dict[int, list]:
+    children: Dict[int, list] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        st = read_proc_stat(int(name))
+        if st is not None:
+            children.setdefault(st["ppid"], []).append(int(name))
+    return children
+
+
+def descendants(roots, children: Dict[int, list]) -> list:
+    out = []
+    stack = list(roots)
+    seen = set()
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        out.append(pid)
+        stack.extend(children.get(pid, ()))
+    return out
+
+
+class _JobUsage:
+    def __init__(self):
+        # (pid, starttime) -> (ticks, read_bytes, write_bytes) at the last sample
+        self.live = {}
+        self.gone_ticks = 0
+        self.gone_read = 0
+        self.gone_write = 0
+        self.last_total_ticks = None
+        self.last_at = None
+        self.peak_rss = 0
+
+
+class ProcAccountant:
+    """
+    Samples every active job's process tree (registered children plus all their descendants) from
+    /proc/<pid>/stat and /proc/<pid>/io and attaches CPU %, CPU seconds, RSS, threads and I/O to the
+    job via tracker.update_resources. Processes that exit between samples keep their last counters.
+    """
+
+    def __init__(self, tracker, interval: float = PROC_SAMPLE_SEC):
+        self.tracker = tracker
+        self.interval = interval
+        self._jobs: Dict[str, _JobUsage] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="proc-accounting", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                logging.getLogger(__name__).debug("Process accounting sample failed", exc_info=True)
+
+    def sample(self):
+        roots = self.tracker.job_pids()
+        for src in list(self._jobs):
+            if src not in roots:
+                self._jobs.pop(src, None)
+        if not roots:
+            return
+        children = _children_map()
+        now = time.monotonic()
+        for src, pids in roots.items():
+            usage = self._jobs.setdefault(src, _JobUsage())
+            seen = {}
+            rss = threads = 0
+            for pid in descendants(pids, children):
+                st = read_proc_stat(pid)
+                if st is None:
+                    continue
+                rd, wr = read_proc_io(pid)
+                seen[(pid, st["start"])] = (st["ticks"], rd, wr)
+                rss += st["rss"]
+                threads += st["threads"]
+            for key, (ticks, rd, wr) in usage.live.items():
+                if key not in seen:
+                    usage.gone_ticks += ticks
+                    usage.gone_read += rd
+                    usage.gone_write += wr
+            usage.live = seen
+            total_ticks = usage.gone_ticks + sum(v[0] for v in seen.values())
+            cpu_pct = None
+            if usage.last_at is not None and now > usage.last_at:
+                cpu_pct = round(100.0 * (total_ticks - usage.last_total_ticks) / CLK_TCK / (now - usage.last_at), 1)
+            usage.last_total_ticks, usage.last_at = total_ticks, now
+            usage.peak_rss = max(usage.peak_rss, rss)
+            self.tracker.update_resources(src, {
+                "cpu_pct": cpu_pct,
+                "cpu_sec": round(total_ticks / CLK_TCK, 1),
+                "rss_mb": round(rss / MB, 1),
+                "peak_rss_mb": round(usage.peak_rss / MB, 1),
+                "threads": threads,
+                "procs": len(seen),
+                "read_mb": round((usage.gone_read + sum(v[1] for v in seen.values())) / MB, 1),
+                "write_mb": round((usage.gone_write + sum(v[2] for v in seen.values())) / MB, 1),
+            })
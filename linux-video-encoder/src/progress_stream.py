@@ -0,0 +1,248 @@
+import codecs
+import json
+import os
+import re
+import select
+import time
+from typing import Callable, Optional
+
+# tracker / chunk-aggregator updates are passed on at most this often; the newest value always wins
+PROGRESS_UPDATE_SEC = 1.0
+# raw reads from the encoder pipes, and how long a silent pipe waits before the caller gets a tick
+READ_CHUNK_BYTES = 64 * 1024
+IDLE_POLL_SEC = 0.5
+# a fragment with no \r or \n within this many characters is cut and emitted as is (bounded memory)
+MAX_LINE_CHARS = 64 * 1024
+# --json blocks bigger than this (title sets of large discs) are skipped instead of buffered
+MAX_JSON_BLOCK_CHARS = 256 * 1024
+# app.log gets one progress line per this many percent instead of every fragment
+LOG_PROGRESS_STEP_PCT = 10
+
+LINE_SPLIT_RE = re.compile(r"[\r\n]")
+JSON_START_RE = re.compile(r"^([A-Za-z][A-Za-z ]*):\s*(\{.*)$")
+# "Encoding: task 1 of 1, 12.34 % (41.23 fps, avg 38.90 fps, ETA 00h10m00s)"
+TEXT_PCT_RE = re.compile(r"([0-9]{1,3}(?:[.,][0-9]{1,2})?)\s*%")
+TEXT_FPS_RE = re.compile(r"\(\s*([0-9]+(?:\.[0-9]+)?)\s*fps", re.IGNORECASE)
+TEXT_ETA_RE = re.compile(r"ETA\s+([0-9hms:]+)", re.IGNORECASE)
+ETA_HMS_RE = re.compile(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?", re.IGNORECASE)
+# carriage-return status fragments from HandBrake (no --json) and ffmpeg; never logged line by line
+PROGRESS_PREFIXES = ("Encoding: task", "Muxing:", "Scanning title", "frame=", "size=")
+
+
+def iter_output(*streams, poll_sec: float = IDLE_POLL_SEC, max_line: int = MAX_LINE_CHARS):
+    """
+    Yield (stream index, line) from binary pipes as soon as a \\r or \\n ends a fragment, reading raw
+    chunks from non-blocking fds. Yields None whenever every pipe was silent for poll_sec, so callers
+    can flush throttled state. Ends when all pipes reach EOF.
+    """
+    fds = {}
+    for idx, stream in enumerate(streams):
+        if stream is None:
+            continue
+        fd = stream.fileno()
+        os.set_blocking(fd, False)
+        fds[fd] = [idx, codecs.getincrementaldecoder("utf-8")("replace"), ""]
+    while fds:
+        ready, _, _ = select.select(list(fds), [], [], poll_sec)
+        if not ready:
+            yield None
+            continue
+        for fd in ready:
+            state = fds[fd]
+            try:
+                data = os.read(fd, READ_CHUNK_BYTES)
+            except BlockingIOError:
+                continue
+            if data:
+                text = state[2] + state[1].decode(data)
+            else:
+                text = state[2] + state[1].decode(b"", final=True) + "\n"
+                del fds[fd]
+            parts = LINE_SPLIT_RE.split(text)
+            pending = parts.pop()
+            for part in parts:
+                if part:
+                    yield state[0], part
+            while len(pending) > max_line:
+                yield state[0], pending[:max_line]
+                pending = pending[max_line:]
+            state[2] = pending
+
+
+def parse_eta_seconds(token: str) -> Optional[int]:
+    """HandBrake/ffmpeg ETA tokens: HH:MM:SS, MM:SS or 1h2m3s style."""
+    token = (token or "").strip()
+    if not token:
+        return None
+    try:
+        if ":" in token:
+            parts = [int(p) for p in token.split(":") if p != ""]
+            if len(parts) == 3:
+                return parts[0] * 3600 + parts[1] * 60 + parts[2]
+            if len(parts) == 2:
+                return parts[0] * 60 + parts[1]
+            return None
+    except ValueError:
+        return None
+    m = ETA_HMS_RE.match(token)
+    if m and any(m.groups()):
+        return int(m.group(1) or 0) * 3600 + int(m.group(2) or 0) * 60 + int(m.group(3) or 0)
+    return None
+
+
+def parse_text_progress(line: str) -> Optional[dict]:
+    """pct/fps/eta from a plain-text HandBrake status fragment, or None if it carries none."""
+    m = TEXT_PCT_RE.search(line)
+    if not m:
+        return None
+    out = {"pct": float(m.group(1).replace(",", "."))}
+    m_fps = TEXT_FPS_RE.search(line)
+    if m_fps:
+        out["fps"] = float(m_fps.group(1))
+    m_eta = TEXT_ETA_RE.search(line)
+    if m_eta:
+        out["eta"] = parse_eta_seconds(m_eta.group(1))
+    return out
+
+
+def json_progress(block: dict) -> Optional[dict]:
+    """pct (over all passes)/fps/eta from a HandBrake --json "Progress" block, or None if not encoding."""
+    working = block.get("Working") if block.get("State") == "WORKING" else None
+    if not isinstance(working, dict):
+        return None
+    try:
+        frac = float(working.get("Progress", 0.0))
+        passes = max(1, int(working.get("PassCount") or 1))
+        current = min(passes, max(1, int(working.get("Pass") or 1)))
+    except (TypeError, ValueError):
+        return None
+    out = {"pct": round(100.0 * ((current - 1) + frac) / passes, 2)}
+    if working.get("Rate") is not None:
+        out["fps"] = round(float(working["Rate"]), 2)
+    if working.get("ETASeconds") is not None and current == passes:
+        # HandBrake's ETA covers the current pass only; trust it once the last pass runs
+        out["eta"] = int(working["ETASeconds"])
+    return out
+
+
+class HandBrakeJsonReader:
+    """
+    Reassembles HandBrakeCLI --json output: a 'Name: {' line, pretty-printed members, and a lone '}'.
+    feed() returns True for lines that belong to a block; complete blocks are handed to on_block.
+    """
+
+    def __init__(self, on_block: Callable[[str, dict], None], max_chars: int = MAX_JSON_BLOCK_CHARS):
+        self.on_block = on_block
+        self.max_chars = max_chars
+        self._name = None
+        self._parts = []
+        self._size = 0
+
+    def feed(self, line: str) -> bool:
+        if self._name is None:
+            m = JSON_START_RE.match(line)
+            if not m:
+                return False
+            self._name, self._parts, self._size = m.group(1), [m.group(2)], len(m.group(2))
+            if m.group(2).strip() != "{":
+                # compact single-line block
+                self._finish()
+            return True
+        if self._size <= self.max_chars:
+            self._parts.append(line)
+            self._size += len(line)
+        if line.rstrip() == "}":
+            self._finish()
+        return True
+
+    def _finish(self):
+        name, parts, size = self._name, self._parts, self._size
+        self._name, self._parts, self._size = None, [], 0
+        if size > self.max_chars:
+            return
+        try:
+            block = json.loads("\n".join(parts))
+        except ValueError:
+            return
+        if isinstance(block, dict):
+            self.on_block(name, block)
+
+
+class ProgressThrottle:
+    """Holds the newest pct/fps/eta and passes them to on_update at most once per interval."""
+
+    def __init__(self, on_update: Callable[[Optional[float], Optional[float], Optional[int]], None],
+                 interval: float = PROGRESS_UPDATE_SEC):
+        self.on_update = on_update
+        self.interval = interval
+        self.pct = self.fps = self.eta = None
+        self._dirty = False
+        self._last = float("-inf")
+
+    def update(self, pct=None, fps=None, eta=None):
+        if pct is not None:
+            self.pct = max(0.0, min(100.0, pct))
+        if fps is not None:
+            self.fps = fps
+        if eta is not None:
+            self.eta = eta
+        self._dirty = True
+        self.flush()
+
+    def flush(self, force: bool = False):
+        now = time.monotonic()
+        if self._dirty and (force or now - self._last >= self.interval):
+            self._dirty = False
+            self._last = now
+            self.on_update(self.pct, self.fps, self.eta)
+
+
+def _float(value) -> float:
+    try:
+        return float(value or 0)
+    except ValueError:
+        return 0.0
+
+
+class FfmpegProgressReader:
+    """
+    Parses ffmpeg `-progress pipe:1` key=value output; each block ends with a progress= line, at which
+    point pct (against the source duration), fps and eta go to on_progress. feed() returns True for
+    progress lines.
+    """
+
+    def __init__(self, duration_sec: Optional[float], on_progress: Callable[..., None]):
+        self.duration = duration_sec or 0.0
+        self.on_progress = on_progress
+        self._fields = {}
+
+    def feed(self, line: str) -> bool:
+        key, sep, value = line.strip().partition("=")
+        if not sep or not key.replace("_", "").isalnum():
+            return False
+        self._fields[key] = value.strip()
+        if key == "progress":
+            self._finish(value.strip() == "end")
+        return True
+
+    def _finish(self, ended: bool):
+        fields, self._fields = self._fields, {}
+        out = {}
+        try:
+            # out_time_ms is microseconds too (a long-standing ffmpeg quirk)
+            pos = int(fields.get("out_time_us") or fields.get("out_time_ms") or 0) / 1_000_000
+        except ValueError:
+            pos = 0.0
+        if ended:
+            out["pct"] = 100.0
+        elif self.duration > 0 and pos > 0:
+            out["pct"] = round(100.0 * pos / self.duration, 2)
+        fps = _float(fields.get("fps"))
+        # speed is "N/A" until ffmpeg has timed a few frames
+        speed = _float((fields.get("speed") or "").rstrip("x"))
+        if fps > 0:
+            out["fps"] = round(fps, 2)
+        if speed > 0 and self.duration > pos > 0:
+            out["eta"] = int((self.duration - pos) / speed)
+        if out:
+            self.on_progress(**out)
@@ -0,0 +1,138 @@
+from typing import Optional, Tuple
+
+from resolution import DEFAULT_MAX_HEIGHT, DEFAULT_MAX_WIDTH
+
+REMUX_MODES = ("off", "auto")
+# HandBrake / ffmpeg encoder name -> the codec it produces; a source is only copied into the same codec
+ENCODER_CODECS = {
+    "x264": "h264", "x264_10bit": "h264", "qsv_h264": "h264", "nvenc_h264": "h264", "vce_h264": "h264",
+    "libx264": "h264", "h264_qsv": "h264", "h264_nvenc": "h264", "h264_vaapi": "h264",
+    "x265": "hevc", "x265_10bit": "hevc", "x265_12bit": "hevc", "qsv_h265": "hevc", "qsv_h265_10bit": "hevc",
+    "nvenc_h265": "hevc", "nvenc_h265_10bit": "hevc", "vce_h265": "hevc",
+    "libx265": "hevc", "hevc_qsv": "hevc", "hevc_nvenc": "hevc", "hevc_vaapi": "hevc",
+}
+# HandBrake audio encoder -> ffprobe codec_name of its output (a source already in it is copied)
+AUDIO_ENCODER_CODECS = {"av_aac": "aac", "av_aac_he": "aac", "opus": "opus", "ac3": "ac3", "eac3": "eac3"}
+# what ffmpeg's mp4 muxer takes as is; anything else is transcoded (mkv takes everything)
+MP4_AUDIO_CODECS = {"aac", "ac3", "eac3", "mp3", "alac", "opus", "flac"}
+TEXT_SUBTITLE_CODECS = {"subrip", "srt", "ass", "ssa", "mov_text", "webvtt", "text"}
+INTERLACED_FIELD_ORDERS = {"tt", "bb", "tb", "bt"}
+
+
+def _int(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _streams(probe: dict, codec_type: str) -> list:
+    return [s for s in probe.get("streams") or [] if s.get("codec_type") == codec_type]
+
+
+def stream_kbps(stream: dict, probe: dict) -> Optional[float]:
+    """Video bitrate: the stream's own, then Matroska's BPS statistics tag, then the container's (upper bound)."""
+    tags = stream.get("tags") or {}
+    for value in (stream.get("bit_rate"), tags.get("BPS"), tags.get("BPS-eng"), (probe.get("format") or {}).get("bit_rate")):
+        bps = _int(value)
+        if bps:
+            return bps / 1000.0
+    return None
+
+
+def plan_remux(probe: Optional[dict], opts: dict, target_kbps: Optional[float], container: str,
+               external_sub: Optional[str] = None) -> Tuple[Optional[dict], str]:
+    """
+    Decide whether a source can be stream-copied into the profile's container instead of encoded.
+    Returns (plan, reason): plan is None when any rule fails, and reason says which one. The plan
+    is JSON-safe (it is recorded on the job) and carries the audio and subtitle choices for the mux.
+    """
+    if not probe:
+        return None, "source could not be probed"
+    videos = _streams(probe, "video")
+    video = next((s for s in videos if not (s.get("disposition") or {}).get("attached_pic")), None)
+    if video is None:
+        return None, "no video stream"
+    codec = str(video.get("codec_name") or "").lower()
+    encoder = str(opts.get("encoder") or "x264").lower()
+    target_codec = ENCODER_CODECS.get(encoder)
+    if codec not in ("h264", "hevc"):
+        return None, f"source codec {codec or 'unknown'} is not H.264/HEVC"
+    if codec != target_codec:
+        return None, f"source codec {codec} does not match encoder {encoder}"
+    width, height = _int(video.get("width")), _int(video.get("height"))
+    max_w = _int(opts.get("width")) or DEFAULT_MAX_WIDTH
+    max_h = _int(opts.get("height")) or DEFAULT_MAX_HEIGHT
+    if not width or not height:
+        return None, "source resolution unknown"
+    if width > max_w or height > max_h:
+        return None, f"source {width}x{height} is above the target {max_w}x{max_h}"
+    if str(video.get("field_order") or "").lower() in INTERLACED_FIELD_ORDERS:
+        return None, "source is interlaced"
+    source_kbps = stream_kbps(video, probe)
+    if not source_kbps or not target_kbps:
+        return None, "source or target bitrate unknown"
+    if source_kbps > target_kbps:
+        return None, f"source {int(source_kbps)} kbps is above the target {int(target_kbps)} kbps"
+    if opts.get("subtitle_mode") == "burn_forced":
+        return None, "burned subtitles need an encode"
+    if opts.get("extra_args"):
+        return None, "profile has extra HandBrake arguments"
+    if opts.get("_apply_audio_offset") and opts.get("audio_offset_ms") not in (None, "", 0, "0"):
+        return None, "audio offset needs an encode"
+
+    mp4 = container.lower() in (".mp4", ".m4v")
+    audio_mode = opts.get("audio_mode", "encode")
+    source_audio = str((_streams(probe, "audio") or [{}])[0].get("codec_name") or "").lower()
+    if not source_audio:
+        audio = "none"
+    elif audio_mode == "copy":
+        audio = "copy"
+    elif audio_mode == "auto_dolby":
+        audio = "copy" if source_audio in ("ac3", "eac3") else "transcode"
+    else:
+        audio = "copy" if source_audio == AUDIO_ENCODER_CODECS.get(opts.get("audio_encoder") or "av_aac") else "transcode"
+    if audio == "copy" and mp4 and source_audio not in MP4_AUDIO_CODECS:
+        if audio_mode == "copy":
+            return None, f"{source_audio} audio cannot be copied into {container}"
+        audio = "transcode"
+
+    # (ffmpeg input spec, subtitle codec) per output subtitle; mp4 only carries text subtitles
+    subtitles = []
+    if opts.get("subtitle_mode") == "copy_all":
+        for stream in _streams(probe, "subtitle"):
+            sub_codec = str(stream.get("codec_name") or "").lower()
+            if not mp4:
+                subtitles.append({"input": f"0:{stream.get('index')}", "codec": "copy"})
+            elif sub_codec in TEXT_SUBTITLE_CODECS:
+                subtitles.append({"input": f"0:{stream.get('index')}", "codec": "mov_text"})
+    if external_sub:
+        subtitles.append({"input": "1:0", "codec": "mov_text" if mp4 else "srt", "default": True})
+
+    try:
+        duration = float((probe.get("format") or {}).get("duration") or 0) or None
+    except (TypeError, ValueError):
+        duration = None
+    plan = {
+        "video_codec": codec,
+        "width": width,
+        "height": height,
+        "source_kbps": round(source_kbps),
+        "target_kbps": round(target_kbps),
+        "audio": audio,
+        "subtitles": subtitles,
+        "external_sub": external_sub,
+        "container": container,
+        "duration_sec": duration,
+    }
+    return plan, "stream copy"
+
+
+def remux_subtitle_args(plan: dict) -> list:
+    """ffmpeg -map/-c:s/-disposition args for the plan's subtitles."""
+    args = []
+    for idx, sub in enumerate(plan.get("subtitles") or []):
+        args.extend(["-map", sub["input"], f"-c:s:{idx}", sub["codec"]])
+        if sub.get("default"):
+            args.extend([f"-disposition:s:{idx}", "default"])
+    return args
@@ -0,0 +1,63 @@
+from typing import Optional, Sequence
+
+# HandBrake's frame size when a profile has no width/height (see run_encoder)
+DEFAULT_MAX_WIDTH = 1920
+DEFAULT_MAX_HEIGHT = 1080
+MODULI = (2, 4, 8, 16)
+DEFAULT_MODULUS = 2
+
+
+def _snap(value: float, modulus: int, limit: int) -> int:
+    """Nearest multiple of modulus, rounded down instead when that would exceed limit."""
+    snapped = int(round(value / modulus)) * modulus
+    if snapped > limit:
+        snapped = (int(limit) // modulus) * modulus
+    return max(modulus, snapped)
+
+
+def normalize_crop(crop: Optional[Sequence], width: int, height: int) -> list:
+    """[top, bottom, left, right] clamped so at least a quarter of each axis is kept; [0, 0, 0, 0] if unusable."""
+    try:
+        top, bottom, left, right = (max(0, int(v)) for v in crop)
+    except (TypeError, ValueError):
+        return [0, 0, 0, 0]
+    if width - left - right < width // 4 or height - top - bottom < height // 4:
+        return [0, 0, 0, 0]
+    return [top, bottom, left, right]
+
+
+def plan_resolution(width: Optional[int], height: Optional[int], max_width: Optional[int] = None,
+                    max_height: Optional[int] = None, crop: Optional[Sequence] = None,
+                    modulus: int = DEFAULT_MODULUS) -> Optional[dict]:
+    """
+    Output frame size for a source: the cropped picture scaled down (never up) to fit inside
+    max_width x max_height, keeping its aspect ratio, with both sides snapped to the modulus.
+    Returns None when the source size is unknown. The plan is JSON-safe; it is recorded on the job.
+    """
+    try:
+        width, height = int(width or 0), int(height or 0)
+    except (TypeError, ValueError):
+        return None
+    if width <= 0 or height <= 0:
+        return None
+    max_width = int(max_width or DEFAULT_MAX_WIDTH)
+    max_height = int(max_height or DEFAULT_MAX_HEIGHT)
+    modulus = modulus if modulus in MODULI else DEFAULT_MODULUS
+    crop = normalize_crop(crop, width, height)
+    crop_w = width - crop[2] - crop[3]
+    crop_h = height - crop[0] - crop[1]
+    scale = min(1.0, max_width / crop_w, max_height / crop_h)
+    out_w = _snap(crop_w * scale, modulus, min(crop_w, max_width))
+    out_h = _snap(out_w * crop_h / crop_w, modulus, min(crop_h, max_height))
+    return {
+        "source": [width, height],
+        "crop": crop,
+        "cropped": [crop_w, crop_h],
+        "width": out_w,
+        "height": out_h,
+        "max": [max_width, max_height],
+        "modulus": modulus,
+        "scaled": scale < 1.0,
+        # relative aspect ratio change caused by snapping to the modulus
+        "aspect_error": round(abs((out_w / out_h) / (crop_w / crop_h) - 1.0), 4),
+    }
@@ -1,4 +1,14 @@
+import errno
+import logging
 import os
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+
+import inotify_watch
+from block_topology import get_device_topology
+from openmetrics import SCANNER_PASS_SECONDS
 
 # Explicit paths we never want to scan for media
 EXCLUDED_SCAN_PATHS = {
@@ -25,25 +35,404 @@ IGNORED_DIRNAMES = {
     ".Trash",
     ".Trash-1000",
 }
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.flv', '.wmv', '.m4v')
+# time-based fallback (network filesystems, files without a close event): a file must keep the
+# same size this long, and be at least MIN_AGE old, before it is a candidate
+STABLE_WINDOW_SEC = 20
+MIN_AGE_SEC = 60
+# a file its writer closed (IN_CLOSE_WRITE / renamed into place) with no writer left open only
+# has to keep its size for this long
+CLOSE_SETTLE_SEC = 2
+# minimum gap between inotify-triggered main loop wakeups
+WATCH_WAKE_MIN_INTERVAL = 2.0
+# job store kv key of the old whole-index blob, moved into per-file scan_files rows on load
+SCAN_STATE_KEY = "scanner_index"
+# roots are scanned concurrently; a root that overruns its budget (hung SMB mount, dying USB
+# stick) is marked degraded and skipped with exponential backoff up to SCAN_BACKOFF_MAX_SEC
+SCAN_MAX_WORKERS = 8
+SCAN_ROOT_BUDGET_SEC = 20.0
+SCAN_BACKOFF_BASE_SEC = 30.0
+SCAN_BACKOFF_MAX_SEC = 600.0
+# mount readiness probes (probe_mount) run on the same pool and give up after this long
+MOUNT_PROBE_TIMEOUT_SEC = 5.0
+
+
+def _probe_mount(path):
+    if not os.path.ismount(path):
+        return "not-mounted"
+    try:
+        os.listdir(path)
+    except OSError as exc:
+        return f"error:{getattr(exc, 'errno', 'unknown')}"
+    return "ready"
+
+
+class ScanTimeout(Exception):
+    """A root walk ran past its deadline."""
+WATCH_MASK = (
+    inotify_watch.IN_CREATE | inotify_watch.IN_DELETE | inotify_watch.IN_MOVED_FROM | inotify_watch.IN_MOVED_TO
+    | inotify_watch.IN_CLOSE_WRITE | inotify_watch.IN_ATTRIB | inotify_watch.IN_DELETE_SELF
+    | inotify_watch.IN_MOVE_SELF | inotify_watch.IN_ONLYDIR
+)
+
+
+def _is_video_name(name):
+    return not name.startswith("._") and name.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def _paths_open_for_write(paths):
+    """Return the subset of paths some visible process holds open for writing (via /proc/*/fd)."""
+    wanted = set(paths)
+    found = set()
+    if not wanted:
+        return found
+    try:
+        pids = [e.name for e in os.scandir("/proc") if e.name.isdigit()]
+    except OSError:
+        return found
+    for pid in pids:
+        try:
+            fds = list(os.scandir(f"/proc/{pid}/fd"))
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(fd.path)
+            except OSError:
+                continue
+            if target not in wanted or target in found:
+                continue
+            try:
+                with open(f"/proc/{pid}/fdinfo/{fd.name}") as fh:
+                    flags = next((int(line.split()[1], 8) for line in fh if line.startswith("flags:")), 0)
+            except (OSError, ValueError, IndexError):
+                continue
+            if flags & (os.O_WRONLY | os.O_RDWR):
+                found.add(target)
+        if found == wanted:
+            break
+    return found
+
+
+class RootIndex:
+    """
+    In-memory index of video files under one scan root. inotify events mark files as
+    changed; only changed files are stat'ed on a pass, so a pass costs O(changes).
+    A full walk reconciles the index periodically, after an event queue overflow, and on
+    every pass when inotify is unavailable for the root (no watches left, unsupported fs).
+    A walk that runs past the pass deadline is resumed by the next pass from its unvisited
+    directories; files it found are indexed right away, stale entries only go once it completes.
+    """
+
+    def __init__(self, root, scanner, saved=None):
+        self.root = root
+        self.scanner = scanner
+        self.files = {}  # path -> {"size", "mtime", "seen", "stable", "closed", "closed_at", "closed_size"}
+        self.pending = set()
+        # path -> entry to persist, or None to delete its row; only settled (stable) entries are stored,
+        # so a growing file costs no writes until it becomes stable or goes away
+        self.persist = {}
+        # entries persisted by a previous run; the first (forced) reconcile re-checks them
+        for path, entry in (saved or {}).items():
+            if isinstance(entry, dict) and path.startswith(root.rstrip('/') + '/'):
+                self.files[path] = dict(entry)
+                if not entry.get("stable"):
+                    self.pending.add(path)
+        self.dirs = {}  # dir -> wd
+        self.wds = {}  # wd -> dir
+        self.notifier = None
+        self.polling = True
+        self.needs_reconcile = True
+        self.last_reconcile = 0.0
+        # reconcile in progress: directories still to visit, and video files seen so far (None when idle)
+        self.walk_stack = None
+        self.walk_seen = None
+        # absolute time the current pass must finish walking by (set per pass by the scanner)
+        self.deadline = None
+        try:
+            self.dev = os.stat(root).st_dev
+        except OSError:
+            self.dev = None
+        self.notifier = inotify_watch.init_inotify()
+        self.polling = self.notifier is None
+
+    def close(self):
+        if self.notifier is not None:
+            self.notifier.close()
+        self.notifier = None
+        self.dirs = {}
+        self.wds = {}
+
+    def _fall_back_to_polling(self, reason):
+        logging.getLogger(__name__).warning("inotify unavailable for %s (%s); rescanning it every pass", self.root, reason)
+        self.close()
+        self.polling = True
+
+    def _watch_dir(self, path):
+        if self.notifier is None or path in self.dirs:
+            return
+        try:
+            wd = self.notifier.add_watch(path, WATCH_MASK)
+        except OSError as exc:
+            if exc.errno == errno.ENOSPC:
+                self._fall_back_to_polling("out of inotify watches; raise fs.inotify.max_user_watches")
+            else:
+                logging.getLogger(__name__).debug("inotify watch failed for %s: %s", path, exc)
+            return
+        old = self.wds.get(wd)
+        if old and old != path:
+            self.dirs.pop(old, None)
+        self.dirs[path] = wd
+        self.wds[wd] = path
+
+    def _forget_prefix(self, prefix):
+        trimmed = prefix.rstrip('/') + '/'
+        for path in [p for p in self.files if p.startswith(trimmed)]:
+            self._drop(path)
+        for d in [d for d in self.dirs if d == prefix or d.startswith(trimmed)]:
+            self.wds.pop(self.dirs.pop(d), None)
+
+    def _add_tree(self, top, now):
+        """Walk a (new) subtree: index its video files as pending and watch its directories."""
+        for dirpath, files in self.scanner._walk_dirs(top, self.deadline):
+            if not self.polling:
+                self._watch_dir(dirpath)
+            for name in files:
+                if _is_video_name(name):
+                    self._mark_changed(os.path.join(dirpath, name), now)
+
+    def _mark_changed(self, path, now, closed=False):
+        entry = self.files.get(path)
+        if entry is None:
+            entry = {"size": None, "mtime": None, "seen": now, "stable": False}
+            self.files[path] = entry
+        elif entry.get("stable"):
+            self.persist[path] = None
+        entry["stable"] = False
+        if closed:
+            entry.update(closed=True, closed_at=now, closed_size=None)
+        self.pending.add(path)
+        if self.walk_seen is not None:
+            # created behind the walk (in a directory it already visited): it exists, keep it
+            self.walk_seen.add(path)
+
+    def _drop(self, path):
+        entry = self.files.pop(path, None)
+        if entry is not None and entry.get("stable"):
+            self.persist[path] = None
+        self.pending.discard(path)
+        if self.walk_seen is not None:
+            self.walk_seen.discard(path)
+
+    def reset_walk(self):
+        """Abandon a partial reconcile; the next one starts again from the root."""
+        self.walk_stack = None
+        self.walk_seen = None
+
+    def reconcile(self, now):
+        """
+        Walk the root (resuming a walk cut short by an earlier pass) until done or past the deadline.
+        Returns True once the walk completed and entries it did not see were dropped.
+        """
+        if self.walk_stack is None:
+            self.walk_stack = [self.root]
+            self.walk_seen = set()
+        try:
+            for dirpath, files in self.scanner._walk_dirs(self.root, self.deadline, self.walk_stack):
+                if not self.polling:
+                    self._watch_dir(dirpath)
+                for name in files:
+                    if _is_video_name(name):
+                        self._reconcile_file(os.path.join(dirpath, name), now)
+        except ScanTimeout:
+            logging.getLogger(__name__).info("Walk of %s continues next pass (%d directories left, %d files seen)",
+                                             self.root, len(self.walk_stack), len(self.walk_seen))
+            return False
+        for path in [p for p in self.files if p not in self.walk_seen]:
+            self._drop(path)
+        self.reset_walk()
+        self.needs_reconcile = False
+        self.last_reconcile = now
+        return True
+
+    def _reconcile_file(self, path, now):
+        self.walk_seen.add(path)
+        if path not in self.files:
+            self._mark_changed(path, now)
+        elif self.files[path].get("stable"):
+            # cheap check that stable entries did not change behind inotify's back (network fs)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            entry = self.files[path]
+            if st.st_size != entry.get("size") or st.st_mtime != entry.get("mtime"):
+                entry["closed"] = False
+                self._mark_changed(path, now)
+
+    def drain_events(self, now):
+        if self.notifier is None:
+            return
+        try:
+            events = list(self.notifier.read_events())
+        except OSError as exc:
+            self._fall_back_to_polling(str(exc))
+            return
+        for wd, mask, _cookie, name in events:
+            if mask & inotify_watch.IN_Q_OVERFLOW:
+                self.needs_reconcile = True
+                continue
+            base = self.wds.get(wd)
+            if base is None:
+                continue
+            if not name:
+                # subdirectory moves/deletes are handled from the parent's events; a self event
+                # only matters for the root itself, and IN_IGNORED just retires the watch
+                if base == self.root and mask & (inotify_watch.IN_DELETE_SELF | inotify_watch.IN_MOVE_SELF):
+                    self.needs_reconcile = True
+                if mask & inotify_watch.IN_IGNORED:
+                    self.wds.pop(wd, None)
+                    if self.dirs.get(base) == wd:
+                        self.dirs.pop(base, None)
+                continue
+            path = os.path.join(base, name)
+            if mask & inotify_watch.IN_ISDIR:
+                if mask & (inotify_watch.IN_DELETE | inotify_watch.IN_MOVED_FROM):
+                    self._forget_prefix(path)
+                elif mask & (inotify_watch.IN_CREATE | inotify_watch.IN_MOVED_TO):
+                    if not self.scanner._is_pruned_dir(path, name):
+                        self._add_tree(path, now)
+                continue
+            if not _is_video_name(name):
+                continue
+            if mask & (inotify_watch.IN_DELETE | inotify_watch.IN_MOVED_FROM):
+                self._drop(path)
+            else:
+                # the writer closed the file, or it was renamed into place complete (rsync, Samba)
+                closed = bool(mask & (inotify_watch.IN_CLOSE_WRITE | inotify_watch.IN_MOVED_TO))
+                self._mark_changed(path, now, closed=closed)
+
+    def refresh_pending(self, now):
+        settled = []
+        for path in list(self.pending):
+            entry = self.files.get(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._drop(path)
+                continue
+            if entry.get("closed"):
+                if entry.get("closed_size") is None:
+                    entry["closed_size"] = st.st_size
+                elif entry["closed_size"] != st.st_size:
+                    # written again after the close; wait for the next close event or the time rule
+                    entry["closed"] = False
+            if entry.get("size") != st.st_size:
+                entry.update(size=st.st_size, mtime=st.st_mtime, seen=now)
+                continue
+            entry["mtime"] = st.st_mtime
+            if entry.get("closed"):
+                if now - entry.get("closed_at", now) >= CLOSE_SETTLE_SEC:
+                    settled.append(path)
+                continue
+            if (now - entry.get("seen", now)) >= STABLE_WINDOW_SEC and (now - st.st_mtime) >= MIN_AGE_SEC:
+                self._mark_stable(path)
+        if settled:
+            writers = _paths_open_for_write(settled)
+            for path in settled:
+                if path in writers:
+                    # still held open for writing (e.g. reopened to append): fall back to the time rule
+                    self.files[path]["closed"] = False
+                else:
+                    self._mark_stable(path)
+
+    def _mark_stable(self, path):
+        self.files[path]["stable"] = True
+        self.pending.discard(path)
+        self.persist[path] = dict(self.files[path])
+
+    def next_due(self, now):
+        """Seconds until the earliest pending file could become stable, or None if nothing is pending."""
+        due = None
+        for path in self.pending:
+            entry = self.files.get(path) or {}
+            if entry.get("closed"):
+                at = entry.get("closed_at", now) + CLOSE_SETTLE_SEC
+            else:
+                at = max(entry.get("seen", now) + STABLE_WINDOW_SEC, (entry.get("mtime") or now) + MIN_AGE_SEC)
+            due = at - now if due is None else min(due, at - now)
+        return due
+
+    def update(self, now, reconcile_interval):
+        try:
+            dev = os.stat(self.root).st_dev
+        except OSError:
+            dev = None
+        if dev != self.dev:
+            # remounted or replaced: drop everything and rebuild against the new filesystem
+            self.close()
+            self.persist.update((p, None) for p, e in self.files.items() if e.get("stable"))
+            self.files = {}
+            self.pending = set()
+            self.reset_walk()
+            self.dev = dev
+            self.notifier = inotify_watch.init_inotify()
+            self.polling = self.notifier is None
+            self.needs_reconcile = True
+        self.drain_events(now)
+        if (self.polling or self.needs_reconcile or self.walk_stack is not None
+                or (reconcile_interval > 0 and now - self.last_reconcile >= reconcile_interval)):
+            self.reconcile(now)
+        self.refresh_pending(now)
+
+    def candidates(self):
+        return sorted(p for p, e in self.files.items() if e.get("stable"))
+
+
 class Scanner:
-    def __init__(self, search_path='/'):
+    def __init__(self, search_path='/', state_store=None, on_change=None):
         self.search_path = search_path
+        self._topology = get_device_topology()
         # compute excluded devices/mounts (boot/root and mdadm members)
         self._excluded_mounts = self._compute_excluded_mounts()
         # record mountpoints that this scanner has mounted during a pass
         self._last_mounted = []
         # base dir used for manual mounts
         self._auto_mount_root = '/mnt/auto_media'
+        # incremental per-root file indexes (see RootIndex), persisted to state_store (a JobStore)
+        self._indexes = {}
+        self._index_lock = threading.Lock()
+        self.reconcile_interval = 600.0
+        self._state_store = state_store
+        self._saved_state = {}
+        # persist rows of indexes dropped since the last save
+        self._unsaved = []
+        if state_store is not None:
+            self._saved_state = state_store.scan_files()
+            legacy = state_store.get_value(SCAN_STATE_KEY)
+            if isinstance(legacy, dict):
+                # one-time move from the old whole-index kv blob to per-file rows
+                rows = [(root, path, entry) for root, files in legacy.items() if isinstance(files, dict)
+                        for path, entry in files.items() if isinstance(entry, dict) and entry.get("stable")]
+                state_store.save_scan_files(rows)
+                for root, path, entry in rows:
+                    self._saved_state.setdefault(root, {})[path] = entry
+                state_store.delete_value(SCAN_STATE_KEY)
+        # on_change is called from a watcher thread when inotify reports activity under a root
+        self._on_change = on_change
+        self._drained = threading.Event()
+        self._closed = threading.Event()
+        self._watch_thread = None
+        # per-root scan workers, their in-flight jobs, and health/timing exposed via root_stats()
+        self.root_budget = SCAN_ROOT_BUDGET_SEC
+        self._pool = ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS, thread_name_prefix="scan-root")
+        self._root_jobs = {}
+        self._probe_jobs = {}
+        self._root_stats = {}
 
     def _read_mounts(self):
-        mounts = []
-        with open('/proc/mounts', 'r', encoding='utf-8') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 2:
-                    dev, mnt = parts[0], parts[1]
-                    mounts.append((dev, mnt))
-        return mounts
+        return [(dev, mnt) for dev, mnt, _fstype in self._topology.mounts()]
 
     def _device_basename(self, devnode):
         # normalize device node like "/dev/sda1" -> "sda", "/dev/nvme0n1p1" -> "nvme0n1"
@@ -212,30 +601,19 @@ class Scanner:
         import subprocess, os, logging, shlex
         logger = logging.getLogger(__name__)
         devpath = devnode if devnode.startswith('/dev/') else f'/dev/{devnode}'
+        name = os.path.basename(devpath)
+        topology = self._topology
 
-        def probe_fstype(dev):
-            try:
-                b = subprocess.run(['blkid', '-o', 'value', '-s', 'TYPE', dev],
-                                   capture_output=True, text=True, check=False)
-                f = b.stdout.strip()
-                if f:
-                    return f
-            except Exception:
-                pass
-            try:
-                l = subprocess.run(['lsblk', '-no', 'FSTYPE', dev],
-                                   capture_output=True, text=True, check=False)
-                f = l.stdout.strip()
-                if f:
-                    return f
-            except Exception:
-                pass
-            return ''
-
-        fstype = probe_fstype(devpath)
+        fstype = topology.fstype(name)
         logger.debug("Probed fstype for %s -> %s", devpath, fstype or "<unknown>")
+        # the command that mounted this device last time (it is unmounted again after every pass)
+        remembered = topology.mount_method(name)
 
-        # try udisksctl first (capture and log output)
+        # try udisksctl first (capture and log output), unless a plain mount is known to work
+        if remembered and remembered[0] != 'udisksctl':
+            mounted = self._mount_device_manual(devpath, fstype, remembered)
+            topology.record_mount(name, mounted is not None, mounted and mounted[1])
+            return mounted and mounted[0]
         try:
             res = subprocess.run(['udisksctl', 'mount', '-b', devpath],
                                  capture_output=True, text=True, check=False)
@@ -246,15 +624,12 @@ class Scanner:
                     if ' at ' in part:
                         toks = part.split(' at ', 1)[1].rstrip('.').strip()
                         if os.path.ismount(toks):
+                            topology.record_mount(name, True, ['udisksctl'])
                             return toks
-                try:
-                    fm = subprocess.run(['findmnt', '-n', '-o', 'TARGET', devpath],
-                                        capture_output=True, text=True, check=False)
-                    tgt = fm.stdout.strip()
-                    if tgt:
-                        return tgt
-                except Exception:
-                    pass
+                for dev, mnt, _fstype in topology.mounts():
+                    if dev == devpath:
+                        topology.record_mount(name, True, ['udisksctl'])
+                        return mnt
             else:
                 logger.debug("udisksctl failed to mount %s", devpath)
         except FileNotFoundError:
@@ -262,6 +637,17 @@ class Scanner:
         except Exception as e:
             logger.debug("udisksctl mount attempt raised: %s", e)
 
+        mounted = self._mount_device_manual(devpath, fstype)
+        topology.record_mount(name, mounted is not None, mounted and mounted[1])
+        return mounted and mounted[0]
+
+    def _mount_device_manual(self, devpath, fstype, remembered=None):
+        """
+        Try plain mount commands into the auto-mount root.
+        Returns (mountpoint, working command template) on success, None on failure.
+        """
+        import subprocess, os, logging, shlex
+        logger = logging.getLogger(__name__)
         # fallback: try manual mounts (explicit exfat helpers tried before generic mount)
         mroot = self._auto_mount_root
         try:
@@ -270,6 +656,8 @@ class Scanner:
             os.makedirs(target, exist_ok=True)
 
             mount_cmds = []
+            if remembered:
+                mount_cmds.append([devpath if a == '{dev}' else target if a == '{target}' else a for a in remembered])
             # try explicit detected fstype first
             if fstype:
                 mount_cmds.append(['mount', '-t', fstype, devpath, target])
@@ -289,7 +677,7 @@ class Scanner:
                     res = subprocess.run(cmd, capture_output=True, text=True, check=False)
                     logger.debug("mount cmd=%s rc=%s stdout=%s stderr=%s", shlex.join(cmd), res.returncode, res.stdout.strip(), res.stderr.strip())
                     if res.returncode == 0 and os.path.ismount(target):
-                        return target
+                        return target, ['{dev}' if a == devpath else '{target}' if a == target else a for a in cmd]
                     last_err = (cmd, res.returncode, res.stdout.strip(), res.stderr.strip())
                 except FileNotFoundError as e:
                     logger.debug("mount helper not found for %s: %s", shlex.join(cmd), e)
@@ -318,25 +706,17 @@ class Scanner:
         - include already-mounted candidate mountpoints
         - attempt to mount unmounted partition devices (non-excluded) and include their mountpoints
         """
-        import subprocess, os, logging
+        import os, logging
         mounts = self._read_mounts()
         mounted_points = {mnt for dev, mnt in mounts if dev.startswith('/dev/')}
         # reset last-mounted list for this pass
         self._last_mounted = []
         scan_roots = list(self._candidate_mounts())  # already-mounted and common mounts
 
-        # find unmounted partitions via lsblk and attempt to mount them
+        # find unmounted partitions in the cached device table and attempt to mount them
         try:
-            # include FSTYPE column to help with mount decisions (and better parsing)
-            ls = subprocess.run(['lsblk', '-nr', '-o', 'NAME,TYPE,MOUNTPOINT'],
-                                capture_output=True, text=True, check=True)
-            for line in ls.stdout.splitlines():
-                parts = line.split(None, 3)
-                if len(parts) < 2:
-                    continue
-                name, typ = parts[0], parts[1]
-                mp = parts[2].strip() if len(parts) >= 3 else ''
-                # fstype = parts[3].strip() if len(parts) >= 4 else ''
+            for part in self._topology.partitions():
+                name, typ, mp = part["name"], part["type"], part["mountpoint"]
                 devnode = f'/dev/{name}'
                 # skip non-partition types or already-mounted entries
                 if typ != 'part' or mp:
@@ -352,6 +732,10 @@ class Scanner:
                     continue
                 if name.startswith(('loop', 'ram', 'sr')):
                     continue
+                # a failed device is left alone until the kernel reports a change for it
+                if not self._topology.should_try_mount(name):
+                    logging.debug("Skipping %s: last mount attempt failed", devnode)
+                    continue
                 # attempt mount
                 tgt = self._mount_device(devnode)
                 if tgt:
@@ -376,19 +760,206 @@ class Scanner:
             filtered.append(r)
         return filtered
 
+    def _idle_indexes(self):
+        """Indexes not currently being updated by a (possibly stuck) scan worker."""
+        return [idx for root, idx in list(self._indexes.items()) if root not in self._root_jobs]
+
+    def next_due(self):
+        """Seconds until a changing file could next become stable, so the caller can rescan then."""
+        now = time.time()
+        dues = [d for d in (idx.next_due(now) for idx in self._idle_indexes()) if d is not None]
+        return min(dues) if dues else None
+
+    def _save_state(self):
+        """Write the index entries that settled or went away since the last pass (one row each)."""
+        if self._state_store is None:
+            return
+        rows, self._unsaved = self._unsaved, []
+        for idx in self._idle_indexes():
+            if idx.persist:
+                rows.extend((idx.root, path, entry) for path, entry in idx.persist.items())
+                idx.persist = {}
+        if not rows:
+            return
+        try:
+            self._state_store.save_scan_files(rows)
+        except Exception:
+            logging.getLogger(__name__).debug("Failed to persist scanner index", exc_info=True)
+
+    def _start_watcher(self):
+        if self._on_change is None or self._watch_thread is not None:
+            return
+        if not any(idx.notifier is not None for idx in self._indexes.values()):
+            return
+        self._watch_thread = threading.Thread(target=self._watch_loop, name="scan-watch", daemon=True)
+        self._watch_thread.start()
+
+    def _watch_loop(self):
+        """Wake the main loop when any root's inotify fd becomes readable; events are drained by the next pass."""
+        last_wake = 0.0
+        while not self._closed.is_set():
+            with self._index_lock:
+                fds = [idx.notifier.fd for idx in self._indexes.values() if idx.notifier is not None]
+            if not fds:
+                self._closed.wait(1.0)
+                continue
+            try:
+                readable, _, _ = select.select(fds, [], [], 1.0)
+            except (OSError, ValueError):
+                # an index closed its fd while we were waiting
+                continue
+            if not readable:
+                continue
+            self._closed.wait(max(0.0, WATCH_WAKE_MIN_INTERVAL - (time.time() - last_wake)))
+            self._drained.clear()
+            try:
+                self._on_change()
+            except Exception:
+                logging.getLogger(__name__).debug("Scanner change callback failed", exc_info=True)
+            last_wake = time.time()
+            # the fd stays readable until a pass drains it; wait for that instead of spinning
+            while not self._closed.is_set() and not self._drained.wait(1.0):
+                pass
+
+    def close(self):
+        self._closed.set()
+        self._pool.shutdown(wait=False)
+        with self._index_lock:
+            for idx in self._indexes.values():
+                idx.close()
+            self._indexes = {}
+
+    def _is_pruned_dir(self, full, name):
+        return name in IGNORED_DIRNAMES or self._is_excluded_path(full) or full in EXCLUDED_SCAN_PATHS
+
+    def _walk_dirs(self, top, deadline=None, stack=None):
+        """
+        Yield (dirpath, filenames) under top, pruning ignored and excluded subtrees.
+        Raises ScanTimeout once deadline (a time.time() value) has passed. A caller-owned stack
+        (initially [top]) keeps the unvisited directories, so a cut-short walk can be resumed.
+        """
+        if stack is None:
+            stack = [top]
+        while stack:
+            if deadline is not None and time.time() > deadline:
+                raise ScanTimeout(top)
+            root = stack.pop()
+            # skip excluded subtrees entirely (do not process files here or descend)
+            if self._is_excluded_path(root) or root in EXCLUDED_SCAN_PATHS:
+                continue
+            dirs = []
+            files = []
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if is_dir:
+                            # Prune only directories that are explicitly excluded, otherwise descend into all subdirectories
+                            if not self._is_pruned_dir(entry.path, entry.name):
+                                dirs.append(entry.path)
+                        else:
+                            files.append(entry.name)
+            except OSError as exc:
+                if root == top:
+                    raise
+                logging.getLogger(__name__).debug("Cannot list %s: %s", root, exc)
+                continue
+            stack.extend(sorted(dirs, reverse=True))
+            yield root, files
+
+    def _scan_root(self, search_root, now, deadline):
+        """Scan one root in a worker thread. Returns ("optical", [files]), ("files", [paths]) or ("missing", None)."""
+        logger = logging.getLogger(__name__)
+        # first check for optical disc structures and prefer them over generic walk
+        try:
+            dvd_files = self._scan_dvd_mount(search_root)
+            if dvd_files:
+                logger.info("Collected %d DVD files from %s", len(dvd_files), search_root)
+                return "optical", dvd_files
+            bluray_files = self._scan_bluray_mount(search_root)
+            if bluray_files:
+                logger.info("Collected %d Blu-ray files from %s", len(bluray_files), search_root)
+                return "optical", bluray_files
+        except Exception:
+            logger.debug("Optical scan check failed for %s", search_root)
+        if not os.path.exists(search_root):
+            logger.debug("Search root does not exist: %s", search_root)
+            return "missing", None
+        if not os.path.ismount(search_root):
+            logger.debug("Search root is not a mountpoint (may still be valid): %s", search_root)
+        index = self._indexes.get(search_root)
+        if index is None:
+            index = RootIndex(search_root, self, self._saved_state.pop(search_root, None))
+            with self._index_lock:
+                self._indexes[search_root] = index
+        index.deadline = deadline
+        try:
+            index.update(now, self.reconcile_interval)
+        except Exception:
+            # a new subtree's walk timed out or the root failed: events may have been lost, so start
+            # a fresh full walk next time (a reconcile past the deadline does not raise; it resumes)
+            index.needs_reconcile = True
+            index.reset_walk()
+            raise
+        finally:
+            index.deadline = None
+        found = index.candidates()
+        logger.info("Found %d candidate video files under %s (%d indexed, %d changing, %s%s)",
+                    len(found), search_root, len(index.files), len(index.pending),
+                    "polling" if index.polling else "inotify",
+                    ", walk in progress" if index.walk_stack is not None else "")
+        return "files", found
+
+    def _mark_root(self, root, state, duration, error=None):
+        stats = self._root_stats.setdefault(root, {"failures": 0})
+        stats.update(state=state, last_duration_sec=duration, last_scan_at=time.time(), error=error)
+        if state == "ok":
+            stats.update(failures=0, retry_at=None)
+            return
+        stats["failures"] += 1
+        backoff = min(SCAN_BACKOFF_MAX_SEC, SCAN_BACKOFF_BASE_SEC * (2 ** (stats["failures"] - 1)))
+        stats["retry_at"] = time.time() + backoff
+        logging.getLogger(__name__).warning("Scan root %s %s after %.1fs (%s); skipping it for %.0fs",
+                                            root, state, duration, error or "no detail", backoff)
+
+    def probe_mount(self, path, timeout=MOUNT_PROBE_TIMEOUT_SEC):
+        """
+        Readiness of a mountpoint, checked on the scan pool so a hung device cannot stall the caller:
+        "ready", "not-mounted", "error:<errno>", or "timeout" when the check (or one still stuck from
+        an earlier call) does not return within timeout.
+        """
+        job = self._probe_jobs.get(path)
+        if job is not None and not job.done():
+            return "timeout"
+        future = self._pool.submit(_probe_mount, path)
+        self._probe_jobs[path] = future
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            return "timeout"
+
+    def root_stats(self):
+        """Per-root scan health and timing: state (ok/degraded/error/missing), last duration, failures, retry time."""
+        out = {}
+        for root, stats in self._root_stats.items():
+            item = dict(stats)
+            index = self._indexes.get(root)
+            if index is not None and root not in self._root_jobs:
+                item.update(indexed=len(index.files), changing=len(index.pending),
+                            mode="polling" if index.polling else "inotify",
+                            walk_dirs_left=len(index.walk_stack) if index.walk_stack is not None else 0)
+            item["busy"] = root in self._root_jobs
+            out[root] = item
+        return out
+
     def find_video_files(self, scan_roots=None):
-        import os, logging
         logger = logging.getLogger(__name__)
-        video_extensions = ('.mp4', '.mkv', '.avi', '.mov', '.flv', '.wmv', '.m4v')
-        video_extensions_lower = tuple(e.lower() for e in video_extensions)
         video_files = []
-        excluded_mounts = self._excluded_mounts
-        stable_map = getattr(self, "_stable_map", {})
-        next_map = {}
-        import time
         now = time.time()
-        min_age = 60  # seconds
-        stable_window = 20  # seconds
+        pass_started = time.monotonic()
 
         # determine roots
         if scan_roots is not None:
@@ -401,71 +972,79 @@ class Scanner:
             except Exception:
                 search_paths = self._candidate_mounts()
 
-        logger.info("Scanner will walk these roots: %s", ", ".join(search_paths) if search_paths else "<none>")
+        logger.info("Scanner will check these roots: %s", ", ".join(search_paths) if search_paths else "<none>")
 
-        for search_root in search_paths:
+        # forget jobs that finished since the last pass (including ones that overran their budget)
+        self._root_jobs = {r: (f, t0) for r, (f, t0) in self._root_jobs.items() if not f.done()}
+        budget = max(1.0, float(self.root_budget or SCAN_ROOT_BUDGET_SEC))
+        submitted = []
+        active_roots = set()
+        for search_root in dict.fromkeys(search_paths):
             if search_root in EXCLUDED_SCAN_PATHS:
                 continue
-            # first check for optical disc structures and prefer them over generic walk
+            active_roots.add(search_root)
+            if search_root in self._root_jobs:
+                logger.warning("Scan root %s is still busy from an earlier pass (%.0fs); skipping",
+                               search_root, now - self._root_jobs[search_root][1])
+                continue
+            retry_at = (self._root_stats.get(search_root) or {}).get("retry_at")
+            if retry_at and now < retry_at:
+                logger.info("Scan root %s is degraded; next attempt in %.0fs", search_root, retry_at - now)
+                continue
+            future = self._pool.submit(self._scan_root, search_root, now, now + budget)
+            self._root_jobs[search_root] = (future, time.time())
+            submitted.append((search_root, future))
+
+        wait([f for _, f in submitted], timeout=budget)
+        missing = set()
+        for search_root, future in submitted:
+            started = self._root_jobs[search_root][1]
+            duration = time.time() - started
+            if not future.done() and future.cancel():
+                # never started (all workers busy); not the root's fault
+                self._root_jobs.pop(search_root, None)
+                logger.info("Scan root %s was not reached within the scan budget", search_root)
+                continue
+            if not future.done():
+                # the worker is stuck in a syscall; it keeps its slot until the call returns
+                self._mark_root(search_root, "degraded", duration, "scan budget exceeded")
+                continue
+            self._root_jobs.pop(search_root, None)
             try:
-                dvd_files = self._scan_dvd_mount(search_root)
-                if dvd_files:
-                    video_files.append(dvd_files)
-                    logger.info("Collected %d DVD files from %s", len(dvd_files), search_root)
-                    continue
-                bluray_files = self._scan_bluray_mount(search_root)
-                if bluray_files:
-                    video_files.append(bluray_files)
-                    logger.info("Collected %d Blu-ray files from %s", len(bluray_files), search_root)
-                    continue
-            except Exception:
-                logger.debug("Optical scan check failed for %s", search_root)
-            if not os.path.exists(search_root):
-                logger.debug("Search root does not exist: %s", search_root)
+                kind, found = future.result()
+            except ScanTimeout:
+                self._mark_root(search_root, "degraded", duration, "scan budget exceeded")
                 continue
-            if not os.path.ismount(search_root):
-                logger.debug("Search root is not a mountpoint (may still be valid): %s", search_root)
-            found_in_root = 0
-            for root, dirs, files in os.walk(search_root, topdown=True):
-                # skip excluded subtrees entirely (do not process files here or descend)
-                if self._is_excluded_path(root) or root in EXCLUDED_SCAN_PATHS:
-                    continue
-                # Prune only directories that are explicitly excluded, otherwise descend into all subdirectories
-                good_dirs = []
-                for d in dirs:
-                    if d in IGNORED_DIRNAMES:
-                        continue
-                    full = os.path.join(root, d)
-                    if not self._is_excluded_path(full) and full not in EXCLUDED_SCAN_PATHS:
-                        good_dirs.append(d)
-                dirs[:] = good_dirs
-
-                for file in files:
-                    try:
-                        if file.startswith("._"):
-                            continue
-                        if file.lower().endswith(video_extensions_lower):
-                            full = os.path.join(root, file)
-                            try:
-                                st = os.stat(full)
-                                age_ok = (now - st.st_mtime) >= min_age
-                                key = full
-                                prev = stable_map.get(key)
-                                if prev and prev.get("size") == st.st_size and (now - prev.get("seen", now)) >= stable_window and age_ok:
-                                    next_map[key] = prev
-                                    video_files.append(full)
-                                    found_in_root += 1
-                                    logger.debug("Matched stable file: %s", full)
-                                else:
-                                    next_map[key] = {"size": st.st_size, "seen": now}
-                            except Exception as e:
-                                logger.debug("Stat failed for %s: %s", full, e)
-                    except Exception as e:
-                        logger.debug("Error checking file %s/%s: %s", root, file, e)
-            logger.info("Found %d candidate video files under %s", found_in_root, search_root)
+            except Exception as exc:
+                logger.debug("Scan of %s failed", search_root, exc_info=True)
+                self._mark_root(search_root, "error", duration, str(exc))
+                continue
+            if kind == "missing":
+                missing.add(search_root)
+                self._root_stats.pop(search_root, None)
+                continue
+            self._mark_root(search_root, "ok", duration)
+            if kind == "optical":
+                video_files.append(found)
+            else:
+                video_files.extend(found)
 
+        # drop indexes (and their watches) for roots that went away, e.g. an unplugged USB drive
+        with self._index_lock:
+            for root in [r for r in self._indexes if (r not in active_roots or r in missing) and r not in self._root_jobs]:
+                index = self._indexes.pop(root)
+                index.close()
+                # a returning root (re-plugged USB drive) starts again from what had settled here
+                self._saved_state[root] = {p: dict(e) for p, e in index.files.items() if e.get("stable")}
+                self._unsaved.extend((root, path, entry) for path, entry in index.persist.items())
+        for root in [r for r in self._root_stats if r not in active_roots]:
+            self._root_stats.pop(root, None)
+        self._drained.set()
+        self._save_state()
+        self._start_watcher()
+
+        SCANNER_PASS_SECONDS.observe(time.monotonic() - pass_started)
         logger.info("Total candidate video files found: %d", len(video_files))
-        self._stable_map = next_map
         return video_files
 
     def unmount_mountpoints(self, mountpoints=None):
@@ -482,13 +1061,7 @@ class Scanner:
         for mp in to_unmount:
             try:
                 # find the backing source (device) for the mount
-                src = None
-                try:
-                    fm = subprocess.run(['findmnt', '-n', '-o', 'SOURCE', '--target', mp],
-                                        capture_output=True, text=True, check=False)
-                    src = fm.stdout.strip() if fm.returncode == 0 else None
-                except Exception:
-                    src = None
+                src = self._topology.source_for(mp)
 
                 unmounted = False
                 # try udisksctl unmount if we have a device path
@@ -1,20 +1,120 @@
+import collections
+import functools
+import queue
 import threading
 import time
+import uuid
 from pathlib import Path
-import re
+import logging
+
+import log_tail
+from job_logs import new_log_id
+from makemkv_parser import compact_disc_info
+from openmetrics import DISC_SCAN_SECONDS, JOBS
+from proc_accounting import merge_rusage, rusage_totals
+
+# per-client backlog for the /api/stream bus; a client that falls further behind gets a full resync
+SUBSCRIBER_QUEUE_SIZE = 1000
+# how many state changes are remembered for /api/status?since=; older versions get a full snapshot
+CHANGE_LOG_SIZE = 5000
+# snapshot sections a delta can carry, keyed by the bus message kind that changes them
+DELTA_SECTIONS = {
+    "disc": ("disc_info", "disc_pending", "disc_rip_blocked", "disc_rip_requested", "disc_scan_paused",
+             "disc_scan_inflight", "disc_present", "disc_titles_count", "disc_timing"),
+    "usb": ("usb_status",),
+    "scan_roots": ("scan_roots",),
+}
+
+
+class _Subscription:
+    """One /api/stream client: a bounded queue of bus messages; overflow marks it for a resync."""
+
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.lagged = False
+
+    def push(self, msg: dict):
+        try:
+            self._queue.put_nowait(msg)
+        except queue.Full:
+            self.lagged = True
+
+    def get(self, timeout: float) -> list:
+        """Block up to timeout for the next message, then return it with everything queued behind it."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def reset(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self.lagged = False
+
+
+def _publishes_job(method):
+    """Publish the job's current view to stream subscribers after a per-job mutator runs."""
+    @functools.wraps(method)
+    def wrapper(self, src, *args, **kwargs):
+        result = method(self, src, *args, **kwargs)
+        with self._lock:
+            if src in self._active:
+                self._publish("job", self._job_view(src, time.time()))
+        return result
+    return wrapper
+
+
+def _publishes_disc(method):
+    """Publish disc state to stream subscribers after a disc mutator, if it actually changed."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        with self._lock:
+            self._publish_disc()
+        return result
+    return wrapper
 
 
 class StatusTracker:
     """
     Thread-safe tracker for active and recent encoding tasks plus log tail access.
+    With a JobStore attached, queue state and history are written through to disk and
+    recovered on startup; history_size then only bounds the in-memory recent list.
     """
 
-    def __init__(self, log_path: Path, history_size: int = 100):
+    def __init__(self, log_path: Path, history_size: int = 100, store=None, job_logs=None):
         self._lock = threading.Lock()
+        self._store = store
+        # per-job subprocess output (job_logs.JobLogs); source -> log id of jobs whose log was opened
+        self._job_logs = job_logs
+        self._job_log_ids = {}
+        # bumped by mutators that create work so the main loop wakes instead of sleeping out its interval;
+        # a generation counter (not an Event) so a signal that lands while a pass starts is never lost
+        self._wake_cond = threading.Condition()
+        self._wake_gen = 0
+        self._wake_seen = 0
+        # /api/stream clients (see subscribe/_publish)
+        self._subscribers = []
+        self._disc_signature = None
+        # monotonically increasing state version plus a bounded log of what changed at each one; the
+        # epoch changes on every start so versions handed out before a restart never match again
+        self._epoch = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._changes = collections.deque(maxlen=CHANGE_LOG_SIZE)
         self._active = {}
         self._history = []
         self._events = []
         self._procs = {}
+        # wait4 rusage folded in from a job's already-finished processes (chunked encodes run several)
+        self._rusage = {}
         self._log_path = Path(log_path)
         self._history_size = history_size
         self._etas = {}
@@ -27,6 +127,8 @@ class StatusTracker:
         self._disc_info = None
         self._disc_info_cache = None
         self._disc_info_cache_key = None
+        # id(disc_info) -> (disc_info, compact copy) for the entries the status view can show
+        self._disc_compact = {}
         self._disc_pending = False
         self._disc_rip_requested = False
         self._disc_rip_mode = None
@@ -40,6 +142,7 @@ class StatusTracker:
         self._disc_key = None
         self._smb_pending = []
         self._usb_status = {"state": "unknown", "message": "USB status unknown"}
+        self._scan_roots = {}
         self._disc_scan_inflight = False
         self._disc_scan_cooldown_until = 0.0
         self._disc_scan_failures = 0
@@ -58,14 +161,178 @@ class StatusTracker:
         self._disc_label_first_ts = None
         self._disc_label_last_ts = None
         self._disc_label_cleared_ts = None
+        if self._store is not None:
+            self._recover_from_store()
+        self._disc_signature = self._disc_view_signature(self._disc_view(time.time()))
+
+    # Persistence helpers (callers hold self._lock)
+    def _persist_queues(self):
+        if self._store is None:
+            return
+        self._store.set_value("manual_files", list(self._manual_files))
+        self._store.set_value("smb_pending", list(self._smb_pending))
+
+    def _persist_confirm(self):
+        if self._store is None:
+            return
+        self._store.set_value("confirm_required", sorted(self._confirm_required))
+        self._store.set_value("confirm_ok", sorted(self._confirm_ok))
+
+    def _persist_disc_auto(self):
+        if self._store is None:
+            return
+        self._store.set_value("disc_auto", {
+            "queue": list(self._disc_auto_queue),
+            "key": self._disc_auto_key,
+            "complete_key": self._disc_auto_complete_key,
+        })
+
+    def _append_history(self, record: dict):
+        self._history.append(record)
+        if len(self._history) > self._history_size:
+            self._history = self._history[-self._history_size :]
+        if self._store is not None:
+            self._store.add_history(record)
+
+    def _recover_from_store(self):
+        """Reload queue state after a restart; interrupted file jobs are re-queued, rips are recorded as interrupted."""
+        store = self._store
+        started = time.time()
+        try:
+            self._history = list(reversed(store.history(limit=self._history_size)))
+            self._manual_files = [str(p) for p in (store.get_value("manual_files", []) or [])]
+            self._smb_pending = [e for e in (store.get_value("smb_pending", []) or []) if isinstance(e, dict)]
+            self._confirm_required = set(store.get_value("confirm_required", []) or [])
+            self._confirm_ok = set(store.get_value("confirm_ok", []) or [])
+            auto = store.get_value("disc_auto", {}) or {}
+            self._disc_auto_queue = list(auto.get("queue") or [])
+            self._disc_auto_key = auto.get("key")
+            self._disc_auto_complete_key = auto.get("complete_key")
+            requeued = 0
+            for job in store.load_jobs():
+                src = job.get("source") or ""
+                is_rip = src.startswith("disc:") or job.get("state") == "ripping" or job.get("kind") == "live_rip"
+                if is_rip or not Path(src).exists():
+                    store.delete_job(src)
+                    self._append_history({
+                        "source": src,
+                        "destination": job.get("destination"),
+                        "state": "error",
+                        "finished_at": started,
+                        "started_at": job.get("started_at"),
+                        "message": "Interrupted by restart" if is_rip else "Interrupted by restart; source missing",
+                        "info": job.get("info"),
+                        "eta_sec": None,
+                        "progress": None,
+                    })
+                    continue
+                confirm = src in self._confirm_required
+                item = {
+                    "source": src,
+                    "destination": job.get("destination"),
+                    "state": "confirm" if confirm else "queued",
+                    "started_at": job.get("started_at") or started,
+                    "progress": 0.0,
+                    "info": job.get("info"),
+                    "message": "Low bitrate; confirm to proceed." if confirm else "Recovered after restart",
+                }
+                self._active[src] = item
+                store.update_job(src, state=item["state"], message=item["message"])
+                if src not in self._manual_files:
+                    self._manual_files.append(src)
+                requeued += 1
+            self._persist_queues()
+            if requeued or self._smb_pending:
+                self._events.append({
+                    "message": f"Recovered {requeued} queued/interrupted job(s) and {len(self._smb_pending)} pending SMB copies in {(time.time() - started) * 1000:.0f} ms",
+                    "level": "info",
+                    "ts": time.time(),
+                })
+        except Exception:
+            logging.exception("Failed to recover job state from %s", getattr(store, "path", store))
+
+    # Main loop wakeups
+    def wake(self):
+        with self._wake_cond:
+            self._wake_gen += 1
+            self._wake_cond.notify_all()
+
+    # Pub/sub for /api/stream
+    def subscribe(self) -> _Subscription:
+        sub = _Subscription()
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _publish(self, kind: str, data):
+        """Record a state change and fan it out to every subscriber (caller holds self._lock)."""
+        if kind != "event":
+            # events are served by /api/events, not the status snapshot
+            self._version += 1
+            source = data.get("source") if kind in ("job", "job_done") else None
+            added = kind == "job_done" and data.get("record") is not None
+            self._changes.append((self._version, kind, source, added))
+        if not self._subscribers:
+            return
+        msg = {"type": kind, "data": data}
+        for sub in self._subscribers:
+            sub.push(msg)
+
+    def publish(self, kind: str, data):
+        """Announce a change kept outside the tracker (e.g. a config reload) to stream subscribers."""
+        with self._lock:
+            self._publish(kind, data)
+
+    def _job_view(self, src: str, now: float) -> dict:
+        item = self._active[src]
+        return {
+            **item,
+            "duration_sec": now - item.get("started_at", now),
+            "eta_sec": self._etas.get(src),
+            "rename_to": self._rename.get(src),
+        }
+
+    @staticmethod
+    def _disc_view_signature(view: dict) -> tuple:
+        return tuple((k, id(v) if k == "disc_info" else v) for k, v in view.items() if k != "disc_timing")
+
+    def _publish_disc(self):
+        """Publish the disc view when something other than its timing block changed (caller holds self._lock)."""
+        view = self._disc_view(time.time())
+        signature = self._disc_view_signature(view)
+        if signature == self._disc_signature:
+            return
+        self._disc_signature = signature
+        self._publish("disc", view)
+
+    def wait_for_wake(self, timeout: float, settle: float = 0.0) -> bool:
+        """
+        Block until work is signalled since the last call, or timeout passes; returns True when woken.
+        After a wake it waits settle seconds so a burst of signals is consumed by one pass; signals
+        arriving after it returns wake the next call.
+        """
+        with self._wake_cond:
+            woke = self._wake_cond.wait_for(lambda: self._wake_gen != self._wake_seen, max(0.0, timeout))
+        if woke and settle > 0:
+            time.sleep(settle)
+        with self._wake_cond:
+            self._wake_seen = self._wake_gen
+        return woke
 
     def add_event(self, message: str, level: str = "info"):
         with self._lock:
             self._events.append({"message": message, "level": level, "ts": time.time()})
             if len(self._events) > self._history_size:
                 self._events = self._events[-self._history_size :]
+            self._publish("event", self._events[-1])
 
-    def start(self, src: str, dest: str, info=None, state: str = "running"):
+    @_publishes_job
+    def start(self, src: str, dest: str, info=None, state: str = "running", kind: str = None):
         with self._lock:
             self._active[src] = {
                 "source": src,
@@ -75,11 +342,101 @@ class StatusTracker:
                 "progress": 0.0,
                 "info": info,
             }
+            if kind:
+                self._active[src]["kind"] = kind
+            if src in self._job_log_ids:
+                self._active[src]["log_id"] = self._job_log_ids[src]
+            if self._store is not None:
+                self._store.save_job(self._active[src])
+            if src.startswith("disc:") or state == "ripping":
+                self._publish_disc()
 
     def register_proc(self, src: str, proc):
+        """Attach a child process to a job; chunked encodes register several under one key."""
+        with self._lock:
+            procs = []
+            done = []
+            for p in self._procs.get(src, []):
+                (procs if p.poll() is None else done).append(p)
+            if done:
+                self._rusage[src] = merge_rusage(self._rusage.get(src), rusage_totals(done))
+            procs.append(proc)
+            self._procs[src] = procs
+
+    def job_log(self, src: str, header: str = ""):
+        """The job's own output log (opened on first use, header appended each call), or None without JobLogs."""
+        if self._job_logs is None:
+            return None
+        with self._lock:
+            log_id = self._job_log_ids.get(src)
+            if log_id is None:
+                log_id = self._job_log_ids[src] = new_log_id()
+                item = self._active.get(src)
+                if item:
+                    item["log_id"] = log_id
+        log = self._job_logs.open(log_id)
+        if header:
+            log.write(header)
+        return log
+
+    def _close_job_log(self, src: str):
+        """Finish the job's log and return its id for the history record (caller holds self._lock)."""
+        log_id = self._job_log_ids.pop(src, None)
+        if log_id is not None:
+            self._job_logs.close(log_id)
+        return log_id
+
+    def job_log_location(self, log_id: str):
+        if self._job_logs is None:
+            return None, False
+        return self._job_logs.locate(log_id)
+
+    def job_pids(self) -> dict:
+        """source -> pids of its still-running registered processes (for ProcAccountant)."""
+        with self._lock:
+            out = {}
+            for src, procs in self._procs.items():
+                pids = [p.pid for p in procs if p.returncode is None]
+                if pids and src in self._active:
+                    out[src] = pids
+            return out
+
+    def job_metrics(self) -> dict:
+        """Counts by state (plus pending SMB copies) and progress/fps of running and ripping jobs, for /metrics."""
+        with self._lock:
+            states: dict = {}
+            running = []
+            for src, item in self._active.items():
+                state = item.get("state") or "unknown"
+                states[state] = states.get(state, 0) + 1
+                if state in ("running", "ripping"):
+                    running.append((src, state, item.get("progress"), item.get("fps")))
+            states["smb_pending"] = len(self._smb_pending)
+            return {"states": states, "running": running}
+
+    @_publishes_job
+    def update_resources(self, src: str, resources: dict):
         with self._lock:
-            self._procs[src] = proc
-
+            item = self._active.get(src)
+            if item:
+                item["resources"] = resources
+
+    def _final_resources(self, src: str, start, procs):
+        """Last sampled usage plus summed wait4 rusage for a finished job (caller holds self._lock)."""
+        resources = dict((start or {}).get("resources") or {})
+        rusage = merge_rusage(self._rusage.pop(src, None), rusage_totals(procs))
+        if rusage:
+            resources["rusage"] = rusage
+            resources["cpu_sec"] = round(rusage["user_sec"] + rusage["sys_sec"], 1)
+        source_sec = (start or {}).get("source_duration_sec")
+        if resources.get("cpu_sec") is not None and source_sec:
+            resources["cpu_sec_per_source_min"] = round(resources["cpu_sec"] / (source_sec / 60.0), 2)
+        for key in ("cpu_pct", "rss_mb", "threads", "procs"):
+            # point-in-time values mean nothing once the job is over
+            resources.pop(key, None)
+        return resources or None
+
+    @_publishes_job
     def set_rename(self, src: str, name: str):
         with self._lock:
             self._rename[src] = name
@@ -91,6 +448,7 @@ class StatusTracker:
         with self._lock:
             return self._rename.get(src)
 
+    @_publishes_job
     def clear_rename(self, src: str):
         with self._lock:
             self._rename.pop(src, None)
@@ -98,13 +456,17 @@ class StatusTracker:
             if item and "rename_to" in item:
                 item.pop("rename_to", None)
 
+    @_publishes_job
     def set_state(self, src: str, state: str):
         with self._lock:
             item = self._active.get(src)
             if item:
                 item["state"] = state
-                if state != "confirm":
+                if self._store is not None:
+                    self._store.update_job(src, state=state)
+                if state != "confirm" and src in self._confirm_required:
                     self._confirm_required.discard(src)
+                    self._persist_confirm()
 
     def has_active(self, src: str) -> bool:
         with self._lock:
@@ -114,18 +476,34 @@ class StatusTracker:
         with self._lock:
             return any(item.get("state") not in ("queued",) for item in self._active.values())
 
+    def active_destinations(self) -> list:
+        with self._lock:
+            return [item.get("destination") for item in self._active.values() if item.get("destination")]
+
+    def has_active_rip(self) -> bool:
+        with self._lock:
+            return any(
+                (key or "").startswith("disc:") or item.get("state") == "ripping"
+                for key, item in self._active.items()
+            )
+
+    @_publishes_job
     def set_message(self, src: str, message: str):
         with self._lock:
             item = self._active.get(src)
             if item:
                 item["message"] = message
 
+    @_publishes_job
     def update_destination(self, src: str, dest: str):
         with self._lock:
             item = self._active.get(src)
             if item:
                 item["destination"] = dest
+                if self._store is not None:
+                    self._store.update_job(src, destination=dest)
 
+    @_publishes_job
     def update_fields(self, src: str, fields: dict):
         if not fields:
             return
@@ -136,32 +514,45 @@ class StatusTracker:
 
     def stop_proc(self, src: str):
         with self._lock:
-            proc = self._procs.pop(src, None)
+            procs = self._procs.pop(src, None) or []
             start = self._active.pop(src, None)
             eta = self._etas.pop(src, None)
+            resources = self._final_resources(src, start, [])
+            log_id = self._close_job_log(src)
             self._confirm_required.discard(src)
             self._confirm_ok.discard(src)
-        if proc:
+            if self._store is not None:
+                self._store.delete_job(src)
+                self._persist_confirm()
+        for proc in procs:
             try:
                 proc.terminate()
             except Exception:
                 pass
         if start:
-            self._canceled.add(src)
-            self._history.append({
-                "source": src,
-                "destination": start.get("destination"),
-                "state": "canceled",
-                "finished_at": time.time(),
-                "started_at": start.get("started_at"),
-                "message": "Canceled by user",
-                "info": start.get("info"),
-                "eta_sec": eta,
-                "progress": start.get("progress"),
-            })
-            if len(self._history) > self._history_size:
-                self._history = self._history[-self._history_size :]
-
+            with self._lock:
+                self._canceled.add(src)
+                record = {
+                    "source": src,
+                    "destination": start.get("destination"),
+                    "state": "canceled",
+                    "finished_at": time.time(),
+                    "started_at": start.get("started_at"),
+                    "message": "Canceled by user",
+                    "info": start.get("info"),
+                    "eta_sec": eta,
+                    "progress": start.get("progress"),
+                }
+                if resources:
+                    record["resources"] = resources
+                if log_id:
+                    record["log_id"] = log_id
+                JOBS.inc(outcome="canceled", profile=start.get("profile") or "none")
+                self._append_history(record)
+                self._publish("job_done", {"source": src, "record": record})
+                self._publish_disc()
+
+    @_publishes_job
     def update_eta(self, src: str, eta_seconds: float):
         with self._lock:
             self._etas[src] = eta_seconds
@@ -175,12 +566,16 @@ class StatusTracker:
             self._canceled.discard(src)
 
     # Confirmation flow
+    @_publishes_job
     def add_confirm_required(self, src: str):
         with self._lock:
             self._confirm_required.add(src)
             item = self._active.get(src)
             if item:
                 item["state"] = "confirm"
+                if self._store is not None:
+                    self._store.update_job(src, state="confirm")
+            self._persist_confirm()
 
     def is_confirm_required(self, src: str) -> bool:
         with self._lock:
@@ -189,10 +584,13 @@ class StatusTracker:
     def clear_confirm_required(self, src: str):
         with self._lock:
             self._confirm_required.discard(src)
+            self._persist_confirm()
 
     def add_confirm_ok(self, src: str):
         with self._lock:
             self._confirm_ok.add(src)
+            self._persist_confirm()
+        self.wake()
 
     def is_confirm_ok(self, src: str) -> bool:
         with self._lock:
@@ -201,14 +599,19 @@ class StatusTracker:
     def clear_confirm_ok(self, src: str):
         with self._lock:
             self._confirm_ok.discard(src)
+            self._persist_confirm()
 
     def complete(self, src: str, success: bool, dest: str, message: str = ""):
         with self._lock:
             start = self._active.pop(src, None)
-            self._procs.pop(src, None)
+            resources = self._final_resources(src, start, self._procs.pop(src, None) or [])
+            log_id = self._close_job_log(src)
             self._rename.pop(src, None)
             self._confirm_required.discard(src)
             self._confirm_ok.discard(src)
+            if self._store is not None:
+                self._store.delete_job(src)
+                self._persist_confirm()
             now = time.time()
             record = {
                 "source": src,
@@ -221,6 +624,13 @@ class StatusTracker:
                 "eta_sec": self._etas.pop(src, None),
                 "progress": 100.0 if success else start.get("progress") if start else None,
             }
+            for key in ("profile", "encoder", "remux", "resolution"):
+                if start and start.get(key):
+                    record[key] = start[key]
+            if resources:
+                record["resources"] = resources
+            if log_id:
+                record["log_id"] = log_id
             if self._history:
                 last = self._history[-1]
                 same = (
@@ -231,11 +641,15 @@ class StatusTracker:
                     and abs(last.get("finished_at", 0) - now) < 2
                 )
                 if same:
+                    self._publish("job_done", {"source": src, "record": None})
+                    self._publish_disc()
                     return
-            self._history.append(record)
-            if len(self._history) > self._history_size:
-                self._history = self._history[-self._history_size :]
+            JOBS.inc(outcome=record["state"], profile=record.get("profile") or "none")
+            self._append_history(record)
+            self._publish("job_done", {"source": src, "record": record})
+            self._publish_disc()
 
+    @_publishes_job
     def update_progress(self, src: str, progress: float):
         with self._lock:
             item = self._active.get(src)
@@ -251,124 +665,187 @@ class StatusTracker:
                     except Exception:
                         pass
 
+    def _compact_disc_info(self, info):
+        """Compact copy of a disc_info entry, built once per stored entry (caller holds self._lock)."""
+        if info is None:
+            return None
+        hit = self._disc_compact.get(id(info))
+        if hit is not None and hit[0] is info:
+            return hit[1]
+        view = compact_disc_info(info)
+        live = {id(x) for x in (self._disc_info, self._disc_info_cache) if x is not None}
+        self._disc_compact = {k: v for k, v in self._disc_compact.items() if k in live}
+        self._disc_compact[id(info)] = (info, view)
+        return view
+
+    def _disc_view(self, now: float) -> dict:
+        """Disc section of the status snapshot (caller holds self._lock)."""
+        disc_info = self._disc_info
+        disc_pending = self._disc_pending
+        # If a disc rip is active, force disc_pending so UI shows presence
+        if not disc_pending:
+            disc_pending = any(
+                (a.get("source", "") or "").startswith("disc:") or a.get("state") == "ripping"
+                for a in self._active.values()
+            )
+        disc_present = self._disc_present
+        info_payload = (disc_info.get("info") if isinstance(disc_info, dict) else disc_info) or {}
+        titles_count = len(info_payload.get("titles") or [])
+        if disc_present is not False and titles_count == 0 and self._disc_info_cache:
+            cache_key = self._disc_info_cache_key
+            if not cache_key or not self._disc_key or cache_key == self._disc_key:
+                cache_payload = (
+                    self._disc_info_cache.get("info")
+                    if isinstance(self._disc_info_cache, dict)
+                    else self._disc_info_cache
+                ) or {}
+                cache_titles = len(cache_payload.get("titles") or [])
+                if cache_titles:
+                    disc_info = self._disc_info_cache
+                    info_payload = cache_payload
+                    titles_count = cache_titles
+        summary = info_payload.get("summary") or {}
+        label = summary.get("disc_label") or summary.get("label") or ""
+        disc_timing = {
+            "disc_inserted_at": self._disc_inserted_ts,
+            "disc_removed_at": self._disc_removed_ts,
+            "disc_info_first_at": self._disc_info_first_ts,
+            "disc_titles_first_at": self._disc_titles_first_ts,
+            "disc_info_last_at": self._disc_info_last_ts,
+            "disc_titles_last_at": self._disc_titles_last_ts,
+            "disc_info_cleared_at": self._disc_info_cleared_ts,
+            "disc_titles_cleared_at": self._disc_titles_cleared_ts,
+            "disc_label_first_at": self._disc_label_first_ts,
+            "disc_label_last_at": self._disc_label_last_ts,
+            "disc_label_cleared_at": self._disc_label_cleared_ts,
+            "disc_scan_started_at": self._disc_scan_started_ts,
+            "disc_scan_last_at": self._disc_scan_last_ts,
+            "disc_scan_last_duration_sec": self._disc_scan_last_duration,
+            "disc_scan_last_timed_out": self._disc_scan_last_timed_out,
+        }
+        if self._disc_info_last_ts:
+            disc_timing["disc_info_age_sec"] = max(0.0, now - self._disc_info_last_ts)
+        if self._disc_titles_last_ts:
+            disc_timing["disc_titles_age_sec"] = max(0.0, now - self._disc_titles_last_ts)
+        if self._disc_label_last_ts:
+            disc_timing["disc_label_age_sec"] = max(0.0, now - self._disc_label_last_ts)
+        if self._disc_inserted_ts and self._disc_info_first_ts:
+            disc_timing["disc_info_time_to_first_sec"] = max(0.0, self._disc_info_first_ts - self._disc_inserted_ts)
+        if self._disc_inserted_ts and self._disc_titles_first_ts:
+            disc_timing["disc_titles_time_to_first_sec"] = max(0.0, self._disc_titles_first_ts - self._disc_inserted_ts)
+        if self._disc_inserted_ts and self._disc_label_first_ts:
+            disc_timing["disc_label_time_to_first_sec"] = max(0.0, self._disc_label_first_ts - self._disc_inserted_ts)
+        if self._disc_titles_first_ts and self._disc_titles_last_ts:
+            disc_timing["disc_titles_visible_for_sec"] = max(0.0, self._disc_titles_last_ts - self._disc_titles_first_ts)
+        if disc_present and titles_count == 0 and self._disc_titles_last_ts:
+            disc_timing["disc_titles_missing_for_sec"] = max(0.0, now - self._disc_titles_last_ts)
+        if disc_present and not info_payload and self._disc_info_last_ts:
+            disc_timing["disc_info_missing_for_sec"] = max(0.0, now - self._disc_info_last_ts)
+        if disc_present and not label and self._disc_label_last_ts:
+            disc_timing["disc_label_missing_for_sec"] = max(0.0, now - self._disc_label_last_ts)
+        return {
+            "disc_info": self._compact_disc_info(disc_info),
+            "disc_pending": disc_pending,
+            "disc_rip_blocked": self._disc_rip_blocked,
+            "disc_rip_requested": self._disc_rip_requested,
+            "disc_scan_paused": self._disc_scan_paused,
+            "disc_scan_inflight": self._disc_scan_inflight,
+            "disc_present": disc_present,
+            "disc_titles_count": titles_count,
+            "disc_timing": disc_timing,
+        }
+
     def snapshot(self):
         now = time.time()
         with self._lock:
-            active = []
-            for key, item in self._active.items():
-                active.append(
-                    {
-                        **item,
-                        "duration_sec": now - item.get("started_at", now),
-                        "eta_sec": self._etas.get(key),
-                        "rename_to": self._rename.get(key),
-                    }
-                )
+            active = [self._job_view(key, now) for key in self._active]
             history = list(self._history)
-            disc_info = self._disc_info
-            disc_pending = self._disc_pending
-            disc_rip_blocked = self._disc_rip_blocked
-            disc_rip_requested = self._disc_rip_requested
-            disc_scan_paused = self._disc_scan_paused
-            disc_scan_inflight = self._disc_scan_inflight
-            disc_present = self._disc_present
-            # If a disc rip is active, force disc_pending so UI shows presence
-            if not disc_pending:
-                disc_pending = any(
-                    (a.get("source", "") or "").startswith("disc:") or a.get("state") == "ripping"
-                    for a in active
-                )
             usb_status = dict(self._usb_status)
-            info_payload = (disc_info.get("info") if isinstance(disc_info, dict) else disc_info) or {}
-            titles_count = len(info_payload.get("titles") or [])
-            if disc_present is not False and titles_count == 0 and self._disc_info_cache:
-                cache_key = self._disc_info_cache_key
-                if not cache_key or not self._disc_key or cache_key == self._disc_key:
-                    cache_payload = (
-                        self._disc_info_cache.get("info")
-                        if isinstance(self._disc_info_cache, dict)
-                        else self._disc_info_cache
-                    ) or {}
-                    cache_titles = len(cache_payload.get("titles") or [])
-                    if cache_titles:
-                        disc_info = self._disc_info_cache
-                        info_payload = cache_payload
-                        titles_count = cache_titles
-            summary = info_payload.get("summary") or {}
-            label = summary.get("disc_label") or summary.get("label") or ""
-            disc_timing = {
-                "disc_inserted_at": self._disc_inserted_ts,
-                "disc_removed_at": self._disc_removed_ts,
-                "disc_info_first_at": self._disc_info_first_ts,
-                "disc_titles_first_at": self._disc_titles_first_ts,
-                "disc_info_last_at": self._disc_info_last_ts,
-                "disc_titles_last_at": self._disc_titles_last_ts,
-                "disc_info_cleared_at": self._disc_info_cleared_ts,
-                "disc_titles_cleared_at": self._disc_titles_cleared_ts,
-                "disc_label_first_at": self._disc_label_first_ts,
-                "disc_label_last_at": self._disc_label_last_ts,
-                "disc_label_cleared_at": self._disc_label_cleared_ts,
-                "disc_scan_started_at": self._disc_scan_started_ts,
-                "disc_scan_last_at": self._disc_scan_last_ts,
-                "disc_scan_last_duration_sec": self._disc_scan_last_duration,
-                "disc_scan_last_timed_out": self._disc_scan_last_timed_out,
-            }
-            if self._disc_info_last_ts:
-                disc_timing["disc_info_age_sec"] = max(0.0, now - self._disc_info_last_ts)
-            if self._disc_titles_last_ts:
-                disc_timing["disc_titles_age_sec"] = max(0.0, now - self._disc_titles_last_ts)
-            if self._disc_label_last_ts:
-                disc_timing["disc_label_age_sec"] = max(0.0, now - self._disc_label_last_ts)
-            if self._disc_inserted_ts and self._disc_info_first_ts:
-                disc_timing["disc_info_time_to_first_sec"] = max(0.0, self._disc_info_first_ts - self._disc_inserted_ts)
-            if self._disc_inserted_ts and self._disc_titles_first_ts:
-                disc_timing["disc_titles_time_to_first_sec"] = max(0.0, self._disc_titles_first_ts - self._disc_inserted_ts)
-            if self._disc_inserted_ts and self._disc_label_first_ts:
-                disc_timing["disc_label_time_to_first_sec"] = max(0.0, self._disc_label_first_ts - self._disc_inserted_ts)
-            if self._disc_titles_first_ts and self._disc_titles_last_ts:
-                disc_timing["disc_titles_visible_for_sec"] = max(0.0, self._disc_titles_last_ts - self._disc_titles_first_ts)
-            if disc_present and titles_count == 0 and self._disc_titles_last_ts:
-                disc_timing["disc_titles_missing_for_sec"] = max(0.0, now - self._disc_titles_last_ts)
-            if disc_present and not info_payload and self._disc_info_last_ts:
-                disc_timing["disc_info_missing_for_sec"] = max(0.0, now - self._disc_info_last_ts)
-            if disc_present and not label and self._disc_label_last_ts:
-                disc_timing["disc_label_missing_for_sec"] = max(0.0, now - self._disc_label_last_ts)
+            scan_roots = {root: dict(stats) for root, stats in self._scan_roots.items()}
+            disc = self._disc_view(now)
+            version = self._version_token()
         return {
+            "state_version": version,
             "active": active,
             "recent": history[::-1],  # newest first
             "timestamp": now,
-            "disc_info": disc_info,
-            "disc_pending": disc_pending,
-            "disc_rip_blocked": disc_rip_blocked,
-            "disc_rip_requested": disc_rip_requested,
-            "disc_scan_paused": disc_scan_paused,
-            "disc_scan_inflight": disc_scan_inflight,
-            "disc_present": disc_present,
-            "disc_titles_count": titles_count,
-            "disc_timing": disc_timing,
+            **disc,
             "usb_status": usb_status,
+            "scan_roots": scan_roots,
         }
 
-    def tail_logs(self, lines: int = 400):
-        ansi_re = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+    def _version_token(self) -> str:
+        return f"{self._epoch}.{self._version}"
+
+    def state_version(self):
+        """(state_version, active job count): cheap check for whether a cached snapshot is still current."""
+        with self._lock:
+            return self._version_token(), len(self._active)
+
+    def changes_since(self, since: str):
+        """
+        Delta against an earlier state_version ("<epoch>.<n>"): changed/removed active jobs, newly
+        finished jobs and any changed sections. Returns None when since is from another epoch (an
+        earlier process), ahead of the current version, malformed, or too old for the change log;
+        the caller then sends a full snapshot.
+        """
+        now = time.time()
+        epoch, _, number = str(since).rpartition(".")
         try:
-            data = self._log_path.read_text(encoding="utf-8", errors="ignore").splitlines()
-        except FileNotFoundError:
-            data = []
-        filtered = []
-        for line in data:
-            # Skip noisy HTTP access logs
-            if "GET /api/" in line or "GET / " in line:
-                continue
-            if "GET /favicon.ico" in line:
-                continue
-            filtered.append(ansi_re.sub("", line))
-        if lines <= 0:
-            return filtered if filtered else ["Ready to encode"]
-        filtered = filtered[-lines:]
-        if not filtered:
-            filtered = ["Ready to encode"]
-        return filtered
+            number = int(number)
+        except ValueError:
+            return None
+        with self._lock:
+            version = self._version_token()
+            if epoch != self._epoch or number > self._version:
+                return None
+            if number == self._version:
+                return {"state_version": version, "since": since, "delta": True, "timestamp": now}
+            if not self._changes or number < self._changes[0][0] - 1:
+                return None
+            sources = set()
+            kinds = set()
+            added = 0
+            for ver, kind, source, was_added in reversed(self._changes):
+                if ver <= number:
+                    break
+                kinds.add(kind)
+                if source is not None:
+                    sources.add(source)
+                added += 1 if was_added else 0
+            delta = {
+                "state_version": version,
+                "since": since,
+                "delta": True,
+                "timestamp": now,
+                "active": [self._job_view(src, now) for src in self._active if src in sources],
+                "removed": sorted(src for src in sources if src not in self._active),
+            }
+            if "history" in kinds:
+                delta["recent"] = self._history[::-1]
+                delta["recent_reset"] = True
+            elif added:
+                delta["recent"] = self._history[-added:][::-1]
+            if kinds & set(DELTA_SECTIONS):
+                full = {**self._disc_view(now), "usb_status": dict(self._usb_status),
+                        "scan_roots": {root: dict(stats) for root, stats in self._scan_roots.items()}}
+                for kind, keys in DELTA_SECTIONS.items():
+                    if kind in kinds:
+                        delta.update({k: full[k] for k in keys})
+        return delta
+
+    def tail_logs(self, lines: int = 400):
+        filtered = self.log_tail(lines)["lines"]
+        return filtered if filtered else ["Ready to encode"]
+
+    def log_tail(self, lines: int = 400) -> dict:
+        """Last lines of the app log (read backwards from the end) and a cursor for logs_since."""
+        tail, cursor = log_tail.tail_lines(self._log_path, lines)
+        return {"lines": tail, "cursor": cursor, "reset": True}
+
+    def logs_since(self, cursor: str, lines: int = 400) -> dict:
+        """Lines appended after cursor; reset=True means the lines replace the client's buffer."""
+        return log_tail.read_since(self._log_path, cursor, lines)
 
     def events(self):
         with self._lock:
@@ -376,7 +853,20 @@ class StatusTracker:
 
     def set_usb_status(self, state: str, message: str = ""):
         with self._lock:
+            became_ready = state == "ready" and self._usb_status.get("state") != "ready"
+            changed = self._usb_status != {"state": state, "message": message or ""}
             self._usb_status = {"state": state, "message": message or ""}
+            if changed:
+                self._publish("usb", dict(self._usb_status))
+        if became_ready:
+            self.wake()
+
+    def set_scan_roots(self, stats: dict):
+        with self._lock:
+            before = {root: item.get("state") for root, item in self._scan_roots.items()}
+            self._scan_roots = dict(stats or {})
+            if before != {root: item.get("state") for root, item in self._scan_roots.items()}:
+                self._publish("scan_roots", {root: dict(item) for root, item in self._scan_roots.items()})
 
     def get_usb_status(self):
         with self._lock:
@@ -390,6 +880,17 @@ class StatusTracker:
                 self._history = [h for h in self._history if h.get("state") != state]
             if state == "canceled":
                 self._canceled.clear()
+            if self._store is not None:
+                self._store.clear_history(state)
+            self._publish("history", self._history[::-1])
+
+    def history_page(self, limit: int = 100, offset: int = 0, state: str = None):
+        """Newest-first finished jobs; reaches past history_size when a JobStore is attached."""
+        if self._store is not None:
+            return self._store.history(limit=limit, offset=offset, state=state), self._store.history_count(state)
+        with self._lock:
+            items = [h for h in self._history[::-1] if state is None or h.get("state") == state]
+        return items[offset : offset + limit], len(items)
 
     # SMB mount tracking helpers
     def add_smb_mount(self, mount_id: str, path: str, label: str = None):
@@ -411,32 +912,42 @@ class StatusTracker:
     def add_manual_file(self, path: str):
         with self._lock:
             self._manual_files.append(path)
+            self._persist_queues()
             self._events.append({"message": f"Queued manually: {path}", "level": "info", "ts": time.time()})
             if len(self._events) > self._history_size:
                 self._events = self._events[-self._history_size :]
+            self._publish("event", self._events[-1])
+        self.wake()
 
     def consume_manual_files(self):
         with self._lock:
             items = list(self._manual_files)
             self._manual_files = []
+            if items:
+                self._persist_queues()
             return items
 
     # Pending SMB copies (deferred until encoder idle)
     def add_smb_pending(self, entry: dict):
         with self._lock:
             self._smb_pending.append(entry)
+            self._persist_queues()
+        self.wake()
 
     def pop_next_smb_pending(self):
         with self._lock:
             if not self._smb_pending:
                 return None
-            return self._smb_pending.pop(0)
+            entry = self._smb_pending.pop(0)
+            self._persist_queues()
+            return entry
 
     def has_smb_pending(self) -> bool:
         with self._lock:
             return bool(self._smb_pending)
 
     # Disc info/pending management
+    @_publishes_disc
     def set_disc_info(self, info: dict, force: bool = False):
         now = time.time()
         with self._lock:
@@ -486,6 +997,7 @@ class StatusTracker:
                 if self._disc_present and self._disc_label_first_ts is None:
                     self._disc_label_first_ts = now
 
+    @_publishes_disc
     def clear_disc_info(self):
         now = time.time()
         with self._lock:
@@ -503,6 +1015,7 @@ class StatusTracker:
             self._disc_auto_key = None
             self._disc_auto_complete_key = None
             self._disc_preserve_info = False
+            self._persist_disc_auto()
             if self._disc_present is False:
                 self._disc_key = None
 
@@ -528,10 +1041,12 @@ class StatusTracker:
         with self._lock:
             return self._disc_pending
 
+    @_publishes_disc
     def set_disc_pending(self, value: bool):
         with self._lock:
             self._disc_pending = bool(value)
 
+    @_publishes_disc
     def request_disc_rip(self, mode: str = "manual"):
         with self._lock:
             if mode == "auto" and self._disc_rip_blocked:
@@ -546,7 +1061,9 @@ class StatusTracker:
                 self._disc_scan_paused = False
             if mode == "manual":
                 self._disc_preserve_info = True
+        self.wake()
 
+    @_publishes_disc
     def consume_disc_rip_request(self):
         with self._lock:
             req = self._disc_rip_requested
@@ -571,6 +1088,7 @@ class StatusTracker:
         with self._lock:
             self._disc_auto_key = key
             self._disc_auto_queue = list(titles or [])
+            self._persist_disc_auto()
 
     def disc_auto_queue(self):
         with self._lock:
@@ -584,14 +1102,17 @@ class StatusTracker:
         with self._lock:
             self._disc_auto_queue = []
             self._disc_auto_key = None
+            self._persist_disc_auto()
 
     def set_disc_auto_complete(self, key: str):
         with self._lock:
             self._disc_auto_complete_key = key
+            self._persist_disc_auto()
 
     def clear_disc_auto_complete(self):
         with self._lock:
             self._disc_auto_complete_key = None
+            self._persist_disc_auto()
 
     def disc_auto_complete(self, key: str) -> bool:
         with self._lock:
@@ -601,21 +1122,27 @@ class StatusTracker:
         with self._lock:
             if not self._disc_auto_queue:
                 return None
-            return self._disc_auto_queue.pop(0)
+            title = self._disc_auto_queue.pop(0)
+            self._persist_disc_auto()
+            return title
 
+    @_publishes_disc
     def block_disc_rip(self):
         with self._lock:
             self._disc_rip_blocked = True
             self._disc_rip_requested = False
 
+    @_publishes_disc
     def allow_disc_rip(self):
         with self._lock:
             self._disc_rip_blocked = False
+        self.wake()
 
     def disc_rip_blocked(self) -> bool:
         with self._lock:
             return self._disc_rip_blocked
 
+    @_publishes_disc
     def set_disc_present(self, present: bool):
         now = time.time()
         with self._lock:
@@ -647,6 +1174,7 @@ class StatusTracker:
                 self._disc_auto_key = None
                 self._disc_auto_complete_key = None
                 self._disc_preserve_info = False
+                self._persist_disc_auto()
 
     def set_disc_key(self, key: str, force: bool = False):
         if not key:
@@ -663,10 +1191,12 @@ class StatusTracker:
         with self._lock:
             return self._disc_present
 
+    @_publishes_disc
     def pause_disc_scan(self):
         with self._lock:
             self._disc_scan_paused = True
 
+    @_publishes_disc
     def resume_disc_scan(self):
         with self._lock:
             self._disc_scan_paused = False
@@ -686,6 +1216,7 @@ class StatusTracker:
                 return False
             return now >= self._disc_scan_cooldown_until
 
+    @_publishes_disc
     def start_disc_scan(self) -> bool:
         with self._lock:
             if self._disc_scan_inflight:
@@ -694,6 +1225,7 @@ class StatusTracker:
             self._disc_scan_started_ts = time.time()
             return True
 
+    @_publishes_disc
     def finish_disc_scan(self, success: bool, timed_out: bool = False):
         now = time.time()
         with self._lock:
@@ -701,6 +1233,8 @@ class StatusTracker:
             self._disc_scan_last_ts = now
             if self._disc_scan_started_ts:
                 self._disc_scan_last_duration = max(0.0, now - self._disc_scan_started_ts)
+                result = "timeout" if timed_out else "ok" if success else "error"
+                DISC_SCAN_SECONDS.observe(self._disc_scan_last_duration, result=result)
             self._disc_scan_last_timed_out = bool(timed_out)
             if success and not timed_out:
                 self._disc_scan_failures = 0
@@ -511,14 +511,15 @@ MAIN_PAGE_TEMPLATE = """
       if (metrics.mem) {
         cards.push({ icon: icons.memory, label: "Memory", value: toGb(metrics.mem.used_mb) + " / " + toGb(metrics.mem.total_mb) });
       }
+      const toRate = (mbs) => (mbs === undefined || mbs === null) ? "n/a" : mbs.toFixed(1) + " MB/s";
       if (metrics.block) {
-        cards.push({ icon: icons.disk, label: "Disk", value: toGb(metrics.block.read_mb) + " r / " + toGb(metrics.block.write_mb) + " w" });
+        cards.push({ icon: icons.disk, label: "Disk", value: toRate(metrics.block.read_mbs) + " r / " + toRate(metrics.block.write_mbs) + " w" });
       }
       if (metrics.fs) {
         cards.push({ icon: icons.output, label: "Output", value: metrics.fs.free_gb + " / " + metrics.fs.total_gb + " GB" });
       }
       if (metrics.net) {
-        cards.push({ icon: icons.network, label: "Network", value: metrics.net.rx_mb + "MB ↓ / " + metrics.net.tx_mb + "MB ↑" });
+        cards.push({ icon: icons.network, label: "Network", value: toRate(metrics.net.rx_mbs) + " ↓ / " + toRate(metrics.net.tx_mbs) + " ↑" });
       }
       const prevUsb = document.getElementById("usb-status") || {};
       const usbStatusText = prevUsb.textContent || "USB status: unknown";
@@ -652,15 +653,19 @@ MAIN_PAGE_TEMPLATE = """
       } else if (discPresent === false) {
         hasDisc = false;
       }
+      // status carries compact disc info (raw_size/no_disc); /api/makemkv/info still returns the raw text
       const raw = (discInfo && (discInfo.raw || (discInfo.info && discInfo.info.raw) || "")) || "";
       const rawLow = raw.toLowerCase();
+      const noDisc = !!(discInfo && discInfo.no_disc) ||
+        rawLow.includes("failed to open disc") || rawLow.includes("can't find any usable optical drives");
+      const hasRaw = !!raw || !!(discInfo && discInfo.raw_size);
       if (discPresent === null || discPresent === undefined) {
         if (!discLabelText || discLabelText === "Disc: unknown") {
-          if (rawLow.includes("failed to open disc") || rawLow.includes("can't find any usable optical drives")) {
+          if (noDisc) {
             hasDisc = false;
           }
         }
-        if (!raw && !summary.disc_label && !summary.label) {
+        if (!hasRaw && !summary.disc_label && !summary.label) {
           hasDisc = false;
         }
       }
@@ -762,10 +767,31 @@ MAIN_PAGE_TEMPLATE = """
           controls = '<button class="retry-btn" data-src="' + encodeURIComponent(item.source || "") + '">Retry</button>';
         }
         const messageText = formatItemValue(item.message || "");
-        const encoderLine = item.encoder ? ('<div class="muted">Encoder: ' + item.encoder + '</div>') : "";
+        const remux = item.remux || null;
+        const encoderLine = remux
+          ? ('<div class="muted">Remux (stream copy): ' + remux.video_codec + ' ' + remux.width + 'x' + remux.height + ', '
+             + remux.source_kbps + ' kbps, audio ' + remux.audio + '</div>')
+          : (item.encoder ? ('<div class="muted">Encoder: ' + item.encoder + '</div>') : "");
+        const sizePlan = item.resolution || null;
+        const cropText = sizePlan && sizePlan.crop_source && sizePlan.crop.some(v => v > 0) ? (", crop " + sizePlan.crop.join("/")) : "";
+        const resolutionLine = sizePlan
+          ? ('<div class="muted">Output: ' + sizePlan.width + 'x' + sizePlan.height + ' (source ' + sizePlan.source.join("x") + cropText
+             + (sizePlan.scaled ? ", downscaled" : "") + ')</div>')
+          : "";
         const infoText = formatItemValue(item.info);
         const infoLine = infoText ? '<div class="muted">' + infoText + '</div>' : "";
         const renameLine = item.rename_to ? '<div class="muted">Will rename to: ' + item.rename_to + '</div>' : "";
+        const res = item.resources || null;
+        const resParts = [];
+        if (res) {
+          if (res.cpu_pct !== undefined && res.cpu_pct !== null) resParts.push("CPU " + res.cpu_pct.toFixed(0) + "%");
+          if (res.cpu_sec !== undefined && res.cpu_sec !== null) resParts.push(res.cpu_sec.toFixed(0) + " CPU-s");
+          if (res.cpu_sec_per_source_min) resParts.push(res.cpu_sec_per_source_min.toFixed(1) + " CPU-s/source min");
+          if (res.rss_mb !== undefined && res.rss_mb !== null) resParts.push("RSS " + res.rss_mb.toFixed(0) + " MB");
+          if (res.threads) resParts.push(res.threads + " threads");
+        }
+        const resourceLine = resParts.length ? '<div class="muted">' + resParts.join(" · ") + '</div>' : "";
+        const logLine = item.log_id ? '<div class="muted"><a href="/api/jobs/' + encodeURIComponent(item.log_id) + '/log" target="_blank" rel="noopener">Job log</a></div>' : "";
         return [
           '<div class="item">',
           '  <span class="field-id-item">#' + (idx + 1) + '</span>',
@@ -776,7 +802,10 @@ MAIN_PAGE_TEMPLATE = """
           '  <div class="muted">-> ' + (item.destination || "") + '</div>',
           '  <div class="muted">' + messageText + '</div>',
           encoderLine,
+          resolutionLine,
           infoLine,
+          resourceLine,
+          logLine,
           renameLine,
           '  <div class="muted">' + (etaText || (duration ? ((state === "queued") ? "Queued for: " + duration : "Encode elapsed: " + duration) : "")) + '</div>',
           '  ' + progBar,
@@ -818,93 +847,156 @@ MAIN_PAGE_TEMPLATE = """
       });
     }
 
-    async function refresh() {
-      try {
-        const status = await fetchJSON("/api/status");
-        renderList(document.getElementById("active"), status.active, "No active encodes.");
-        renderList(document.getElementById("recent"), status.recent, "No recent jobs.");
-        const hbCfg = status.handbrake_config || {};
-        const hb = hbCfg.handbrake || {};
-        const hbDvd = hbCfg.handbrake_dvd || {};
-        const hbBr = hbCfg.handbrake_br || {};
-        const hbExt = hb.extension || ".mkv";
-        const usb = status.usb_status || {};
-        const usbEl = document.getElementById("usb-status");
-        if (usbEl) {
-          const state = (usb.state || "unknown").toLowerCase();
-          const msg = usb.message || "";
-          let color = "#cbd5e1";
-          if (state === "ready") color = "#22c55e";
-          else if (state === "missing") color = "#fbbf24";
-          else if (state === "error") color = "#f87171";
-          usbEl.style.color = color;
-          usbEl.textContent = "USB " + state + (msg ? (": " + msg) : "");
-        }
-        const lbNote = (hbCfg.low_bitrate_auto_skip ? "Low bitrate: auto-skip" : (hbCfg.low_bitrate_auto_proceed ? "Low bitrate: auto-proceed" : "Low bitrate: ask"));
-        const audioModeLabel = (hb.audio_mode === "auto_dolby") ? "Auto Dolby" : (hb.audio_mode === "copy" ? "copy" : ((hb.audio_bitrate_kbps || "128") + " kbps"));
-        const audioOffsetLabel = (hb.audio_offset_ms !== undefined && hb.audio_offset_ms !== null) ? (hb.audio_offset_ms + " ms (single)") : "0 ms (single)";
-        document.getElementById("hb-runtime").textContent =
-          "Runtime HB settings: Encoder=" + (hb.encoder || "x264") +
-          " | Default RF=" + (hb.quality ?? 20) +
-          " | DVD RF=" + (hbDvd.quality ?? 20) +
-          " | BR RF=" + (hbBr.quality ?? 25) +
-          " | Ext=" + hbExt +
-          " | " + lbNote +
-          " | Audio=" + audioModeLabel +
-          " | Offset=" + audioOffsetLabel;
-        // Disc card update (main page, no eject)
-        let discInfo = status.disc_info || {};
-        const busyEl = document.getElementById("mk-scan-busy");
-        if (busyEl) {
-          busyEl.style.display = status.disc_scan_inflight ? "inline-flex" : "none";
+    // Live status: the page listens on /api/stream (Server-Sent Events) and applies
+    // changes to liveStatus; it only polls while the stream is unavailable.
+    let liveStatus = null;
+    let streamSource = null;
+    let pollTimer = null;
+    let renderQueued = false;
+    let serverClockOffset = 0;
+
+    function applyStatus(status) {
+      renderList(document.getElementById("active"), status.active, "No active encodes.");
+      renderList(document.getElementById("recent"), status.recent, "No recent jobs.");
+      const hbCfg = status.handbrake_config || {};
+      const hb = hbCfg.handbrake || {};
+      const hbDvd = hbCfg.handbrake_dvd || {};
+      const hbBr = hbCfg.handbrake_br || {};
+      const hbExt = hb.extension || ".mkv";
+      const usb = status.usb_status || {};
+      const usbEl = document.getElementById("usb-status");
+      if (usbEl) {
+        const state = (usb.state || "unknown").toLowerCase();
+        const msg = usb.message || "";
+        let color = "#cbd5e1";
+        if (state === "ready") color = "#22c55e";
+        else if (state === "missing") color = "#fbbf24";
+        else if (state === "error") color = "#f87171";
+        usbEl.style.color = color;
+        usbEl.textContent = "USB " + state + (msg ? (": " + msg) : "");
+        const slowRoots = Object.entries(status.scan_roots || {}).filter(([, r]) => r.state && r.state !== "ok");
+        if (slowRoots.length) {
+          usbEl.textContent += " | Skipping slow scan roots: " + slowRoots.map(([root, r]) => root + " (" + r.state + ")").join(", ");
         }
-        let discPending = !!status.disc_pending;
-        const discPresent = (status.disc_present === true) ? true : ((status.disc_present === false) ? false : null);
-        if ((!discInfo || !discInfo.info) && discPresent !== false) {
-          if (!status.disc_scan_paused && !status.disc_rip_blocked && !status.disc_rip_requested) {
-            requestDiscInfoFetch();
-          }
+      }
+      const lbNote = (hbCfg.low_bitrate_auto_skip ? "Low bitrate: auto-skip" : (hbCfg.low_bitrate_auto_proceed ? "Low bitrate: auto-proceed" : "Low bitrate: ask"));
+      const audioModeLabel = (hb.audio_mode === "auto_dolby") ? "Auto Dolby" : (hb.audio_mode === "copy" ? "copy" : ((hb.audio_bitrate_kbps || "128") + " kbps"));
+      const audioOffsetLabel = (hb.audio_offset_ms !== undefined && hb.audio_offset_ms !== null) ? (hb.audio_offset_ms + " ms (single)") : "0 ms (single)";
+      document.getElementById("hb-runtime").textContent =
+        "Runtime HB settings: Encoder=" + (hb.encoder || "x264") +
+        " | Default RF=" + (hb.quality ?? 20) +
+        " | DVD RF=" + (hbDvd.quality ?? 20) +
+        " | BR RF=" + (hbBr.quality ?? 25) +
+        " | Ext=" + hbExt +
+        " | " + lbNote +
+        " | Audio=" + audioModeLabel +
+        " | Offset=" + audioOffsetLabel;
+      // Disc card update (main page, no eject)
+      let discInfo = status.disc_info || {};
+      const busyEl = document.getElementById("mk-scan-busy");
+      if (busyEl) {
+        busyEl.style.display = status.disc_scan_inflight ? "inline-flex" : "none";
+      }
+      let discPending = !!status.disc_pending;
+      const discPresent = (status.disc_present === true) ? true : ((status.disc_present === false) ? false : null);
+      if ((!discInfo || !discInfo.info) && discPresent !== false) {
+        if (!status.disc_scan_paused && !status.disc_rip_blocked && !status.disc_rip_requested) {
+          requestDiscInfoFetch();
         }
-        if (discPresent === false) {
-          discInfo = {};
-          discPending = false;
-          lastDiscLabel = null;
-          lastDiscType = null;
-          lastDiscSeenAt = 0;
+      }
+      if (discPresent === false) {
+        discInfo = {};
+        discPending = false;
+        lastDiscLabel = null;
+        lastDiscType = null;
+        lastDiscSeenAt = 0;
+      }
+      window.__discInfo = discInfo;
+      window.__discPending = discPending;
+      window.__discPresent = discPresent;
+      updateDiscCard(window.__discInfo || {}, !!window.__discPending, window.__discPresent);
+    }
+
+    function mergeDelta(delta) {
+      const removed = delta.removed || [];
+      const active = (liveStatus.active || []).filter(function(a) { return removed.indexOf(a.source) < 0; });
+      (delta.active || []).forEach(function(job) {
+        const idx = active.findIndex(function(a) { return a.source === job.source; });
+        if (idx >= 0) active[idx] = job; else active.push(job);
+      });
+      liveStatus.active = active;
+      if (delta.recent) {
+        liveStatus.recent = delta.recent_reset ? delta.recent : delta.recent.concat(liveStatus.recent || []).slice(0, 100);
+      }
+      Object.keys(delta).forEach(function(k) {
+        if (["active", "removed", "recent", "recent_reset", "delta", "since"].indexOf(k) < 0) liveStatus[k] = delta[k];
+      });
+    }
+
+    async function refreshStatus() {
+      try {
+        // after the first full snapshot only ask for what changed since the version we hold
+        const haveVersion = liveStatus && liveStatus.state_version !== undefined;
+        const status = await fetchJSON(haveVersion ? "/api/status?since=" + encodeURIComponent(liveStatus.state_version) : "/api/status");
+        if (status.delta && haveVersion) {
+          mergeDelta(status);
+        } else {
+          liveStatus = status;
         }
-        window.__discInfo = discInfo;
-        window.__discPending = discPending;
-        window.__discPresent = discPresent;
-        updateDiscCard(window.__discInfo || {}, !!window.__discPending, window.__discPresent);
+        serverClockOffset = (liveStatus.timestamp || 0) - Date.now() / 1000;
+        applyStatus(liveStatus);
       } catch (e) {
         showJsError("Refresh failed: " + e);
       }
+    }
+
+    // Logs: the first fetch returns the tail and a cursor; later fetches only carry appended lines.
+    const LOG_KEEP_LINES = 400;
+    let logLines = [];
+    let logCursor = null;
+
+    async function refreshLogs() {
       try {
-        const logs = await fetchJSON("/api/logs");
+        const url = logCursor ? "/api/logs?cursor=" + encodeURIComponent(logCursor) : "/api/logs";
+        const logs = await fetchJSON(url);
         const lines = Array.isArray(logs.lines) ? logs.lines : [];
-        renderLogs(lines);
+        const replace = !logCursor || logs.reset;
+        logCursor = logs.cursor || null;
+        if (replace) {
+          logLines = lines.slice(-LOG_KEEP_LINES);
+        } else if (lines.length) {
+          logLines = logLines.concat(lines).slice(-LOG_KEEP_LINES);
+        } else {
+          return;
+        }
+        renderLogs(logLines);
       } catch (e) {
         showJsError("Logs fetch failed: " + e);
       }
+    }
+
+    function renderEvents() {
+      const lines = (eventsCache || []).map(function(ev) {
+        return "[" + new Date(ev.ts * 1000).toLocaleTimeString() + "] " + ev.message;
+      });
+      lastEventsText = lines.join("\\n") || "No recent events.";
+      document.getElementById("events").textContent = lastEventsText;
+    }
+
+    async function refreshEvents() {
       try {
         const events = await fetchJSON("/api/events");
         eventsCache = events || [];
-        const lines = (eventsCache || []).map(function(ev) {
-          return "[" + new Date(ev.ts * 1000).toLocaleTimeString() + "] " + ev.message;
-        });
-        lastEventsText = lines.join("\\n") || "No recent events.";
-        document.getElementById("events").textContent = lastEventsText;
+        renderEvents();
       } catch (e) {
         showJsError("Events fetch failed: " + e);
         if (lastEventsText) {
           document.getElementById("events").textContent = lastEventsText;
         }
       }
-      try {
-        bindUsbButtons();
-      } catch (e) {
-        console.error("USB refresh/force setup failed", e);
-      }
+    }
+
+    async function refreshMetrics() {
       try {
         const metrics = await fetchJSON("/api/metrics");
         renderMetrics(metrics);
@@ -913,6 +1005,107 @@ MAIN_PAGE_TEMPLATE = """
       }
     }
 
+    async function refresh() {
+      await refreshStatus();
+      await refreshLogs();
+      await refreshEvents();
+      try {
+        bindUsbButtons();
+      } catch (e) {
+        console.error("USB refresh/force setup failed", e);
+      }
+      await refreshMetrics();
+    }
+
+    function streaming() {
+      return !!(streamSource && streamSource.readyState === 1 && liveStatus);
+    }
+
+    function scheduleRender() {
+      if (renderQueued) return;
+      renderQueued = true;
+      setTimeout(function() {
+        renderQueued = false;
+        if (liveStatus) applyStatus(liveStatus);
+      }, 250);
+    }
+
+    function startPolling() {
+      if (!pollTimer) pollTimer = setInterval(refresh, 2000);
+    }
+
+    function stopPolling() {
+      if (pollTimer) {
+        clearInterval(pollTimer);
+        pollTimer = null;
+      }
+    }
+
+    function connectStream() {
+      if (!window.EventSource) {
+        startPolling();
+        return;
+      }
+      const es = new EventSource("/api/stream");
+      streamSource = es;
+      const on = function(kind, fn) {
+        es.addEventListener(kind, function(e) {
+          try {
+            const data = JSON.parse(e.data);
+            if (kind === "snapshot" || liveStatus) fn(data);
+          } catch (err) {
+            console.error("Stream " + kind + " failed", err);
+          }
+        });
+      };
+      on("snapshot", function(status) {
+        liveStatus = status;
+        serverClockOffset = (status.timestamp || 0) - Date.now() / 1000;
+        stopPolling();
+        applyStatus(status);
+        refreshEvents();
+      });
+      on("job", function(job) {
+        const active = liveStatus.active || [];
+        const idx = active.findIndex(function(a) { return a.source === job.source; });
+        if (idx >= 0) active[idx] = job; else active.push(job);
+        liveStatus.active = active;
+        scheduleRender();
+      });
+      on("job_done", function(msg) {
+        liveStatus.active = (liveStatus.active || []).filter(function(a) { return a.source !== msg.source; });
+        if (msg.record) liveStatus.recent = [msg.record].concat(liveStatus.recent || []).slice(0, 100);
+        scheduleRender();
+      });
+      on("history", function(recent) { liveStatus.recent = recent; scheduleRender(); });
+      on("disc", function(disc) { Object.assign(liveStatus, disc); scheduleRender(); });
+      on("usb", function(usb) { liveStatus.usb_status = usb; scheduleRender(); });
+      on("scan_roots", function(roots) { liveStatus.scan_roots = roots; scheduleRender(); });
+      on("config", function(hbCfg) { liveStatus.handbrake_config = hbCfg; scheduleRender(); });
+      on("event", function(ev) {
+        eventsCache = (eventsCache || []).concat([ev]).slice(-100);
+        renderEvents();
+      });
+      es.onerror = function() {
+        // poll while the browser reconnects; the snapshot sent on reconnect stops polling again
+        startPolling();
+        if (es.readyState === 2) {
+          streamSource = null;
+          setTimeout(connectStream, 30000);
+        }
+      };
+    }
+
+    function tickLive() {
+      // elapsed times move without server traffic (deltas and the stream only carry changed jobs)
+      if (!liveStatus) return;
+      const now = Date.now() / 1000 + serverClockOffset;
+      (liveStatus.active || []).forEach(function(a) {
+        if (a.started_at) a.duration_sec = Math.max(0, now - a.started_at);
+      });
+      scheduleRender();
+    }
+
     function tickClock() {
       const now = new Date();
       document.getElementById("clock").textContent = now.toLocaleString();
@@ -1131,9 +1324,12 @@ MAIN_PAGE_TEMPLATE = """
 
     initMobileNav();
     numberPanels();
-    setInterval(refresh, 2000);
     setInterval(tickClock, 1000);
+    setInterval(tickLive, 2000);
+    setInterval(function() { if (streaming()) { refreshLogs(); refreshMetrics(); } }, 5000);
+    setInterval(function() { if (streaming()) refreshStatus(); }, 60000);
     refresh();
+    connectStream();
     tickClock();
   </script>
 </body>
@@ -1378,6 +1574,9 @@ SETTINGS_PAGE_TEMPLATE = """
           <label style="display:flex; align-items:center; gap:6px; margin:0;">
             <input type="checkbox" id="lb-auto-skip" /> Auto-skip low bitrate
           </label>
+          <label style="display:flex; align-items:center; gap:6px; margin:0;" title="Stream-copy H.264/HEVC sources already within the profile's resolution and bitrate instead of re-encoding">
+            <input type="checkbox" id="remux-auto" /> Remux when no encode is needed
+          </label>
           <span id="lb-save-status" class="muted"></span>
         </div>
         <div class="muted">Applies: Default for regular files, DVD for VIDEO_TS, BR for BDMV/STREAM.</div>
@@ -1405,6 +1604,9 @@ SETTINGS_PAGE_TEMPLATE = """
         <label style="display:flex; align-items:center; gap:6px;">
           <input type="checkbox" id="mk-auto-rip" /> Auto-start rip when disc detected
         </label>
+        <label style="display:flex; align-items:center; gap:6px;">
+          <input type="checkbox" id="mk-encode-while-ripping" /> Start encoding single-title rips while MakeMKV is still writing
+        </label>
         <button type="button" id="mk-save">Save MakeMKV</button>
       </form>
       <div style="margin-top:8px;">
@@ -1463,6 +1665,15 @@ SETTINGS_PAGE_TEMPLATE = """
       <button type="button" id="diag-push">Push Diagnostics to GitHub</button>
       <div class="muted field-display" id="diag-status" style="margin-top:6px;">Idle.</div>
     </div>
+    <div class="panel" id="panel-logging" data-panel-title="Logging">
+      <h2>📜 Logging</h2>
+      <div class="muted" style="margin-bottom:6px;">Minimum level written to app.log per subsystem. Applied immediately; encoder/MakeMKV output is in the per-job logs.</div>
+      <label>Main loop, encodes and rips <select id="log-level-app" data-subsystem="app"><option value="DEBUG">DEBUG</option><option value="INFO">INFO</option><option value="WARNING">WARNING</option><option value="ERROR">ERROR</option></select></label>
+      <label>Scanner (file walks, inotify, mounts) <select id="log-level-scanner" data-subsystem="scanner"><option value="DEBUG">DEBUG</option><option value="INFO">INFO</option><option value="WARNING">WARNING</option><option value="ERROR">ERROR</option></select></label>
+      <label>Web server and HTTP requests <select id="log-level-web" data-subsystem="web"><option value="DEBUG">DEBUG</option><option value="INFO">INFO</option><option value="WARNING">WARNING</option><option value="ERROR">ERROR</option></select></label>
+      <label>Metrics, process accounting, job logs <select id="log-level-metrics" data-subsystem="metrics"><option value="DEBUG">DEBUG</option><option value="INFO">INFO</option><option value="WARNING">WARNING</option><option value="ERROR">ERROR</option></select></label>
+      <button type="button" id="log-levels-save">Save Log Levels</button>
+    </div>
     <div class="panel" id="panel-auth" data-panel-title="Authentication">
       <h2>🔒 Authentication</h2>
       <div class="muted" style="margin-bottom:6px;">HTTP Basic auth for this UI/API.</div>
@@ -1476,6 +1687,7 @@ SETTINGS_PAGE_TEMPLATE = """
     let hbDirty = false;
     let mkDirty = false;
     let authDirty = false;
+    let logDirty = false;
     const mobileMq = window.matchMedia ? window.matchMedia("(max-width: 900px)") : null;
     let activePanelId = "";
     const mobileNav = document.getElementById("mobile-nav");
@@ -1703,6 +1915,25 @@ SETTINGS_PAGE_TEMPLATE = """
       window.lastTitleHtml = rows;
     }
 
+    // status only carries compact titles; the formatted overview and raw output come from /api/disc/details
+    let discDetails = { id: null, text: "" };
+    let discDetailsInFlight = null;
+
+    function loadDiscDetails(detailId) {
+      if (!detailId || detailId === discDetails.id || discDetailsInFlight === detailId) return;
+      discDetailsInFlight = detailId;
+      fetchJSON("/api/disc/details").then((details) => {
+        discDetails = { id: details.detail_id, text: buildDiscInfoText(details) };
+        const discInfoEl = document.getElementById("mk-info");
+        if (discInfoEl && discDetails.text && discDetails.id === window.lastDiscDetailId) {
+          discInfoEl.value = discDetails.text;
+          window.lastMkInfoText = discDetails.text;
+        }
+      }).catch(() => {}).finally(() => {
+        discDetailsInFlight = null;
+      });
+    }
+
     function updateDiscInfoPanel(status) {
       const discInfoEl = document.getElementById("mk-info");
       const discStatusEl = document.getElementById("mk-disc-status");
@@ -1714,7 +1945,10 @@ SETTINGS_PAGE_TEMPLATE = """
       const label = summary.disc_label || summary.label || "";
       const drive = summary.drive || "";
       const discKey = [label, drive].filter(Boolean).join("|");
-      const text = buildDiscInfoText(info);
+      const detailId = info.detail_id || null;
+      window.lastDiscDetailId = detailId;
+      const text = (detailId && detailId === discDetails.id && discDetails.text) ? discDetails.text : buildDiscInfoText(info);
+      loadDiscDetails(detailId);
       const titlePayload = (typeof extractTitlePayload === "function")
         ? extractTitlePayload(info)
         : ((info && (info.info || info)) || {});
@@ -1819,7 +2053,7 @@ SETTINGS_PAGE_TEMPLATE = """
     async function refreshSettings() {
       try {
         const cfg = await fetchJSON("/api/config");
-        const status = await fetchJSON("/api/status");
+        const status = await fetchJSON("/api/status?fields=-active,-recent,-scan_roots,-usb_status");
         if (!hbDirty) {
           populateHandbrakeForm(cfg);
         }
@@ -1835,6 +2069,7 @@ SETTINGS_PAGE_TEMPLATE = """
           document.getElementById("mk-exclude-commentary").checked = !!cfg.makemkv_exclude_commentary;
           document.getElementById("mk-prefer-surround").checked = cfg.makemkv_prefer_surround !== false;
           document.getElementById("mk-auto-rip").checked = !!cfg.makemkv_auto_rip;
+          document.getElementById("mk-encode-while-ripping").checked = !!cfg.makemkv_encode_while_ripping;
         }
         const hb = cfg.handbrake || {};
         const hbDvd = cfg.handbrake_dvd || {};
@@ -1848,10 +2083,12 @@ SETTINGS_PAGE_TEMPLATE = """
           + " | BR RF: " + (hbBr.quality !== undefined && hbBr.quality !== null ? hbBr.quality : 25)
           + " | Ext: " + (hb.extension || ".mkv")
           + " | " + lbNote
+          + (cfg.remux_mode === "auto" ? " | Remux: auto" : "")
           + " | Audio: " + audioModeLabel
           + " | Offset: " + audioOffsetLabel;
         document.getElementById("lb-auto-proceed").checked = !!cfg.low_bitrate_auto_proceed;
         document.getElementById("lb-auto-skip").checked = !!cfg.low_bitrate_auto_skip;
+        document.getElementById("remux-auto").checked = cfg.remux_mode === "auto";
         const ripStatus = document.getElementById("mk-rip-status");
         if (ripStatus) {
           ripStatus.textContent = status.disc_rip_blocked ? "Rip status: paused" : "Rip status: active";
@@ -1876,6 +2113,12 @@ SETTINGS_PAGE_TEMPLATE = """
           debugEl.textContent = "Titles: " + titlesCount + " (cached: " + cachedCount + ", disc present: " + (status.disc_present === true ? "yes" : (status.disc_present === false ? "no" : "unknown")) + ")";
         }
         updateDiscInfoPanel(status);
+        if (!logDirty) {
+          const levels = cfg.log_levels || {};
+          document.querySelectorAll("#panel-logging select[data-subsystem]").forEach(sel => {
+            if (levels[sel.dataset.subsystem]) sel.value = levels[sel.dataset.subsystem];
+          });
+        }
         if (!authDirty) {
           document.getElementById("auth-user").value = cfg.auth_user || "";
           document.getElementById("auth-pass").value = cfg.auth_password || "";
@@ -1925,6 +2168,7 @@ SETTINGS_PAGE_TEMPLATE = """
         profile: "handbrake",
         low_bitrate_auto_proceed: document.getElementById("lb-auto-proceed").checked,
         low_bitrate_auto_skip: document.getElementById("lb-auto-skip").checked,
+        remux_mode: document.getElementById("remux-auto").checked ? "auto" : "off",
         handbrake: {
           encoder: document.getElementById("hb-encoder").value,
           quality: qDefault,
@@ -2040,6 +2284,7 @@ SETTINGS_PAGE_TEMPLATE = """
         makemkv_exclude_commentary: document.getElementById("mk-exclude-commentary").checked,
         makemkv_prefer_surround: document.getElementById("mk-prefer-surround").checked,
         makemkv_auto_rip: document.getElementById("mk-auto-rip").checked,
+        makemkv_encode_while_ripping: document.getElementById("mk-encode-while-ripping").checked,
       };
       await fetch("/api/config", { method: "POST", headers: { "Content-Type": "application/json" }, body: JSON.stringify(body) });
       try { await fetch("/api/events", { method: "POST", headers: { "Content-Type": "application/json" }, body: JSON.stringify({ message: "MakeMKV settings saved", level: "info" }) }); } catch (err) {}
@@ -2262,6 +2507,18 @@ SETTINGS_PAGE_TEMPLATE = """
     document.getElementById("makemkv-form").addEventListener("input", () => { mkDirty = true; });
     document.getElementById("makemkv-form").addEventListener("change", () => { mkDirty = true; });
     document.getElementById("handbrake-form").addEventListener("change", () => { hbDirty = true; });
+    document.querySelectorAll("#panel-logging select[data-subsystem]").forEach(sel => {
+      sel.addEventListener("change", () => { logDirty = true; });
+    });
+    document.getElementById("log-levels-save").addEventListener("click", async () => {
+      const levels = {};
+      document.querySelectorAll("#panel-logging select[data-subsystem]").forEach(sel => {
+        levels[sel.dataset.subsystem] = sel.value;
+      });
+      await fetch("/api/config", { method: "POST", headers: { "Content-Type": "application/json" }, body: JSON.stringify({ log_levels: levels }) });
+      logDirty = false;
+    });
+
     const authDirtyFlag = () => { authDirty = true; };
     document.getElementById("auth-user").addEventListener("input", authDirtyFlag);
     document.getElementById("auth-pass").addEventListener("input", authDirtyFlag);
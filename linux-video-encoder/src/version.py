@@ -1 +1 @@
-VERSION = "1.25.192"
+VERSION = "1.25.217"
@@ -1,6 +1,9 @@
-from flask import Flask, jsonify, Response, request
+from flask import Flask, jsonify, Response, request, stream_with_context
 import time
 import json
+import hashlib
+import threading
+import collections
 import subprocess
 import os
 import sys
@@ -15,7 +18,10 @@ import urllib.request
 import urllib.error
 from templates import MAIN_PAGE_TEMPLATE, SETTINGS_PAGE_TEMPLATE
 from smb_allowlist import save_smb_allowlist, load_smb_allowlist, remove_from_allowlist
-from makemkv_parser import parse_makemkv_info_output
+from makemkv_parser import parse_makemkv_info_output, disc_details, disc_detail_id
+from metrics_sampler import get_metrics_sampler, COARSE_POINTS, COARSE_STEP_SEC
+from job_logs import gzip_size, iter_range
+from openmetrics import REGISTRY, CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, HTTP_SECONDS, observe_copy
 
 SMB_MOUNT_ROOT = pathlib.Path("/mnt/smb")
 ASSETS_ROOT = pathlib.Path("/linux-video-encoder/assets")
@@ -26,7 +32,22 @@ DIAG_GIT_NAME = os.environ.get("DIAG_GIT_NAME", "Diagnostics Bot")
 DIAG_GIT_EMAIL = os.environ.get("DIAG_GIT_EMAIL", "diagnostics@example.com")
 STATE_ROOT = Path(os.environ.get("AE_STATE_DIR", "/var/lib/autoencoder/state"))
 TIMING_PATH = STATE_ROOT / "timing.log"
+# log_timing entries are kept in memory (no file append per request) and written out with diagnostics
+TIMING_RECENT_ENTRIES = 2000
+TIMING_RECENT = collections.deque(maxlen=TIMING_RECENT_ENTRIES)
 MAKEMKV_TIMEOUT_EVENT_TS = 0.0
+# /api/stream: keepalive comment interval, and how long to collect a burst of bus messages before sending
+STREAM_KEEPALIVE_SEC = 15
+STREAM_BATCH_SEC = 0.25
+# /api/logs: default tail length; /api/logs/stream checks the log for appended lines this often
+LOG_TAIL_LINES = 400
+LOG_STREAM_POLL_SEC = 1.0
+# /api/status: serialized snapshots kept per (version, config, fields); while jobs are active the
+# key also rolls every STATUS_ACTIVE_BUCKET_SEC so elapsed times keep moving for pollers
+STATUS_CACHE_ENTRIES = 8
+STATUS_ACTIVE_BUCKET_SEC = 2
+# always present regardless of fields=
+STATUS_BASE_FIELDS = ("state_version", "timestamp", "version")
 
 
 def _call_optical_helper(path: str, method: str = "POST", timeout: int = 5) -> dict:
@@ -55,14 +76,9 @@ def _call_optical_helper(path: str, method: str = "POST", timeout: int = 5) -> d
         return {"ok": False, "error": str(exc) or "timed out"}
 
 def log_timing(label: str, started_at: float, extra: str = ""):
-    """Append simple timing entries for diagnostics, ignore failures."""
-    try:
-        dur = time.time() - started_at
-        TIMING_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with TIMING_PATH.open("a", encoding="utf-8") as f:
-            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {label} {dur:.3f}s {extra}\n")
-    except Exception:
-        pass
+    """Remember a timing entry for the diagnostics bundle (in memory; see TIMING_RECENT)."""
+    dur = time.time() - started_at
+    TIMING_RECENT.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {label} {dur:.3f}s {extra}")
 STATE_ROOT = Path(os.environ.get("AE_STATE_DIR", "/var/lib/autoencoder/state"))
 TIMING_PATH = STATE_ROOT / "timing.log"
 
@@ -1319,7 +1335,7 @@ def create_app(tracker, config_manager=None):
     def require_auth(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            cfg = config_manager.read() if config_manager else {}
+            cfg = config_manager.current() if config_manager else {}
             expected_user = cfg.get("auth_user") or ""
             expected_pass = cfg.get("auth_password") or ""
             auth = request.authorization
@@ -1330,14 +1346,44 @@ def create_app(tracker, config_manager=None):
             return f(*args, **kwargs)
         return wrapper
 
-    def log_timing(label: str, started_at: float, extra: str = ""):
-        try:
-            dur = time.time() - started_at
-            TIMING_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with TIMING_PATH.open("a", encoding="utf-8") as f:
-                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {label} {dur:.3f}s {extra}\n")
-        except Exception:
-            pass
+    def _job_state_counts():
+        return [((state,), n) for state, n in tracker.job_metrics()["states"].items()]
+
+    def _running_slots():
+        # (slot, state, progress, fps): slot is the job's position among running jobs of its state, oldest
+        # first, so label values stay bounded by the slot count instead of growing with every file encoded
+        counts = {}
+        out = []
+        for _src, state, pct, fps in tracker.job_metrics()["running"]:
+            slot = counts.get(state, 0)
+            counts[state] = slot + 1
+            out.append((str(slot), state, pct, fps))
+        return out
+
+    def _job_progress():
+        return [((slot, state), pct) for slot, state, pct, _fps in _running_slots() if pct is not None]
+
+    def _job_fps():
+        return [((slot,), fps) for slot, state, _pct, fps in _running_slots() if fps is not None and state == "running"]
+
+    REGISTRY.callback("autoencoder_queue_jobs", "Active jobs by state (smb_pending: copies waiting for an idle encoder)",
+                      _job_state_counts, ("state",))
+    REGISTRY.callback("autoencoder_job_progress_percent", "Progress of running encodes and rips",
+                      _job_progress, ("slot", "state"))
+    REGISTRY.callback("autoencoder_job_fps", "Current encode rate reported by HandBrake", _job_fps, ("slot",))
+
+    @app.before_request
+    def _request_started():
+        request.environ["autoencoder.t0"] = time.perf_counter()
+
+    @app.after_request
+    def _request_finished(resp):
+        t0 = request.environ.get("autoencoder.t0")
+        if t0 is not None:
+            # label by route pattern, not path, so /api/jobs/<id> stays one series
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - t0, route=route, method=request.method, code=resp.status_code)
+        return resp
 
     def normalize_smb_url(url: str) -> str:
         url = url.strip()
@@ -1519,100 +1565,6 @@ def create_app(tracker, config_manager=None):
             pass
         return {"path": "/" + target.relative_to(base).as_posix() if target != base else "/", "entries": entries}
 
-    def read_meminfo():
-        mem = {"total_mb": None, "used_mb": None}
-        try:
-            info = {}
-            with open("/proc/meminfo", "r", encoding="utf-8") as f:
-                for line in f:
-                    parts = line.split(":")
-                    if len(parts) < 2:
-                        continue
-                    key = parts[0].strip()
-                    val = parts[1].strip().split()[0]
-                    info[key] = int(val)
-            total_kb = info.get("MemTotal", 0)
-            avail_kb = info.get("MemAvailable", 0)
-            used_kb = total_kb - avail_kb
-            mem["total_mb"] = round(total_kb / 1024, 1)
-            mem["used_mb"] = round(used_kb / 1024, 1)
-        except Exception:
-            pass
-        return mem
-
-    def read_netdev():
-        rx = tx = 0
-        try:
-            with open("/proc/net/dev", "r", encoding="utf-8") as f:
-                for line in f:
-                    if ":" not in line:
-                        continue
-                    iface, rest = line.split(":", 1)
-                    parts = rest.strip().split()
-                    if len(parts) >= 8:
-                        rx += int(parts[0])
-                        tx += int(parts[8])
-        except Exception:
-            pass
-        return {"rx_mb": round(rx / (1024 * 1024), 1), "tx_mb": round(tx / (1024 * 1024), 1)}
-
-    def read_diskstats():
-        rd = wr = 0
-        try:
-            with open("/proc/diskstats", "r", encoding="utf-8") as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) < 14:
-                        continue
-                    # sectors read at index 5, written at index 9
-                    try:
-                        sectors_rd = int(parts[5])
-                        sectors_wr = int(parts[9])
-                        rd += sectors_rd
-                        wr += sectors_wr
-                    except Exception:
-                        continue
-            # assume 512 bytes per sector
-            rd_mb = round((rd * 512) / (1024 * 1024), 1)
-            wr_mb = round((wr * 512) / (1024 * 1024), 1)
-            return {"read_mb": rd_mb, "write_mb": wr_mb}
-        except Exception:
-            return None
-
-    def read_gpu():
-        try:
-            res = subprocess.run(
-                ["nvidia-smi", "--query-gpu=utilization.gpu,memory.used,memory.total", "--format=csv,noheader,nounits"],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            if res.returncode != 0 or not res.stdout.strip():
-                return None
-            line = res.stdout.strip().splitlines()[0]
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) >= 3:
-                util = int(parts[0])
-                mem_used = int(parts[1])
-                mem_total = int(parts[2])
-                return {"util": util, "mem_used_mb": mem_used, "mem_total_mb": mem_total}
-        except Exception:
-            pass
-        return None
-
-    def read_fs(path="/mnt/output"):
-        try:
-            st = os.statvfs(path)
-            total = st.f_frsize * st.f_blocks
-            free = st.f_frsize * st.f_bavail
-            return {
-                "path": path,
-                "free_gb": round(free / (1024 ** 3), 1),
-                "total_gb": round(total / (1024 ** 3), 1),
-            }
-        except Exception:
-            return None
-
     @app.route("/")
     @require_auth
     def index():
@@ -1623,35 +1575,199 @@ def create_app(tracker, config_manager=None):
     def settings():
         return Response(SETTINGS_PAGE, mimetype="text/html")
 
+    def handbrake_status_config():
+        if not config_manager:
+            return None
+        cfg = config_manager.read()
+        return {
+            "profile": cfg.get("profile"),
+            "handbrake": cfg.get("handbrake", {}),
+            "handbrake_dvd": cfg.get("handbrake_dvd", {}),
+            "handbrake_br": cfg.get("handbrake_br", {}),
+            "low_bitrate_auto_proceed": cfg.get("low_bitrate_auto_proceed", False),
+            "low_bitrate_auto_skip": cfg.get("low_bitrate_auto_skip", False),
+        }
+
+    if config_manager:
+        # push settings changes to open dashboards instead of waiting for their next full refresh
+        config_manager.subscribe(lambda _cfg: tracker.publish("config", handbrake_status_config()))
+
+    def build_status():
+        data = tracker.snapshot()
+        data["version"] = VERSION
+        hb_cfg = handbrake_status_config()
+        if hb_cfg is not None:
+            data["handbrake_config"] = hb_cfg
+        return data
+
+    def select_fields(data: dict, fields: tuple) -> dict:
+        """fields=a,b keeps only those sections; fields=-a,-b drops them."""
+        if not fields:
+            return data
+        drop = {f[1:] for f in fields if f.startswith("-")}
+        keep = {f for f in fields if not f.startswith("-")}
+        return {
+            k: v for k, v in data.items()
+            if k in STATUS_BASE_FIELDS or (k not in drop and (not keep or k in keep))
+        }
+
+    status_cache = collections.OrderedDict()
+    status_cache_lock = threading.Lock()
+
     @app.route("/api/status")
     @require_auth
     def status():
+        """
+        Full snapshot, served from a per-version cache with an ETag (If-None-Match -> 304).
+        ?since=<state_version> returns only what changed (or a full snapshot when it is not from this
+        run); ?fields= selects or drops sections.
+        """
         t0 = time.time()
-        data = tracker.snapshot()
-        data["version"] = VERSION
-        if config_manager:
-            cfg = config_manager.read()
-            data["handbrake_config"] = {
-                "profile": cfg.get("profile"),
-                "handbrake": cfg.get("handbrake", {}),
-                "handbrake_dvd": cfg.get("handbrake_dvd", {}),
-                "handbrake_br": cfg.get("handbrake_br", {}),
-                "low_bitrate_auto_proceed": cfg.get("low_bitrate_auto_proceed", False),
-                "low_bitrate_auto_skip": cfg.get("low_bitrate_auto_skip", False),
-            }
-        resp = jsonify(data)
-        log_timing("api/status", t0)
+        fields = tuple(sorted(f.strip() for f in (request.args.get("fields") or "").split(",") if f.strip()))
+        cfg_tag = config_manager.version if config_manager else 0
+        version, active_count = tracker.state_version()
+        since = request.args.get("since")
+        if since is not None:
+            # a since from before a restart (other epoch) or ahead of us falls through to a full snapshot
+            delta = tracker.changes_since(since)
+            if delta is not None:
+                hb_cfg = handbrake_status_config()
+                if hb_cfg is not None:
+                    delta["handbrake_config"] = hb_cfg
+                delta["version"] = VERSION
+                resp = jsonify(select_fields(delta, fields))
+                log_timing("api/status", t0, f"since={since} version={delta['state_version']}")
+                return resp
+        bucket = int(t0 // STATUS_ACTIVE_BUCKET_SEC) if active_count else 0
+        # version carries the tracker's per-start epoch, so keys (and ETags) never repeat across restarts
+        key = (version, cfg_tag, fields, bucket)
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        if etag in request.if_none_match:
+            log_timing("api/status", t0, "304")
+            return Response(status=304, headers={"ETag": f'"{etag}"', "Cache-Control": "no-cache"})
+        with status_cache_lock:
+            # one build per key; concurrent pollers wait here and share the serialized body
+            body = status_cache.get(key)
+            if body is None:
+                data = build_status()
+                key = (data["state_version"], cfg_tag, fields, bucket)
+                etag = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+                body = json.dumps(select_fields(data, fields), default=str)
+                status_cache[key] = body
+                while len(status_cache) > STATUS_CACHE_ENTRIES:
+                    status_cache.popitem(last=False)
+        resp = Response(body, mimetype="application/json", headers={"ETag": f'"{etag}"', "Cache-Control": "no-cache"})
+        log_timing("api/status", t0, f"version={key[0]}")
         return resp
 
+    def _sse(kind: str, data) -> str:
+        return f"event: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    def _coalesce(batch: list) -> list:
+        """Keep only the newest job update per source within a batch (progress ticks arrive in bursts)."""
+        out = []
+        pending_job = {}
+        for msg in batch:
+            kind = msg.get("type")
+            source = (msg.get("data") or {}).get("source") if kind in ("job", "job_done") else None
+            if kind == "job" and source in pending_job:
+                out[pending_job[source]] = msg
+                continue
+            if kind == "job":
+                pending_job[source] = len(out)
+            elif kind == "job_done":
+                pending_job.pop(source, None)
+            out.append(msg)
+        return out
+
+    @app.route("/api/stream")
+    @require_auth
+    def stream():
+        """
+        Server-Sent Events: a full "snapshot" first, then only changes from the tracker bus
+        (job, job_done, event, disc, usb, scan_roots, history). A client that falls behind is
+        sent a fresh snapshot instead of its backlog.
+        """
+        def generate():
+            # subscribe before building the snapshot so nothing published in between is lost
+            sub = tracker.subscribe()
+            try:
+                yield "retry: 3000\n\n"
+                yield _sse("snapshot", build_status())
+                while True:
+                    batch = sub.get(STREAM_KEEPALIVE_SEC)
+                    if not batch:
+                        yield ": keepalive\n\n"
+                        continue
+                    # let a burst of progress ticks collect so they go out as one write
+                    time.sleep(STREAM_BATCH_SEC)
+                    batch.extend(sub.get(0))
+                    if sub.lagged:
+                        sub.reset()
+                        yield _sse("snapshot", build_status())
+                        continue
+                    yield "".join(_sse(msg["type"], msg["data"]) for msg in _coalesce(batch))
+            finally:
+                tracker.unsubscribe(sub)
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
     @app.route("/api/logs")
     @require_auth
     def logs():
+        """
+        Last ?lines= (default 400) log lines and a cursor; ?cursor=<cursor> returns only lines appended
+        since then ("reset": true when the log rotated away or the client fell too far behind).
+        """
         t0 = time.time()
-        lines = tracker.tail_logs()
-        resp = jsonify({"lines": lines})
-        log_timing("api/logs", t0, f"lines={len(lines)}")
+        try:
+            count = max(1, min(5000, int(request.args.get("lines", LOG_TAIL_LINES))))
+        except ValueError:
+            return jsonify({"error": "lines must be an integer"}), 400
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                data = tracker.logs_since(cursor, count)
+            except ValueError as exc:
+                return jsonify({"error": str(exc)}), 400
+        else:
+            data = tracker.log_tail(count)
+        resp = jsonify(data)
+        log_timing("api/logs", t0, f"lines={len(data['lines'])} cursor={cursor or '-'}")
         return resp
 
+    @app.route("/api/logs/stream")
+    @require_auth
+    def logs_stream():
+        """Server-Sent Events: a "lines" event with the tail, then one per batch of appended lines."""
+        try:
+            count = max(1, min(5000, int(request.args.get("lines", LOG_TAIL_LINES))))
+        except ValueError:
+            return jsonify({"error": "lines must be an integer"}), 400
+
+        def generate():
+            data = tracker.log_tail(count)
+            cursor = data["cursor"]
+            yield "retry: 3000\n\n"
+            yield _sse("lines", data)
+            idle = 0.0
+            while True:
+                time.sleep(LOG_STREAM_POLL_SEC)
+                data = tracker.logs_since(cursor, count)
+                cursor = data["cursor"]
+                if data["lines"] or data["reset"]:
+                    idle = 0.0
+                    yield _sse("lines", data)
+                    continue
+                idle += LOG_STREAM_POLL_SEC
+                if idle >= STREAM_KEEPALIVE_SEC:
+                    idle = 0.0
+                    yield ": keepalive\n\n"
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
     @app.route("/api/events")
     @require_auth
     def events():
@@ -1661,6 +1777,50 @@ def create_app(tracker, config_manager=None):
         log_timing("api/events", t0, f"events={len(ev)}")
         return resp
 
+    @app.route("/api/jobs/<log_id>/log")
+    @require_auth
+    def job_log(log_id):
+        """A job's own subprocess output (log_id from the job or its history record); honours Range: bytes=."""
+        path, gzipped = tracker.job_log_location(log_id)
+        if path is None:
+            return jsonify({"error": "log not found"}), 404
+        try:
+            total = gzip_size(path) if gzipped else path.stat().st_size
+        except OSError:
+            return jsonify({"error": "log not found"}), 404
+        headers = {"Accept-Ranges": "bytes", "Cache-Control": "no-cache"}
+        rng = request.range
+        span = rng.range_for_length(total) if rng is not None else None
+        if rng is not None and span is None:
+            headers["Content-Range"] = f"bytes */{total}"
+            return Response(status=416, headers=headers)
+        if span is None and gzipped and "gzip" in request.headers.get("Accept-Encoding", ""):
+            # whole finished log: send the compressed file as is
+            headers["Content-Encoding"] = "gzip"
+            return Response(path.read_bytes(), mimetype="text/plain", headers=headers)
+        start, end = span or (0, total)
+        status = 200
+        if span is not None:
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{total}"
+        headers["Content-Length"] = str(end - start)
+        return Response(iter_range(path, gzipped, start, end - start), status=status, mimetype="text/plain", headers=headers)
+
+    @app.route("/api/history")
+    @require_auth
+    def history():
+        t0 = time.time()
+        try:
+            limit = max(1, min(1000, int(request.args.get("limit", 100))))
+            offset = max(0, int(request.args.get("offset", 0)))
+        except Exception:
+            return jsonify({"error": "limit/offset must be integers"}), 400
+        state = request.args.get("state") or None
+        items, total = tracker.history_page(limit=limit, offset=offset, state=state)
+        resp = jsonify({"items": items, "total": total, "limit": limit, "offset": offset})
+        log_timing("api/history", t0, f"items={len(items)}")
+        return resp
+
     @app.route("/api/diagnostics/push", methods=["POST"])
     @require_auth
     def push_diagnostics():
@@ -1685,9 +1845,10 @@ def create_app(tracker, config_manager=None):
             logs = tracker.tail_logs(lines=400)
             (dest / "app_log_tail.txt").write_text("\n".join(logs), encoding="utf-8")
             try:
-                timing_src = TIMING_PATH
-                if timing_src.exists():
-                    (dest / "timing.log").write_text(timing_src.read_text(encoding="utf-8", errors="ignore"), encoding="utf-8")
+                # older releases appended to timing.log on disk; keep whatever is left of it ahead of the ring
+                timing = TIMING_PATH.read_text(encoding="utf-8", errors="ignore") if TIMING_PATH.exists() else ""
+                timing += "".join(line + "\n" for line in list(TIMING_RECENT))
+                (dest / "timing.log").write_text(timing, encoding="utf-8")
             except Exception:
                 pass
             # Collect quick drive diagnostics to help debug unresponsive optical drive
@@ -1742,27 +1903,37 @@ def create_app(tracker, config_manager=None):
             return jsonify({"added": True})
         return jsonify({"added": False}), 400
 
+    metrics_sampler = get_metrics_sampler()
+
     @app.route("/api/metrics")
     @require_auth
     def metrics():
+        """Latest sample from the background sampler: CPU %, memory, disk/network MB/s (plus totals), GPU, output fs."""
         t0 = time.time()
-        import os
-        load1, load5, load15 = os.getloadavg()
-        cores = os.cpu_count() or 1
-        data = {
-            "cpu_load": [round(load1, 2), round(load5, 2), round(load15, 2)],
-            "cpu_pct": round((load1 / cores) * 100, 1),
-            "mem": read_meminfo(),
-            "net": read_netdev(),
-            "block": read_diskstats(),
-            "gpu": read_gpu(),
-            "fs": read_fs(),
-            "ts": time.time(),
-        }
-        resp = jsonify(data)
+        resp = jsonify(metrics_sampler.latest())
         log_timing("api/metrics", t0)
         return resp
 
+    @app.route("/api/metrics/history")
+    @require_auth
+    def metrics_history():
+        """?seconds= (default 3600) of history: 1 s points up to an hour, 1 min averages up to a day."""
+        t0 = time.time()
+        try:
+            seconds = max(1.0, min(float(COARSE_POINTS * COARSE_STEP_SEC), float(request.args.get("seconds", 3600))))
+        except ValueError:
+            return jsonify({"error": "seconds must be a number"}), 400
+        data = metrics_sampler.history(seconds)
+        resp = jsonify(data)
+        log_timing("api/metrics/history", t0, f"points={len(data['ts'])}")
+        return resp
+
+    @app.route("/metrics")
+    @require_auth
+    def openmetrics():
+        """OpenMetrics exposition of the in-process counters, gauges and histograms (see openmetrics.py)."""
+        return Response(REGISTRY.render(), content_type=OPENMETRICS_CONTENT_TYPE)
+
     helper_mountpoint = os.environ.get("USB_HELPER_MOUNTPOINT", "/linux-video-encoder/AutoEncoder/linux-video-encoder/USB")
     container_usb_mount = "/mnt/usb"
 
@@ -2038,6 +2209,7 @@ def create_app(tracker, config_manager=None):
                 return jsonify(config_manager.read())
             payload = request.get_json(force=True) or {}
             updated = config_manager.update(payload)
+            tracker.wake()
             return jsonify(updated)
 
     @app.route("/api/smb/mount", methods=["POST"])
@@ -2155,7 +2327,9 @@ def create_app(tracker, config_manager=None):
             if sidecar:
                 allowlist.add(Path(dest_path.parent, Path(sidecar).name).name)
             save_smb_allowlist(allowlist)
+            copy_started = time.monotonic()
             shutil.copy2(target, dest_path)
+            observe_copy("smb", dest_path.stat().st_size, time.monotonic() - copy_started)
             if sidecar:
                 try:
                     shutil.copy2(sidecar, dest_path.parent / Path(sidecar).name)
@@ -2184,10 +2358,10 @@ def create_app(tracker, config_manager=None):
                 cached = tracker.disc_info() or {}
                 cached["paused"] = True
                 return jsonify(cached)
-            if tracker.has_active_nonqueued():
+            if tracker.has_active_rip():
                 cached = tracker.disc_info() or {}
                 cached["paused"] = True
-                cached["note"] = "Disc scan paused during active jobs"
+                cached["note"] = "Disc scan paused while ripping"
                 return jsonify(cached)
             if not tracker.can_start_disc_scan(force=force):
                 cached = tracker.disc_info() or {}
@@ -2278,6 +2452,32 @@ def create_app(tracker, config_manager=None):
                 pass
             log_timing("api/makemkv/info", t0)
 
+    # last serialized /api/disc/details body, keyed by the scan's detail_id
+    disc_details_cache = {"id": None, "body": None}
+    disc_details_lock = threading.Lock()
+
+    @app.route("/api/disc/details")
+    @require_auth
+    def disc_details_route():
+        """
+        Raw makemkvcon output, formatted overview and per-title TINFO/SINFO lines for the disc info
+        currently shown in /api/status (which only carries the compact titles and a detail_id).
+        """
+        t0 = time.time()
+        info = tracker.disc_info()
+        detail_id = disc_detail_id(info) if info else None
+        if detail_id is None:
+            return jsonify({"detail_id": None, "raw": "", "formatted": "", "titles": []})
+        if detail_id in request.if_none_match:
+            return Response(status=304, headers={"ETag": f'"{detail_id}"', "Cache-Control": "no-cache"})
+        with disc_details_lock:
+            if disc_details_cache["id"] != detail_id:
+                disc_details_cache["body"] = json.dumps(disc_details(info), default=str)
+                disc_details_cache["id"] = detail_id
+            body = disc_details_cache["body"]
+        log_timing("api/disc/details", t0, f"id={detail_id} bytes={len(body)}")
+        return Response(body, mimetype="application/json", headers={"ETag": f'"{detail_id}"', "Cache-Control": "no-cache"})
+
     @app.route("/api/retry", methods=["POST"])
     @require_auth
     def retry_job():